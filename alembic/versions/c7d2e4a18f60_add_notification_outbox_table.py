@@ -0,0 +1,60 @@
+"""add notification outbox table
+
+Revision ID: c7d2e4a18f60
+Revises: a3c5e1f09b42
+Create Date: 2026-10-19 11:04:27.512940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e4a18f60'
+down_revision: Union[str, Sequence[str], None] = 'a3c5e1f09b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'notification_outbox',
+        sa.Column('channel', sa.String(length=20), nullable=False),
+        sa.Column('recipient', sa.String(length=255), nullable=True),
+        sa.Column('subject', sa.String(length=255), nullable=True),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=191), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=True),
+        sa.Column('recommendation_id', sa.String(length=36), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'SENDING', 'SENT', 'DEAD', name='outboxstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_by', sa.String(length=64), nullable=True),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index(op.f('ix_notification_outbox_id'), 'notification_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_notification_outbox_user_id'), 'notification_outbox', ['user_id'], unique=False)
+    op.create_index(op.f('ix_notification_outbox_recommendation_id'), 'notification_outbox', ['recommendation_id'], unique=False)
+    op.create_index('ix_notification_outbox_dispatch', 'notification_outbox', ['status', 'channel', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_outbox_dispatch', table_name='notification_outbox')
+    op.drop_index(op.f('ix_notification_outbox_recommendation_id'), table_name='notification_outbox')
+    op.drop_index(op.f('ix_notification_outbox_user_id'), table_name='notification_outbox')
+    op.drop_index(op.f('ix_notification_outbox_id'), table_name='notification_outbox')
+    op.drop_table('notification_outbox')
+    sa.Enum(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,30 @@
+"""add content hash to notification outbox
+
+Revision ID: d41f8b2c9e73
+Revises: c7d2e4a18f60
+Create Date: 2026-10-19 14:37:02.118463
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f8b2c9e73'
+down_revision: Union[str, Sequence[str], None] = 'c7d2e4a18f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notification_outbox', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_notification_outbox_content_hash'), 'notification_outbox', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notification_outbox_content_hash'), table_name='notification_outbox')
+    op.drop_column('notification_outbox', 'content_hash')
@@ -10,6 +10,7 @@ from app.services.capteur_service import capteur_service
 from app.services.capteur_parcelle_service import assign_capteur_to_parcelle, desassign_capteur_de_parcelle
 from app.models.capteur import Capteur
 from app.core.dependencies import require_admin, get_current_user
+from app.core.conditional import ConditionalGet
 
 router = APIRouter()
 
@@ -48,11 +49,15 @@ def read_capteurs(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user=Depends(require_admin)
+    current_user=Depends(require_admin),
+    conditional: ConditionalGet = Depends()
 ) -> Any:
     """
     Récupère une liste complète de tous les capteurs. Réservé aux administrateurs.
     """
+    not_modified = conditional.evaluate(capteur_service.get_capteurs_version(db))
+    if not_modified:
+        return not_modified
     capteurs = capteur_service.get_capteurs(db, skip=skip, limit=limit)
     return capteurs
 
@@ -65,11 +70,15 @@ def read_capteurs(
 def read_capteur(
     capteur_id: str,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    conditional: ConditionalGet = Depends()
 ) -> Any:
     """
     Récupère un capteur spécifique par son UUID.
     """
+    not_modified = conditional.evaluate(capteur_service.get_capteurs_version(db, capteur_id=capteur_id))
+    if not_modified:
+        return not_modified
     capteur = capteur_service.get_capteur(db, capteur_id=capteur_id)
     if not capteur:
         raise HTTPException(
@@ -143,11 +152,15 @@ def delete_capteur(
 def read_capteur_by_code(
     code: str,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    conditional: ConditionalGet = Depends()
 ) -> Any:
     """
     Récupère les détails d'un capteur spécifique en utilisant son code unique.
     """
+    not_modified = conditional.evaluate(capteur_service.get_capteurs_version(db, code=code))
+    if not_modified:
+        return not_modified
     capteur = capteur_service.get_capteur_by_code(db, code=code)
     if not capteur:
         raise HTTPException(
@@ -199,10 +212,14 @@ def get_assignments(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    conditional: ConditionalGet = Depends()
 ) -> Any:
     """
     Récupère la liste de toutes les assignations actives entre capteurs et parcelles.
     """
-    from app.services.capteur_parcelle_service import get_all_assignments
+    from app.services.capteur_parcelle_service import get_all_assignments, get_assignments_version
+    not_modified = conditional.evaluate(get_assignments_version(db))
+    if not_modified:
+        return not_modified
     return get_all_assignments(db, skip=skip, limit=limit)
\ No newline at end of file
@@ -7,6 +7,7 @@ from typing import Dict, Any
 import uuid
 from datetime import datetime, timedelta
 
+from app.core.admission import admission
 from app.database import get_db
 from app.models.sensor_data import SensorMeasurements
 from app.models.capteur import Capteur
@@ -22,7 +23,9 @@ router = APIRouter(
 @router.post(
     "/",
     status_code=status.HTTP_200_OK,
-    summary="Webhook ChirpStack pour les événements (up, join, etc.)"
+    summary="Webhook ChirpStack pour les événements (up, join, etc.)",
+    # Débit par clé d'API (ou IP) et plafond d'uplinks traités simultanément
+    dependencies=[Depends(admission("webhook"))]
 )
 async def handle_chirpstack_webhook(
     event: str = Query(...),
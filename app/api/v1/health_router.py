@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.notification_outbox import NotificationOutbox
+from app.core.admission import admission_controller
+from app.core.cache import get_backend as get_cache_backend
+from app.core.circuit_breaker import CircuitState, all_circuit_breakers
+from app.core.dependencies import require_admin
+from app.core.principal_cache import principal_cache
+from app.core.security import login_failures, password_hasher_pool, verified_tokens
+from app.services.notification_outbox import outbox_dispatcher
+from app.services.notification_rate_limiter import notification_rate_limiter
+from app.services.warmup_service import warmup_service
+
+# État interne (hôte du leader, compteurs, disjoncteurs) : réservé aux admins.
+# La sonde de vivacité publique reste /health (main.py).
+router = APIRouter(
+    tags=["Santé"],
+    dependencies=[Depends(require_admin)]
+)
+
+
+@router.get(
+    "/upstreams",
+    summary="État des services externes (disjoncteurs)"
+)
+async def get_upstreams_health():
+    """
+    État et métriques des disjoncteurs protégeant les services externes
+    (ML, système expert, ChirpStack) : état du circuit, taux d'échec sur la
+    fenêtre glissante, timeout adaptatif courant et latences observées.
+    """
+    upstreams = {name: breaker.snapshot() for name, breaker in all_circuit_breakers().items()}
+    degraded = any(u["state"] != CircuitState.CLOSED.value for u in upstreams.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "upstreams": upstreams
+    }
+
+
+@router.get(
+    "/warmup",
+    summary="Préchauffage des services IA"
+)
+async def get_warmup_status():
+    """
+    État du maintien en éveil des services hébergés sur Render : délai
+    d'inactivité estimé, intervalle de ping courant et histogrammes de
+    latence à froid / à chaud.
+    """
+    return warmup_service.snapshot()
+
+
+@router.get(
+    "/scheduler",
+    summary="État du scheduler de recommandations"
+)
+async def get_scheduler_status():
+    """
+    Leadership du scheduler dans le cluster (processus leader, bail, nombre
+    de bascules), bilan du dernier lot et durées des derniers lots.
+    """
+    from app.services.scheduler_service import get_scheduler_service
+    return get_scheduler_service().snapshot()
+
+
+@router.get(
+    "/outbox",
+    summary="État de l'outbox des notifications"
+)
+async def get_outbox_status(db: Session = Depends(get_db)):
+    """
+    Nombre de notifications par canal et par statut (en attente, en cours,
+    envoyées, abandonnées) et compteurs du dispatcher de ce processus.
+    """
+    rows = db.query(
+        NotificationOutbox.channel,
+        NotificationOutbox.status,
+        func.count(NotificationOutbox.id)
+    ).group_by(NotificationOutbox.channel, NotificationOutbox.status).all()
+
+    channels = {}
+    for channel, status, count in rows:
+        channels.setdefault(channel, {})[status.value] = count
+    return {
+        "channels": channels,
+        "dispatcher": outbox_dispatcher.snapshot()
+    }
+
+
+@router.get(
+    "/notifications",
+    summary="Débit des notifications sortantes"
+)
+async def get_notifications_rate():
+    """
+    Limitation de débit par canal : débit autorisé, messages admis, messages
+    ralentis, file d'attente courante et maximale, temps d'attente cumulé.
+    """
+    return notification_rate_limiter.snapshot()
+
+
+@router.get(
+    "/auth",
+    summary="Authentification : pool bcrypt et cache des utilisateurs"
+)
+async def get_auth_status():
+    """
+    Hachages bcrypt en cours et refusés (limite d'admission), adresses IP
+    suivies pour les échecs de connexion, efficacité des caches des
+    utilisateurs authentifiés et des tokens vérifiés.
+    """
+    return {
+        "password_hasher": password_hasher_pool.snapshot(),
+        "login_failure_ips": len(login_failures),
+        "principal_cache": principal_cache.snapshot(),
+        "verified_tokens": verified_tokens.snapshot()
+    }
+
+
+@router.get(
+    "/cache",
+    summary="Cache des données de référence"
+)
+async def get_cache_status():
+    """
+    Backend du cache (mémoire ou SQLite partagé), nombre d'entrées, succès,
+    échecs et évictions.
+    """
+    return get_cache_backend().snapshot()
+
+
+@router.get(
+    "/admission",
+    summary="Contrôle d'admission des endpoints exposés"
+)
+async def get_admission_status():
+    """
+    Par classe d'endpoints (webhook, auth, predict) : débit autorisé,
+    requêtes admises, refus pour débit (429) et pour concurrence (503),
+    requêtes en cours et en attente.
+    """
+    return admission_controller.snapshot()
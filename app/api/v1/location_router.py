@@ -5,6 +5,7 @@ from app.database import get_db
 from app.services.location_service import LocaliteService
 from app.schemas.location import LocaliteCreate, LocaliteUpdate, LocaliteResponse, Continent, ClimateZone
 from app.core.dependencies import get_current_user
+from app.core.conditional import ConditionalGet
 
 router = APIRouter(
     prefix="/localites",
@@ -52,6 +53,7 @@ async def get_all_localites(
     pays: Optional[str] = Query(None, description="Filtrer par pays"),
     ville: Optional[str] = Query(None, description="Filtrer par ville"),
     search: Optional[str] = Query(None, description="Recherche globale (nom, ville, pays, région)"),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
@@ -68,6 +70,9 @@ async def get_all_localites(
     - **skip**: Nombre d'éléments à ignorer
     - **limit**: Nombre maximum d'éléments à retourner (max 1000)
     """
+    not_modified = conditional.evaluate(LocaliteService.get_localites_version(db))
+    if not_modified:
+        return not_modified
     return LocaliteService.get_all_localites(
         db, skip, limit, continent, climate_zone, pays, ville, search
     )
@@ -78,6 +83,7 @@ async def get_all_localites(
     summary="Statistiques des localités"
 )
 async def get_localite_statistics(
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
@@ -88,6 +94,9 @@ async def get_localite_statistics(
     - Répartition par continent
     - Répartition par zone climatique
     """
+    not_modified = conditional.evaluate(LocaliteService.get_localites_version(db))
+    if not_modified:
+        return not_modified
     return LocaliteService.get_localite_statistics(db)
 
 
@@ -96,6 +105,7 @@ async def get_localite_statistics(
     summary="Liste des pays disponibles"
 )
 async def get_countries_list(
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
@@ -103,6 +113,9 @@ async def get_countries_list(
 
     Utile pour remplir des listes déroulantes ou filtres.
     """
+    not_modified = conditional.evaluate(LocaliteService.get_localites_version(db))
+    if not_modified:
+        return not_modified
     return LocaliteService.get_countries_list(db)
 
 
@@ -115,6 +128,7 @@ async def get_countries_list(
 )
 async def get_localites_by_country(
     pays: str,
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
@@ -122,6 +136,9 @@ async def get_localites_by_country(
 
     Les résultats sont triés par nom de ville.
     """
+    not_modified = conditional.evaluate(LocaliteService.get_localites_version(db))
+    if not_modified:
+        return not_modified
     return LocaliteService.get_localites_by_country(db, pays)
 
 
@@ -132,11 +149,15 @@ async def get_localites_by_country(
 )
 async def get_localite(
     localite_id: str,
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer les détails complets d'une localité spécifique.
     """
+    not_modified = conditional.evaluate(LocaliteService.get_localites_version(db))
+    if not_modified:
+        return not_modified
     return LocaliteService.get_localite_by_id(db, localite_id)
 
 
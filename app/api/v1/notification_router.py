@@ -4,6 +4,8 @@ from app.schemas.notification import NotificationTestRequest, NotificationRespon
 from app.routers.auth_router import get_current_user
 from app.models.user import User, NotificationMode
 from typing import List
+from app.core.cache import cached
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -60,6 +62,7 @@ async def test_notification(
         )
 
 @router.get("/modes", response_model=List[str], summary="Liste des modes de notification supportés")
+@cached("notification_modes", ttl=settings.NOTIFICATION_MODES_CACHE_TTL)
 async def get_supported_modes():
     """Retourne la liste des canaux de communication disponibles."""
     return [mode.value for mode in NotificationMode]
@@ -4,6 +4,7 @@ from typing import List
 from app.database import get_db
 from app.services.parcelle_service import ParcelleService
 from app.schemas.parcelle import ParcelleCreate, ParcelleUpdate, ParcelleResponse
+from app.core.conditional import ConditionalGet
 from app.core.dependencies import get_current_user
 
 router = APIRouter(
@@ -45,11 +46,17 @@ async def get_all_parcelles(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer la liste de toutes les parcelles.
     """
+    not_modified = conditional.evaluate(
+        ParcelleService.get_parcelles_version(db), scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return ParcelleService.get_all_parcelles_admin(db, skip=skip, limit=limit)
 
 
@@ -63,11 +70,18 @@ async def get_parcelles_by_terrain(
     skip: int = Query(0, ge=0, description="Nombre d'éléments à ignorer"),
     limit: int = Query(100, ge=1, le=100, description="Nombre maximum d'éléments"),
     current_user: dict = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer toutes les parcelles d'un terrain spécifique.
     """
+    not_modified = conditional.evaluate(
+        ParcelleService.get_parcelles_version(db, user_id=str(current_user.id), terrain_id=terrain_id),
+        scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return ParcelleService.get_parcelles_by_terrain(
         db, terrain_id, str(current_user.id), skip, limit
     )
@@ -80,11 +94,18 @@ async def get_parcelles_by_terrain(
 async def get_parcelle_by_code(
     code: str,
     current_user: dict = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer les détails d'une parcelle en utilisant son code unique (ex: P-001).
     """
+    not_modified = conditional.evaluate(
+        ParcelleService.get_parcelles_version(db, user_id=str(current_user.id), code=code),
+        scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return ParcelleService.get_parcelle_by_code(db, code, str(current_user.id))
 
     
@@ -113,11 +134,18 @@ async def get_parcelle_statistics(
 async def get_parcelle(
     parcelle_id: str,
     current_user: dict = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer les détails d'une parcelle spécifique.
     """
+    not_modified = conditional.evaluate(
+        ParcelleService.get_parcelles_version(db, user_id=str(current_user.id), parcelle_id=parcelle_id),
+        scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return ParcelleService.get_parcelle_by_id(db, parcelle_id, str(current_user.id))
 
 
@@ -9,6 +9,8 @@ from app.schemas.recommendation import (
     RecommendationResponse
 )
 from app.core.dependencies import get_current_user
+from app.core.conditional import ConditionalGet
+from app.core.admission import admission
 from app.services.ml_service import MLService
 from app.services.expert_system_service import ExpertSystemService
 from app.schemas.ai_integration import (
@@ -33,11 +35,17 @@ async def get_all_recommendations(
     limit: int = Query(100, ge=1, le=100, description="Nombre maximum d'éléments"),
     priorite: Optional[str] = Query(None, description="Filtrer par priorité"),
     current_user: dict = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer l'historique de toutes les recommandations de l'utilisateur connecté.
     """
+    not_modified = conditional.evaluate(
+        RecommendationService.get_recommendations_version(db, str(current_user.id)), scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return RecommendationService.get_all_recommendations(
         db, str(current_user.id), skip, limit, priorite
     )
@@ -54,11 +62,17 @@ async def get_recommendations_by_parcelle(
     limit: int = Query(100, ge=1, le=100, description="Nombre maximum d'éléments"),
     priorite: Optional[str] = Query(None, description="Filtrer par priorité"),
     current_user: dict = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer l'historique des recommandations d'une parcelle spécifique.
     """
+    not_modified = conditional.evaluate(
+        RecommendationService.get_recommendations_version(db, str(current_user.id), parcelle_id=parcelle_id), scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return RecommendationService.get_recommendations_by_parcelle(
         db, parcelle_id, str(current_user.id), skip, limit, priorite
     )
@@ -72,11 +86,17 @@ async def get_recommendations_by_parcelle(
 async def get_recommendation(
     recommendation_id: str,
     current_user: dict = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer les détails d'une recommandation archivée.
     """
+    not_modified = conditional.evaluate(
+        RecommendationService.get_recommendations_version(db, str(current_user.id), recommendation_id=recommendation_id), scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return RecommendationService.get_recommendation_by_id(
         db, recommendation_id, str(current_user.id)
     )
@@ -85,7 +105,9 @@ async def get_recommendation(
 @router.post(
     "/predict-crop",
     response_model=UnifiedRecommendationResponse,
-    summary="Recommandation de culture (ML + Système Expert)"
+    summary="Recommandation de culture (ML + Système Expert)",
+    # Débit par utilisateur et plafond d'appels simultanés aux services IA
+    dependencies=[Depends(admission("predict"))]
 )
 async def predict_crop_unified(
     request_data: UnifiedRecommendationRequest,
@@ -110,7 +132,8 @@ async def predict_crop_unified(
 @router.post(
     "/parcelle/{parcelle_id}/predict-crop",
     response_model=UnifiedRecommendationResponse,
-    summary="Prédire la culture pour une parcelle (utilise les dernières mesures)"
+    summary="Prédire la culture pour une parcelle (utilise les dernières mesures)",
+    dependencies=[Depends(admission("predict"))]
 )
 async def predict_parcelle_crop(
     parcelle_id: str,
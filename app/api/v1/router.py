@@ -8,7 +8,8 @@ from app.api.v1 import (
     sensor_data_router,
     chirpstack_router,
     admin_router,
-    notification_router
+    notification_router,
+    health_router
 )
 from app.routers import auth_router, users_router
 
@@ -106,3 +107,14 @@ api_router.include_router(
     prefix="/notifications",
     tags=["Notifications"]
 )
+
+# ============================================================================
+# SUPERVISION
+# ============================================================================
+
+# Santé des services externes
+api_router.include_router(
+    health_router.router,
+    prefix="/health",
+    tags=["Santé"]
+)
@@ -4,7 +4,8 @@ from typing import List, Optional
 from app.database import get_db
 from app.services.terrain_service import TerrainService
 from app.schemas.terrain import TerrainCreate, TerrainUpdate, TerrainResponse
-from app.core.dependencies import get_current_user
+from app.core.conditional import ConditionalGet
+from app.core.dependencies import TokenPrincipal, get_current_principal, get_current_user
 
 router = APIRouter(
     prefix="/terrains",
@@ -41,14 +42,21 @@ async def create_terrain(
 async def get_all_terrains(
     skip: int = Query(0, ge=0, description="Nombre d'éléments à ignorer"),
     limit: int = Query(100, ge=1, le=100, description="Nombre maximum d'éléments"),
-    current_user: dict = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer tous les terrains de l'utilisateur connecté.
     
-    Possibilité de paginer les résultats.
+    Possibilité de paginer les résultats. Supporte If-None-Match /
+    If-Modified-Since (304 si rien n'a changé).
     """
+    not_modified = conditional.evaluate(
+        *TerrainService.get_terrains_version(db, str(current_user.id)), scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return TerrainService.get_all_terrains(
         db, str(current_user.id), skip, limit
     )
@@ -59,7 +67,7 @@ async def get_all_terrains(
     summary="Statistiques des terrains"
 )
 async def get_terrain_statistics(
-    current_user: dict = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """
@@ -77,12 +85,18 @@ async def get_terrain_statistics(
 )
 async def get_terrain(
     terrain_id: str,
-    current_user: dict = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
+    conditional: ConditionalGet = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Récupérer les détails d'un terrain spécifique.
     """
+    not_modified = conditional.evaluate(
+        *TerrainService.get_terrains_version(db, str(current_user.id), terrain_id), scope=(current_user.id,)
+    )
+    if not_modified:
+        return not_modified
     return TerrainService.get_terrain_by_id(db, terrain_id, str(current_user.id))
 
 
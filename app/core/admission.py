@@ -0,0 +1,378 @@
+"""
+Contrôle d'admission des endpoints exposés.
+
+Chaque endpoint protégé appartient à une classe (webhook, auth, predict).
+Une requête est admise en deux temps :
+
+1. Débit : un seau à jetons par identité et par classe. L'identité est la
+   clé d'API (en-tête ADMISSION_API_KEY_HEADER) si elle figure parmi
+   ADMISSION_API_KEYS, sinon l'utilisateur du token Bearer, sinon l'adresse
+   IP. Une clé inconnue est ignorée : changer de clé à chaque requête ne
+   donne pas un seau neuf. Seau vide : 429 avec Retry-After.
+2. Concurrence : un plafond global de requêtes simultanées par classe
+   (routes coûteuses : pool de la base, budget des services IA). Au-delà,
+   la requête attend une place dans une file bornée pendant au plus
+   queue_timeout secondes ; file pleine ou délai dépassé : 503 avec
+   Retry-After.
+
+Les compteurs de débit sont rangés dans un magasin interchangeable :
+"memory" (par processus, par défaut) ou "sqlite" (fichier partagé par les
+workers d'une même machine, substitut local d'un magasin partagé). Le
+plafond de concurrence reste propre à chaque processus.
+
+Les refus sont comptés par classe et exposés par /health/admission.
+"""
+import asyncio
+import hashlib
+import hmac
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.rate_limit import KeyedTokenBuckets, client_ip
+from app.core.sqlite_store import ThreadLocalSQLite
+
+
+@dataclass(frozen=True)
+class EndpointClass:
+    """Politique d'admission d'une classe d'endpoints"""
+    name: str
+    rate: float  # Jetons/seconde par identité (0 = illimité)
+    burst: float  # Capacité du seau
+    max_concurrency: int = 0  # Requêtes simultanées (0 = pas de plafond)
+    max_queue: int = 0  # Requêtes en attente d'une place (0 = refus immédiat)
+    queue_timeout: float = 0.0  # Secondes d'attente maximale dans la file
+
+
+class MemoryCounterStore:
+    """
+    Seaux à jetons en mémoire du processus : un KeyedTokenBuckets (LRU borné)
+    par politique de débit, c'est-à-dire par classe d'endpoints.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._classes: Dict[Tuple[float, float], KeyedTokenBuckets] = {}
+        self._lock = threading.Lock()
+
+    def _buckets(self, rate: float, burst: float) -> KeyedTokenBuckets:
+        with self._lock:
+            buckets = self._classes.get((rate, burst))
+            if buckets is None:
+                buckets = KeyedTokenBuckets(rate, burst, max_keys=self.max_keys, clock=self._clock)
+                self._classes[(rate, burst)] = buckets
+            return buckets
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """Consomme un jeton ; retourne 0 si admis, sinon le délai avant le prochain jeton"""
+        bucket = self._buckets(rate, burst).get(key)
+        if bucket.try_acquire(cost):
+            return 0.0
+        return bucket.delay_for(cost)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._classes.clear()
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for buckets in list(self._classes.values()))
+
+
+class SQLiteCounterStore:
+    """Seaux à jetons dans un fichier SQLite partagé par les processus d'une machine"""
+
+    # Au-delà, un seau est plein depuis longtemps : la ligne est équivalente à son absence
+    IDLE_SECONDS = 3600.0
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._db = ThreadLocalSQLite(path)
+        self._takes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS admission_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._db.connection()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        if rate <= 0:
+            return 0.0
+        conn = self._connection()
+        now = self._clock()
+        # Lecture et écriture du seau dans une même transaction (verrou d'écriture immédiat)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM admission_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                delay = 0.0
+            else:
+                delay = (cost - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO admission_buckets VALUES (?, ?, ?)", (key, tokens, now))
+            self._takes += 1
+            if self._takes % 1000 == 0:
+                conn.execute("DELETE FROM admission_buckets WHERE updated < ?", (now - self.IDLE_SECONDS,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return delay
+
+    def reset(self) -> None:
+        self._connection().execute("DELETE FROM admission_buckets")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM admission_buckets").fetchone()[0]
+
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """
+    Plafond de requêtes simultanées avec file d'attente bornée. Les places
+    libérées sont transmises aux requêtes en attente dans leur ordre
+    d'arrivée (y compris depuis une autre boucle d'événements).
+    """
+
+    def __init__(self, limit: int, max_queue: int = 0, queue_timeout: float = 0.0):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """True si une place est obtenue (immédiatement ou après attente), False sinon"""
+        if self.limit <= 0:
+            return True
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return True
+            if len(self._waiters) >= self.max_queue or self.queue_timeout <= 0:
+                self.rejected += 1
+                return False
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self.queued += 1
+
+        try:
+            await asyncio.wait_for(waiter[1], self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            if self._withdraw(waiter):
+                with self._lock:
+                    self.timed_out += 1
+                return False
+            # Place transmise au moment de l'expiration : elle nous appartient
+            return True
+        except asyncio.CancelledError:
+            if not self._withdraw(waiter):
+                self.release()
+            raise
+
+    def _withdraw(self, waiter) -> bool:
+        """Retire une requête de la file ; False si une place lui a déjà été transmise"""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+                return True
+            except ValueError:
+                return False
+
+    def release(self) -> None:
+        if self.limit <= 0:
+            return
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    # La place passe directement à la requête suivante (active inchangé)
+                    loop.call_soon_threadsafe(_grant, future)
+                    return
+                except RuntimeError:
+                    # Boucle fermée : la requête en attente a disparu
+                    continue
+            self.active -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out
+        }
+
+
+def create_store(name: str):
+    if name == "memory":
+        return MemoryCounterStore()
+    if name == "sqlite":
+        return SQLiteCounterStore(settings.ADMISSION_STORE_PATH)
+    raise ValueError(f"Magasin de compteurs inconnu: {name}")
+
+
+def _key_digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def known_api_key(api_key: str) -> bool:
+    """La clé figure parmi ADMISSION_API_KEYS (comparaison à temps constant)"""
+    digest = _key_digest(api_key)
+    return any(hmac.compare_digest(digest, _key_digest(known)) for known in settings.ADMISSION_API_KEYS)
+
+
+def request_identity(request: Request) -> str:
+    """Clé d'API reconnue, sinon utilisateur du token Bearer, sinon adresse IP"""
+    api_key = request.headers.get(settings.ADMISSION_API_KEY_HEADER)
+    if api_key and known_api_key(api_key):
+        return "key:" + _key_digest(api_key)[:32]
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        from app.core.security import decode_token
+        # Token déjà vérifié : servi par le cache des tokens (voir security.verified_tokens)
+        payload = decode_token(authorization[7:].strip())
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{client_ip(request)}"
+
+
+class AdmissionController:
+    """Applique les politiques d'admission par classe d'endpoints"""
+
+    def __init__(self, classes: Dict[str, EndpointClass], store=None):
+        self.classes = classes
+        self._store = store
+        self.limiters = {
+            name: ConcurrencyLimiter(policy.max_concurrency, policy.max_queue, policy.queue_timeout)
+            for name, policy in classes.items()
+        }
+        self.admitted = {name: 0 for name in classes}
+        self.rate_limited = {name: 0 for name in classes}
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        # Magasin ouvert au premier usage (pas à l'import)
+        if self._store is None:
+            self._store = create_store(settings.ADMISSION_STORE)
+        return self._store
+
+    def check_rate(self, name: str, identity: str) -> None:
+        policy = self.classes[name]
+        if policy.rate <= 0:
+            return
+        delay = self.store.take(f"{name}:{identity}", policy.rate, policy.burst)
+        if delay > 0:
+            with self._lock:
+                self.rate_limited[name] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(delay)))}
+            )
+
+    async def enter(self, name: str, request: Request) -> None:
+        """Admet la requête ou lève 429 (débit) / 503 (concurrence)"""
+        self.check_rate(name, request_identity(request))
+        limiter = self.limiters[name]
+        if not await limiter.acquire():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, retry later",
+                headers={"Retry-After": str(max(1, math.ceil(limiter.queue_timeout or 1)))}
+            )
+        with self._lock:
+            self.admitted[name] += 1
+
+    def leave(self, name: str) -> None:
+        self.limiters[name].release()
+
+    def reset(self) -> None:
+        """Vide les compteurs de débit (tests)"""
+        self.store.reset()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "store": settings.ADMISSION_STORE,
+            "classes": {
+                name: {
+                    "rate": policy.rate,
+                    "burst": policy.burst,
+                    "admitted": self.admitted[name],
+                    "rejected_rate": self.rate_limited[name],
+                    "rejected_concurrency": self.limiters[name].rejected + self.limiters[name].timed_out,
+                    "concurrency": self.limiters[name].snapshot()
+                }
+                for name, policy in self.classes.items()
+            }
+        }
+
+
+admission_controller = AdmissionController({
+    "webhook": EndpointClass(
+        "webhook",
+        rate=settings.ADMISSION_WEBHOOK_RATE,
+        burst=settings.ADMISSION_WEBHOOK_BURST,
+        max_concurrency=settings.ADMISSION_WEBHOOK_MAX_CONCURRENCY,
+        max_queue=settings.ADMISSION_WEBHOOK_MAX_QUEUE,
+        queue_timeout=settings.ADMISSION_WEBHOOK_QUEUE_TIMEOUT
+    ),
+    "auth": EndpointClass(
+        "auth",
+        rate=settings.ADMISSION_AUTH_RATE,
+        burst=settings.ADMISSION_AUTH_BURST
+    ),
+    "predict": EndpointClass(
+        "predict",
+        rate=settings.ADMISSION_PREDICT_RATE,
+        burst=settings.ADMISSION_PREDICT_BURST,
+        max_concurrency=settings.ADMISSION_PREDICT_MAX_CONCURRENCY,
+        max_queue=settings.ADMISSION_PREDICT_MAX_QUEUE,
+        queue_timeout=settings.ADMISSION_PREDICT_QUEUE_TIMEOUT
+    ),
+})
+
+
+def admission(name: str, controller: Optional[AdmissionController] = None):
+    """
+    Dépendance FastAPI : à placer dans dependencies=[...] du décorateur de
+    route pour être évaluée avant la session de base et l'authentification.
+    """
+    async def dependency(request: Request):
+        active = controller or admission_controller
+        if not settings.ADMISSION_ENABLED:
+            yield
+            return
+        await active.enter(name, request)
+        try:
+            yield
+        finally:
+            active.leave(name)
+    return dependency
@@ -0,0 +1,263 @@
+"""
+Cache côté serveur des données de référence.
+
+Le décorateur @cached met en cache le résultat d'une route ou d'une méthode
+de service pendant ttl secondes. La clé est dérivée des arguments d'appel
+(paramètres de requête, utilisateur courant), la session SQLAlchemy est
+ignorée ; une fonction key peut la remplacer. Les entrées sont rangées par
+espace de noms : les chemins d'écriture appellent invalidate(namespace)
+après leur commit.
+
+Le backend est interchangeable :
+  - "memory" : LRU en mémoire du processus (par défaut) ;
+  - "sqlite" : fichier SQLite partagé par les workers d'une même machine,
+    substitut local d'un cache partagé (valeurs sérialisées, expiration
+    en temps réel). Une invalidation y est vue par tous les processus.
+
+Une lecture commencée avant une écriture peut encore ranger l'ancienne
+valeur après l'invalidation : l'écart est borné par le TTL.
+"""
+import asyncio
+import functools
+import inspect
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sqlite_store import ThreadLocalSQLite
+
+MISS = object()
+
+
+class MemoryCacheBackend:
+    """LRU borné en nombre d'entrées, avec expiration par entrée"""
+
+    def __init__(self, max_size: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[(namespace, key)]
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+            return entry[1]
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[(namespace, key)] = (self._clock() + ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+class SQLiteCacheBackend:
+    """Cache partagé entre processus via un fichier SQLite (valeurs picklées)"""
+
+    def __init__(self, path: str, max_size: int = 1024, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_size = max_size
+        self._clock = clock
+        self._db = ThreadLocalSQLite(path)
+        self.hits = 0
+        self.misses = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._db.connection()
+
+    def get(self, namespace: str, key: str) -> Any:
+        conn = self._connection()
+        now = self._clock()
+        row = conn.execute(
+            "SELECT value FROM response_cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, now)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISS
+        conn.execute(
+            "UPDATE response_cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, namespace, key)
+        )
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        conn = self._connection()
+        now = self._clock()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now + ttl, now)
+        )
+        # Entrées expirées puis moins récemment lues au-delà de max_size
+        conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM response_cache WHERE rowid IN ("
+            "SELECT rowid FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,)
+        )
+
+    def invalidate(self, namespace: str) -> None:
+        self._connection().execute("DELETE FROM response_cache WHERE namespace = ?", (namespace,))
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM response_cache")
+
+    def snapshot(self) -> Dict[str, Any]:
+        size = self._connection().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_SIZE)
+    if name == "sqlite":
+        return SQLiteCacheBackend(settings.RESPONSE_CACHE_PATH, settings.RESPONSE_CACHE_SIZE)
+    raise ValueError(f"Backend de cache inconnu: {name}")
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_backend(settings.RESPONSE_CACHE_BACKEND)
+    return _backend
+
+
+def set_backend(backend) -> None:
+    """Remplace le backend (tests, configuration au démarrage)"""
+    global _backend
+    _backend = backend
+
+
+def invalidate(namespace: str) -> None:
+    """À appeler après le commit d'une écriture qui rend l'espace de noms obsolète"""
+    get_backend().invalidate(namespace)
+
+
+def _key_part(name: str, value: Any) -> Any:
+    if name == "current_user":
+        # Utilisateur ORM ou TokenPrincipal : seul l'identifiant compte
+        return getattr(value, "id", value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def default_key(arguments: Dict[str, Any]) -> str:
+    """Clé dérivée des arguments, hors session SQLAlchemy"""
+    parts = tuple(
+        (name, _key_part(name, value))
+        for name, value in arguments.items()
+        if not isinstance(value, Session)
+    )
+    return repr(parts)
+
+
+def cached(
+    namespace: str,
+    ttl: float,
+    key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    serialize: Optional[Callable[[Any], Any]] = None
+):
+    """
+    Met en cache le résultat de la fonction décorée (synchrone ou async).
+
+    key reçoit les arguments liés par nom et retourne la clé ; serialize
+    convertit le résultat avant stockage (objets ORM -> dictionnaires, qui
+    ne dépendent plus de la session). ttl <= 0 désactive le cache.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        # Plusieurs fonctions partagent un espace de noms : la clé commence par la fonction
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        def make_key(args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = repr(key(bound.arguments)) if key is not None else default_key(bound.arguments)
+            return f"{name}:{arguments}"
+
+        def store(cache_key: str, result: Any) -> Any:
+            if serialize is not None:
+                result = serialize(result)
+            get_backend().set(namespace, cache_key, result, ttl)
+            return result
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if ttl <= 0:
+                    return await fn(*args, **kwargs)
+                cache_key = make_key(args, kwargs)
+                value = get_backend().get(namespace, cache_key)
+                if value is not MISS:
+                    return value
+                return store(cache_key, await fn(*args, **kwargs))
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if ttl <= 0:
+                    return fn(*args, **kwargs)
+                cache_key = make_key(args, kwargs)
+                value = get_backend().get(namespace, cache_key)
+                if value is not MISS:
+                    return value
+                return store(cache_key, fn(*args, **kwargs))
+
+        wrapper.cache_namespace = namespace
+        return wrapper
+    return decorator
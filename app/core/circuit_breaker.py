@@ -0,0 +1,247 @@
+"""
+Disjoncteurs (circuit breakers) pour les services externes.
+
+Chaque service amont (ML, système expert, ChirpStack) possède son propre
+disjoncteur :
+
+- CLOSED    : les appels passent, les résultats alimentent une fenêtre glissante.
+- OPEN      : le taux d'échec a dépassé le seuil, les appels échouent
+              immédiatement (CircuitOpenError) pendant CIRCUIT_OPEN_SECONDS.
+- HALF_OPEN : quelques appels de test sont autorisés ; un succès referme le
+              circuit, un échec le rouvre.
+
+Le disjoncteur mesure aussi les latences observées et en déduit un timeout
+adaptatif (percentile * multiplicateur, borné) à la place des 120 s fixes.
+"""
+import enum
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Levée lorsqu'un appel est refusé car le circuit est ouvert"""
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"Circuit '{name}' ouvert: service temporairement désactivé")
+
+
+class CircuitBreaker:
+    """Disjoncteur à fenêtre glissante avec timeout adaptatif"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        min_timeout: float = 2.0,
+        max_timeout: float = 120.0,
+        timeout_multiplier: float = 3.0,
+        latency_percentile: float = 0.95,
+        latency_samples: int = 100,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.latency_percentile = latency_percentile
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+
+        # Compteurs cumulés (exposés sur /health/upstreams)
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    # ------------------------------------------------------------------
+    # État
+    # ------------------------------------------------------------------
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_in_flight = 0
+        return self._state
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, now: float) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = now
+        self._half_open_in_flight = 0
+        self.times_opened += 1
+
+    def failure_rate(self) -> float:
+        with self._lock:
+            self._prune(self._clock())
+            if not self._outcomes:
+                return 0.0
+            return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    # ------------------------------------------------------------------
+    # Appels
+    # ------------------------------------------------------------------
+
+    def allow_request(self) -> bool:
+        """Indique si un appel peut être tenté (réserve un essai en HALF_OPEN)"""
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return True
+            if state == CircuitState.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self.total_rejected += 1
+            return False
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        with self._lock:
+            now = self._clock()
+            self.total_calls += 1
+            if latency is not None:
+                self._latencies.append(latency)
+            if self._current_state() == CircuitState.HALF_OPEN:
+                self._state = CircuitState.CLOSED
+                self._half_open_in_flight = 0
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._prune(now)
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        with self._lock:
+            now = self._clock()
+            self.total_calls += 1
+            self.total_failures += 1
+            if latency is not None:
+                self._latencies.append(latency)
+            state = self._current_state()
+            if state == CircuitState.HALF_OPEN:
+                self._open(now)
+                return
+            self._outcomes.append((now, False))
+            self._prune(now)
+            if state == CircuitState.CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, ok in self._outcomes if not ok)
+                if failures / len(self._outcomes) >= self.failure_rate_threshold:
+                    self._open(now)
+
+    def release(self) -> None:
+        """Abandonne un appel sans résultat (annulation) : libère l'essai réservé en HALF_OPEN"""
+        with self._lock:
+            if self._current_state() == CircuitState.HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    @contextmanager
+    def protect(self):
+        """
+        Encadre un appel amont : refuse immédiatement si le circuit est ouvert,
+        compte toute exception comme un échec et mesure la latence. Une
+        annulation (asyncio.CancelledError : budget de latence dépassé,
+        client déconnecté) ne dit rien du service amont : elle n'est pas
+        comptée et sa latence tronquée n'est pas retenue.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self.name)
+        started = self._clock()
+        try:
+            yield
+        except Exception:
+            self.record_failure(self._clock() - started)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.record_success(self._clock() - started)
+
+    # ------------------------------------------------------------------
+    # Timeout adaptatif et métriques
+    # ------------------------------------------------------------------
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        with self._lock:
+            if not self._latencies:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(int(quantile * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+    def timeout(self) -> float:
+        """Timeout à appliquer au prochain appel (max_timeout tant que l'historique est insuffisant)"""
+        if len(self._latencies) < self.min_calls:
+            return self.max_timeout
+        observed = self.latency_quantile(self.latency_percentile)
+        return max(self.min_timeout, min(self.max_timeout, observed * self.timeout_multiplier))
+
+    def snapshot(self) -> dict:
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "failure_rate": round(self.failure_rate(), 3),
+            "timeout_seconds": round(self.timeout(), 2),
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str, **overrides) -> CircuitBreaker:
+    """Retourne (en le créant au besoin) le disjoncteur associé à un service amont"""
+    if name not in _breakers:
+        options = {
+            "failure_rate_threshold": settings.CIRCUIT_FAILURE_RATE_THRESHOLD,
+            "window_seconds": settings.CIRCUIT_WINDOW_SECONDS,
+            "min_calls": settings.CIRCUIT_MIN_CALLS,
+            "open_seconds": settings.CIRCUIT_OPEN_SECONDS,
+            "min_timeout": settings.UPSTREAM_MIN_TIMEOUT,
+            "max_timeout": settings.UPSTREAM_MAX_TIMEOUT,
+        }
+        options.update(overrides)
+        _breakers[name] = CircuitBreaker(name, **options)
+    return _breakers[name]
+
+
+def all_circuit_breakers() -> Dict[str, CircuitBreaker]:
+    return dict(_breakers)
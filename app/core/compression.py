@@ -0,0 +1,251 @@
+"""
+Compression des réponses HTTP (gzip, brotli).
+
+CompressionMiddleware est un middleware ASGI pur : il ne relit pas le corps
+produit par les routes, il compresse les messages http.response.body au fil
+de l'eau. Les premiers octets sont retenus jusqu'au seuil minimum_size :
+une réponse entière plus petite part non compressée (le gain ne couvre pas
+l'en-tête gzip sur un petit JSON), une réponse plus grande ou en streaming
+est compressée morceau par morceau (flush à chaque morceau pour que le
+client reçoive les données sans attendre la fin).
+
+L'enveloppe ApiResponse est appliquée à l'encodage (EnvelopeJSONResponse),
+donc avant ce middleware : c'est le corps final qui est compressé, une seule
+fois. Les réponses qui portent déjà un Content-Encoding (charges
+précompressées, voir PrecompressedPayload) sont transmises telles quelles.
+
+Brotli est utilisé s'il est installé (paquet optionnel "brotli") et accepté
+par le client ; sinon gzip.
+"""
+import gzip
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Dépendance optionnelle
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """'gzip, br;q=0.8, *;q=0' -> {'gzip': 1.0, 'br': 0.8, '*': 0.0}"""
+    encodings = {}
+    for part in value.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name.strip().lower()] = q
+    return encodings
+
+
+def choose_encoding(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """Encodage préféré du client parmi ceux disponibles (ordre de préférence serveur à q égal)"""
+    accepted = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+class StreamCompressor:
+    """Compresseur incrémental commun à gzip et brotli"""
+
+    def __init__(self, encoding: str, gzip_level: int = 6, brotli_quality: int = 4):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 : en-tête et somme de contrôle gzip
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compresse un morceau et vide le tampon (le client peut le décoder aussitôt)"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress_bytes(data: bytes, encoding: str, gzip_level: int = 9, brotli_quality: int = 11) -> bytes:
+    """Compression en une fois (charges statiques : niveau maximal)"""
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compresse les réponses dont le type s'y prête, au-delà d'une taille minimale"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """État d'une réponse : en-têtes retenus jusqu'à la décision de compresser"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.buffer.append(body)
+            self.buffered += len(body)
+            if self.buffered < self.middleware.minimum_size:
+                if more_body:
+                    return
+                # Réponse complète sous le seuil : envoyée telle quelle
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": b"".join(self.buffer)})
+                return
+            body, self.buffer = b"".join(self.buffer), []
+            self.compressor = StreamCompressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            compressed = self.compressor.compress(body)
+            if not more_body:
+                compressed += self.compressor.finish()
+            await self._send(self._compressed_start(compressed, more_body))
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        compressed = self.compressor.compress(body)
+        if not more_body:
+            compressed += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _compressed_start(self, first_chunk: bytes, more_body: bool) -> Message:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(first_chunk))
+        # Le corps transmis diffère octet par octet : un ETag fort devient faible
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        return {**self.start, "headers": headers.raw}
+
+
+class PrecompressedPayload:
+    """
+    Charge statique encodée une fois, avec ses variantes gzip et brotli
+    calculées au même moment ; chaque requête choisit une variante sans
+    recompresser.
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.media_type = media_type
+        self.variants: Dict[Optional[str], bytes] = {None: body}
+        for encoding in available_encodings():
+            self.variants[encoding] = compress_bytes(body, encoding)
+
+    def response(self, request: Request) -> Response:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), tuple(
+            encoding for encoding in self.variants if encoding is not None
+        ))
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
+
+    def sizes(self) -> Dict[str, int]:
+        return {encoding or "identity": len(body) for encoding, body in self.variants.items()}
+
+
+def install_precompressed_openapi(app: FastAPI) -> None:
+    """
+    Remplace la route openapi.json de FastAPI (schéma sérialisé à chaque
+    requête) par une charge calculée une fois, au démarrage ou à la première
+    requête, puis servie précompressée.
+    """
+    path = app.openapi_url
+    if not path:
+        return
+    app.router.routes = [route for route in app.router.routes if getattr(route, "path", None) != path]
+    payload: Dict[str, PrecompressedPayload] = {}
+
+    def prepare() -> PrecompressedPayload:
+        if "openapi" not in payload:
+            from app.core.responses import dumps
+            payload["openapi"] = PrecompressedPayload(dumps(app.openapi()))
+        return payload["openapi"]
+
+    async def openapi(request: Request) -> Response:
+        return prepare().response(request)
+
+    app.add_route(path, openapi, include_in_schema=False)
+    app.state.openapi_payload = prepare
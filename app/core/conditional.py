@@ -0,0 +1,88 @@
+"""
+GET conditionnels (ETag / Last-Modified).
+
+Avant la requête principale, la route calcule une "version" peu coûteuse
+des données qu'elle va renvoyer : max(updated_at) et nombre de lignes,
+restreints au même périmètre (utilisateur, terrain...). L'ETag est dérivé de
+cette version et des paramètres de la requête. Si le client présente le même
+ETag (If-None-Match) ou une date au moins aussi récente (If-Modified-Since),
+la route répond 304 sans exécuter la requête principale ni le sérialiseur.
+
+La suppression logique met à jour updated_at et la création ajoute une
+ligne : les deux changent la version.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+# (max(updated_at), nombre de lignes)
+Version = Tuple[Optional[datetime], int]
+
+
+def table_version(db: Session, model, *criteria) -> Version:
+    """Version d'un ensemble de lignes d'un modèle"""
+    return tuple(db.query(func.max(model.updated_at), func.count(model.id)).filter(*criteria).one())
+
+
+def query_version(query: Query, model) -> Version:
+    """Version des lignes d'une requête existante (jointures et filtres conservés)"""
+    return tuple(query.order_by(None).with_entities(func.max(model.updated_at), func.count(model.id)).one())
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:32]
+    # Faible : l'ETag identifie une version des données, pas un encodage précis
+    return f'W/"{digest}"'
+
+
+class ConditionalGet:
+    """Dépendance FastAPI : évalue If-None-Match / If-Modified-Since pour une version"""
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def evaluate(self, *versions: Version, scope: Tuple = ()) -> Optional[Response]:
+        """
+        Ajoute ETag et Last-Modified à la réponse et retourne une réponse 304
+        si le client a déjà cette version, None sinon. Un ensemble vide n'est
+        jamais validé : la route s'exécute (et répond 404 si besoin).
+        """
+        if not any(count for _, count in versions):
+            return None
+        etag = make_etag(self.request.url.path, str(self.request.query_params), scope, versions)
+        stamps = [stamp for stamp, _ in versions if stamp is not None]
+        last_modified = max(stamps).replace(microsecond=0) if stamps else None
+
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if last_modified is not None:
+            # updated_at est stocké en UTC naïf (datetime.utcnow)
+            headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+        self.response.headers.update(headers)
+
+        if self._not_modified(etag, last_modified):
+            return Response(status_code=304, headers=headers)
+        return None
+
+    def _not_modified(self, etag: str, last_modified: Optional[datetime]) -> bool:
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # Comparaison faible (RFC 9110 §13.1.2) ; If-Modified-Since est alors ignoré
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in candidates or etag.removeprefix("W/") in candidates
+
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since and last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            return last_modified <= since
+        return False
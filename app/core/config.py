@@ -30,6 +30,7 @@ class Settings(BaseSettings):
     ALGORITHM: str = Field(default="HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=1440)
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7)
+    JWT_CACHE_SIZE: int = Field(default=4096)  # Tokens vérifiés gardés en mémoire (0 = vérifier à chaque requête)
     
     # --- ChirpStack ---
     CHIRPSTACK_API_URL: Optional[str] = None
@@ -40,6 +41,10 @@ class Settings(BaseSettings):
     INFOBIP_BASE_URL: str = Field(default="https://api.infobip.com")
     INFOBIP_API_KEY: Optional[str] = None
     INFOBIP_SENDER_NUMBER: Optional[str] = None
+    INFOBIP_SMS_BATCHING: bool = Field(default=True)  # Regroupe les SMS en une requête multi-messages
+    INFOBIP_SMS_BATCH_WINDOW: float = Field(default=0.2)  # Secondes d'attente maximale avant envoi du lot
+    INFOBIP_SMS_BATCH_MAX_MESSAGES: int = Field(default=100)  # Messages par requête
+    INFOBIP_REQUESTS_PER_SECOND: float = Field(default=10.0)  # Débit de requêtes HTTP vers Infobip
     
     # --- Emails ---
     SMTP_HOST: Optional[str] = None
@@ -47,10 +52,124 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     EMAILS_FROM_EMAIL: Optional[str] = None
+    SMTP_STARTTLS: bool = Field(default=True)  # Ignoré sur le port 465 (TLS implicite)
+    SMTP_POOL_SIZE: int = Field(default=3)  # Connexions SMTP authentifiées conservées ouvertes
+    SMTP_TIMEOUT: float = Field(default=30.0)
+    SMTP_IDLE_TIMEOUT: float = Field(default=60.0)  # Au-delà, une connexion inactive est rouverte
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = Field(default=100)
 
     # --- AI Services ---
     EXPERT_SYSTEM_URL: str = Field(default="https://systeme-expert-5iyu.onrender.com")
     ML_SERVICE_URL: str = Field(default="https://crops-predictions.onrender.com")
+    ML_MAX_CONCURRENT_BATCHES: int = Field(default=4)  # Lots envoyés en parallèle au service ML
+    ML_FALLBACK_MODEL_PATH: Optional[str] = None  # Modèle kNN local (JSON) utilisé si le service ML est indisponible
+    ML_FALLBACK_LATENCY_BUDGET: float = Field(default=15.0)  # Secondes accordées au service ML avant bascule sur le modèle local
+
+    # --- Disjoncteurs des services externes (ML, système expert, ChirpStack) ---
+    CIRCUIT_FAILURE_RATE_THRESHOLD: float = Field(default=0.5)  # Taux d'échec déclenchant l'ouverture
+    CIRCUIT_WINDOW_SECONDS: float = Field(default=60.0)  # Fenêtre glissante d'observation
+    CIRCUIT_MIN_CALLS: int = Field(default=5)  # Nombre minimal d'appels avant de juger le taux d'échec
+    CIRCUIT_OPEN_SECONDS: float = Field(default=30.0)  # Durée d'ouverture avant un appel de test
+    UPSTREAM_MIN_TIMEOUT: float = Field(default=5.0)  # Borne basse du timeout adaptatif
+    UPSTREAM_MAX_TIMEOUT: float = Field(default=120.0)  # Borne haute (cold start Render)
+
+    # --- Préchauffage des services IA (cold start Render) ---
+    WARMUP_ENABLED: bool = Field(default=False)
+    WARMUP_COLD_THRESHOLD: float = Field(default=5.0)  # Latence (s) au-delà de laquelle un ping est considéré "à froid"
+    WARMUP_INITIAL_IDLE_TIMEOUT: float = Field(default=900.0)  # Mise en veille Render après 15 min d'inactivité
+    WARMUP_SAFETY_FACTOR: float = Field(default=0.8)  # Ping à 80% du délai d'inactivité estimé
+    WARMUP_MIN_INTERVAL: float = Field(default=60.0)
+    WARMUP_MAX_INTERVAL: float = Field(default=1800.0)
+
+    # --- Scheduler des recommandations automatiques ---
+    SCHEDULER_CONCURRENCY: int = Field(default=4)  # Parcelles traitées simultanément
+    SCHEDULER_GLOBAL_RATE: float = Field(default=2.0)  # Recommandations/seconde tous utilisateurs confondus (0 = illimité)
+    SCHEDULER_USER_RATE: float = Field(default=0.2)  # Recommandations/seconde par utilisateur (0 = illimité)
+    SCHEDULER_INTERVAL: float = Field(default=900.0)  # Fenêtre de planification (secondes)
+    SCHEDULER_JITTER_SECONDS: float = Field(default=3600.0)  # Étalement des échéances par parcelle
+    SCHEDULER_SHARD_COUNT: int = Field(default=1)  # Nombre de schedulers se partageant les parcelles
+    SCHEDULER_SHARD_INDEX: int = Field(default=0)  # Shard traité par ce processus
+    SCHEDULER_LEADER_LOCK: str = Field(default="auto")  # auto | postgres (verrou consultatif) | file
+    SCHEDULER_LOCK_FILE: str = Field(default="/tmp/agropredict-scheduler.lock")
+    SCHEDULER_LEASE_RENEW_INTERVAL: float = Field(default=15.0)  # Renouvellement du bail / tentative des suiveurs
+
+    # --- File de tâches de fond (python -m app.worker) ---
+    JOB_QUEUE_ENABLED: bool = Field(default=False)  # Sinon, BackgroundTasks FastAPI dans le processus web
+    JOB_WORKER_CONCURRENCY: int = Field(default=4)
+    JOB_VISIBILITY_TIMEOUT: float = Field(default=600.0)  # Secondes avant qu'une tâche réservée redevienne visible
+    JOB_POLL_INTERVAL: float = Field(default=2.0)
+    JOB_MAX_ATTEMPTS: int = Field(default=5)
+    JOB_RETRY_BASE_DELAY: float = Field(default=10.0)
+    JOB_RETRY_MAX_DELAY: float = Field(default=900.0)
+
+    # --- Outbox des notifications ---
+    OUTBOX_DISPATCHER_ENABLED: bool = Field(default=False)  # Distribution dans le processus web (le worker la fait toujours)
+    OUTBOX_BATCH_SIZE: int = Field(default=50)  # Notifications réservées par lot et par canal
+    OUTBOX_POLL_INTERVAL: float = Field(default=2.0)
+    OUTBOX_VISIBILITY_TIMEOUT: float = Field(default=300.0)
+    OUTBOX_MAX_ATTEMPTS: int = Field(default=6)
+    OUTBOX_RETRY_BASE_DELAY: float = Field(default=30.0)
+    OUTBOX_RETRY_MAX_DELAY: float = Field(default=3600.0)
+    NOTIFICATION_DIGEST_WINDOW: float = Field(default=300.0)  # Secondes de regroupement par destinataire et canal (0 = envoi immédiat)
+    NOTIFICATION_DIGEST_MAX_ITEMS: int = Field(default=20)  # Notifications distinctes par digest
+
+    # --- Débit des notifications sortantes (messages/seconde, 0 = illimité) ---
+    NOTIFICATION_RATE_EMAIL: float = Field(default=10.0)
+    NOTIFICATION_RATE_SMS: float = Field(default=10.0)
+    NOTIFICATION_RATE_WHATSAPP: float = Field(default=10.0)
+    NOTIFICATION_RATE_TELEGRAM: float = Field(default=30.0)  # Limite globale de la Bot API
+    NOTIFICATION_RECIPIENT_RATE: float = Field(default=1.0)  # Par destinataire et par canal
+    NOTIFICATION_RECIPIENT_BURST: float = Field(default=5.0)  # Rafale autorisée par destinataire
+
+    # --- Gabarits des notifications ---
+    NOTIFICATION_DEFAULT_LANGUAGE: str = Field(default="fr")
+    NOTIFICATION_RENDER_CACHE_SIZE: int = Field(default=1024)  # Rendus distincts gardés en mémoire
+    SMS_MAX_SEGMENTS: int = Field(default=3)  # Au-delà, le SMS est tronqué
+    SMS_GSM7_TRANSLITERATE: bool = Field(default=True)  # ê, ç... -> e, c pour rester en GSM-7 (160 car./segment)
+
+    # --- Hachage des mots de passe et connexions ---
+    PASSWORD_HASH_WORKERS: int = Field(default=2)  # Threads dédiés à bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=32)  # Au-delà, 503 (hachages en cours + en attente)
+    LOGIN_FAILURE_BURST: float = Field(default=10.0)  # Échecs de connexion tolérés par IP avant limitation
+    LOGIN_FAILURE_RATE: float = Field(default=0.1)  # Échecs/seconde regagnés par IP (6/minute)
+    TRUST_FORWARDED_FOR: bool = Field(default=False)  # IP client lue dans X-Forwarded-For (derrière un proxy)
+    TRUSTED_PROXY_HOPS: int = Field(default=1)  # Proxys de confiance : IP lue à cette position depuis la droite
+
+    # --- Cache des utilisateurs authentifiés ---
+    AUTH_USER_CACHE_TTL: float = Field(default=30.0)  # Secondes (0 = relire l'utilisateur à chaque requête)
+    AUTH_USER_CACHE_SIZE: int = Field(default=10000)
+
+    # --- Contrôle d'admission (webhook ChirpStack, authentification, prédiction) ---
+    ADMISSION_ENABLED: bool = Field(default=True)
+    ADMISSION_STORE: str = Field(default="memory")  # "memory" (par processus) ou "sqlite" (partagé par les workers)
+    ADMISSION_STORE_PATH: str = Field(default="admission.sqlite3")  # Fichier du magasin sqlite
+    ADMISSION_API_KEY_HEADER: str = Field(default="X-API-Key")  # Identité prioritaire sur l'utilisateur et l'IP
+    ADMISSION_API_KEYS: List[str] = Field(default=[])  # Clés reconnues (JSON) ; une clé inconnue est ignorée
+    ADMISSION_WEBHOOK_RATE: float = Field(default=20.0)  # Requêtes/seconde par identité
+    ADMISSION_WEBHOOK_BURST: float = Field(default=100.0)
+    ADMISSION_WEBHOOK_MAX_CONCURRENCY: int = Field(default=8)  # Uplinks traités simultanément (pool de la base)
+    ADMISSION_WEBHOOK_MAX_QUEUE: int = Field(default=64)
+    ADMISSION_WEBHOOK_QUEUE_TIMEOUT: float = Field(default=5.0)  # Secondes ; au-delà, 503
+    ADMISSION_AUTH_RATE: float = Field(default=0.5)  # Connexions/inscriptions par seconde et par IP (30/minute)
+    ADMISSION_AUTH_BURST: float = Field(default=20.0)
+    ADMISSION_PREDICT_RATE: float = Field(default=0.1)  # Prédictions/seconde par utilisateur (6/minute)
+    ADMISSION_PREDICT_BURST: float = Field(default=5.0)
+    ADMISSION_PREDICT_MAX_CONCURRENCY: int = Field(default=4)  # Appels simultanés aux services IA
+    ADMISSION_PREDICT_MAX_QUEUE: int = Field(default=8)
+    ADMISSION_PREDICT_QUEUE_TIMEOUT: float = Field(default=15.0)
+
+    # --- Cache des données de référence (localités, modes de notification) ---
+    RESPONSE_CACHE_BACKEND: str = Field(default="memory")  # "memory" (par processus) ou "sqlite" (partagé par les workers)
+    RESPONSE_CACHE_PATH: str = Field(default="response_cache.sqlite3")  # Fichier du backend sqlite
+    RESPONSE_CACHE_SIZE: int = Field(default=1024)  # Entrées (LRU)
+    LOCALITE_CACHE_TTL: float = Field(default=300.0)  # Secondes (0 = pas de cache) ; invalidé à chaque écriture
+    NOTIFICATION_MODES_CACHE_TTL: float = Field(default=3600.0)
+
+    # --- Compression des réponses ---
+    COMPRESSION_ENABLED: bool = Field(default=True)
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024)  # Octets ; en dessous, la réponse part non compressée
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6)  # 1 (rapide) à 9 (compact)
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4)  # 0 à 11 ; brotli seulement si le paquet est installé
 
     # --- CORS ---
     # Utilisez 'List' ou 'list' (avec Pydantic v2) pour les listes
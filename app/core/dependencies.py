@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -5,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User, UserRole
 from app.core.security import verify_token
+from app.core.principal_cache import principal_cache
 from app.schemas.auth import TokenData
 
 security = HTTPBearer()
@@ -43,13 +45,50 @@ def get_current_user(
     if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Utilisateur gardé en cache quelques secondes (invalidé par UserService)
+    user = principal_cache.load(db, user_id)
     if user is None:
         raise credentials_exception
 
     return user
 
 
+@dataclass(frozen=True)
+class TokenPrincipal:
+    """Identité extraite des claims du token, sans lecture en base"""
+    id: str
+    role: Optional[UserRole] = None  # Absent des tokens émis sans claim "role"
+    email: Optional[str] = None
+
+
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenPrincipal:
+    """
+    Identité de l'utilisateur authentifié, construite à partir du token seul
+
+    Pour les routes qui n'ont besoin que de l'identifiant et du rôle : aucune
+    requête SQL. Un changement de rôle ou une suppression n'est vu qu'à
+    l'expiration du token ; utiliser get_current_user si cela importe.
+
+    Raises:
+        HTTPException: Si le token est invalide ou incomplet
+    """
+    payload = verify_token(credentials.credentials, token_type="access")
+    try:
+        return TokenPrincipal(
+            id=payload["sub"],
+            role=UserRole(payload["role"]) if payload.get("role") else None,
+            email=payload.get("email")
+        )
+    except (TypeError, KeyError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -130,7 +169,6 @@ def get_optional_current_user(
         if user_id is None:
             return None
 
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
+        return principal_cache.load(db, user_id)
     except Exception:
         return None
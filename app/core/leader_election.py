@@ -0,0 +1,205 @@
+"""
+Élection de leader entre processus (workers uvicorn, instances Render).
+
+Un seul processus du cluster doit exécuter le scheduler. La leadership est
+un bail détenu tant que le verrou sous-jacent l'est :
+
+- AdvisoryLock : verrou consultatif PostgreSQL (pg_try_advisory_lock) posé
+                 sur une connexion dédiée, hors du pool de l'application
+                 (NullPool). Si le processus meurt, la connexion se ferme
+                 et PostgreSQL libère le verrou ; après une erreur, la
+                 connexion est invalidée plutôt que rendue avec le verrou.
+- FileLock     : verrou flock sur un fichier local, équivalent pour les
+                 tests et le développement sur SQLite (un seul hôte).
+
+LeaderElector renouvelle le bail à intervalle régulier ; un suiveur retente
+l'acquisition au même rythme et prend le relais dès que le verrou se libère.
+"""
+import asyncio
+import logging
+import os
+import socket
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock(ABC):
+    """Interface commune des verrous de leadership"""
+
+    @abstractmethod
+    def try_acquire(self) -> bool:
+        ...
+
+    @abstractmethod
+    def renew(self) -> bool:
+        """Vérifie que le verrou est toujours détenu"""
+
+    @abstractmethod
+    def release(self) -> None:
+        ...
+
+
+class AdvisoryLock(LeaderLock):
+    """Verrou consultatif PostgreSQL de niveau session"""
+
+    def __init__(self, engine, name: str):
+        # Moteur dédié sans pool : la connexion du verrou n'occupe pas une
+        # place du pool de l'application et sa fermeture ferme la session
+        self.engine = create_engine(engine.url, poolclass=NullPool)
+        # Clé bigint stable dérivée du nom
+        self.key = zlib.crc32(name.encode("utf-8"))
+        self._connection = None
+
+    def try_acquire(self) -> bool:
+        connection = self.engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            connection.commit()
+        except Exception:
+            # Le verrou a pu être pris avant l'erreur : la session est abandonnée
+            connection.invalidate()
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def renew(self) -> bool:
+        if self._connection is None:
+            return False
+        try:
+            held = self._connection.execute(
+                text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND objid = :key AND pid = pg_backend_pid()"),
+                {"key": self.key}
+            ).scalar()
+            self._connection.commit()
+            if held:
+                return True
+        except Exception as e:
+            logger.warning(f"Connexion du verrou de leadership perdue: {str(e)}")
+            self._close(invalidate=True)
+            return False
+        self._close()
+        return False
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception as e:
+            logger.warning(f"Libération du verrou de leadership impossible: {str(e)}")
+            self._close(invalidate=True)
+            return
+        self._close()
+
+    def _close(self, invalidate: bool = False) -> None:
+        """Ferme la connexion ; invalidate=True abandonne la session (et le verrou qu'elle tient)"""
+        try:
+            if invalidate:
+                self._connection.invalidate()
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+
+class FileLock(LeaderLock):
+    """Verrou flock sur un fichier local (un seul hôte)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        import fcntl
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def renew(self) -> bool:
+        return self._fd is not None
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        import fcntl
+
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+class LeaderElector:
+    """Maintient ou brigue la leadership à intervalle régulier"""
+
+    def __init__(self, lock: LeaderLock, renew_interval: float = 15.0, identity: Optional[str] = None):
+        self.lock = lock
+        self.renew_interval = renew_interval
+        self.identity = identity or f"{socket.gethostname()}:{os.getpid()}"
+        self.is_leader = False
+        self.leader_since: Optional[datetime] = None
+        self.last_heartbeat: Optional[datetime] = None
+        self.transitions = 0
+        self._running = False
+
+    def step(self) -> bool:
+        """Renouvelle le bail (leader) ou tente de l'acquérir (suiveur) ; retourne l'état"""
+        try:
+            held = self.lock.renew() if self.is_leader else self.lock.try_acquire()
+        except Exception as e:
+            logger.error(f"Élection de leader impossible: {str(e)}")
+            held = False
+
+        if held != self.is_leader:
+            self.transitions += 1
+            self.leader_since = datetime.utcnow() if held else None
+            logger.info(f"{self.identity} {'devient leader' if held else 'perd la leadership'} du scheduler.")
+        self.is_leader = held
+        self.last_heartbeat = datetime.utcnow()
+        return held
+
+    async def start(self):
+        self._running = True
+        while self._running:
+            await asyncio.to_thread(self.step)
+            await asyncio.sleep(self.renew_interval)
+
+    def stop(self):
+        self._running = False
+        self.resign()
+
+    def resign(self) -> None:
+        """Libère la leadership (arrêt propre) pour qu'un suiveur prenne le relais"""
+        if self.is_leader:
+            self.lock.release()
+            self.is_leader = False
+            self.leader_since = None
+            self.transitions += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "identity": self.identity,
+            "is_leader": self.is_leader,
+            "leader_since": self.leader_since.isoformat() if self.leader_since else None,
+            "last_heartbeat": self.last_heartbeat.isoformat() if self.last_heartbeat else None,
+            "renew_interval": self.renew_interval,
+            "lock": self.lock.__class__.__name__,
+            "transitions": self.transitions
+        }
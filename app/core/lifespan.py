@@ -0,0 +1,65 @@
+"""
+Démarrage et arrêt des services de fond.
+
+Les services (préchauffage des services IA, dispatcher de l'outbox,
+scheduler, modèle de repli) sont importés et construits ici, à l'entrée
+du lifespan de l'application, et non à l'import des modules : les tests et
+les outils en ligne de commande qui importent l'application ne chargent
+pas ces clients et n'ouvrent aucune connexion.
+
+Le schéma de la base n'est plus créé au démarrage : il est géré par Alembic
+(alembic upgrade head avant le lancement du serveur).
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def background_services(scheduler: bool = False) -> AsyncIterator[None]:
+    """Construit les clients externes, démarre les services de fond activés et les arrête à la sortie"""
+    from app.services.chirpstack_service import get_chirpstack_service
+    from app.services.fallback_predictor import load_fallback_model
+    from app.services.infobip_service import get_infobip_service
+
+    # Clients ChirpStack et Infobip (le disjoncteur ChirpStack apparaît dans /health/upstreams)
+    get_chirpstack_service()
+    get_infobip_service()
+    # Modèle ML local utilisé si le service distant est indisponible
+    load_fallback_model()
+
+    tasks: List[asyncio.Task] = []
+    stops: List[Callable[[], None]] = []
+
+    # Maintenir les services IA (Render) éveillés
+    if settings.WARMUP_ENABLED:
+        from app.services.warmup_service import warmup_service
+        tasks.append(asyncio.create_task(warmup_service.start()))
+        stops.append(warmup_service.stop)
+    # Distribution des notifications de l'outbox (sans worker séparé)
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        from app.services.notification_outbox import outbox_dispatcher
+        tasks.append(asyncio.create_task(outbox_dispatcher.start()))
+        stops.append(outbox_dispatcher.stop)
+    if scheduler:
+        from app.services.scheduler_service import get_scheduler_service
+        scheduler_service = get_scheduler_service()
+        tasks.append(asyncio.create_task(scheduler_service.start()))
+        stops.append(scheduler_service.stop)
+
+    try:
+        yield
+    finally:
+        for stop in stops:
+            stop()
+        for task in tasks:
+            task.cancel()
+        # Les boucles peuvent être en plein sommeil : on attend leur annulation
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+                logger.error(f"Erreur à l'arrêt d'un service de fond: {result}")
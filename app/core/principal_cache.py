@@ -0,0 +1,91 @@
+"""
+Cache des utilisateurs authentifiés.
+
+get_current_user relisait l'utilisateur en base à chaque requête
+authentifiée. Les colonnes de l'utilisateur sont désormais gardées quelques
+secondes (AUTH_USER_CACHE_TTL) dans un cache borné (LRU), indexé par
+identifiant. UserService invalide l'entrée à chaque modification
+(profil, rôle, statut, mot de passe, suppression).
+
+L'instance rendue par le cache est rattachée à la session de la requête
+sans requête SQL (merge load=False) : les routes peuvent la modifier,
+parcourir ses relations et committer comme avec un utilisateur chargé.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class PrincipalCache:
+    """Instantanés d'utilisateurs avec durée de vie et taille bornées"""
+
+    def __init__(self, ttl: float, max_size: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            # Copie : les colonnes JSON (notification_modes) ne doivent pas être partagées
+            return copy.deepcopy(entry[1])
+
+    def put(self, user: User) -> None:
+        if not self.enabled:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).mapper.column_attrs}
+        with self._lock:
+            self._entries[str(user.id)] = (self._clock() + self.ttl, copy.deepcopy(values))
+            self._entries.move_to_end(str(user.id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Any) -> None:
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def load(self, db: Session, user_id: str) -> Optional[User]:
+        """Utilisateur attaché à la session, depuis le cache ou la base"""
+        values = self.get(user_id) if self.enabled else None
+        if values is not None:
+            user = User(**values)
+            # Instance "détachée" sans historique : merge l'attache sans SELECT
+            make_transient_to_detached(user)
+            return db.merge(user, load=False)
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is not None:
+            self.put(user)
+        return user
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache(settings.AUTH_USER_CACHE_TTL, settings.AUTH_USER_CACHE_SIZE)
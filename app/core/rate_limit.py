@@ -0,0 +1,129 @@
+"""
+Limitation de débit par seaux à jetons (token buckets).
+
+Un seau se remplit à `rate` jetons par seconde jusqu'à `capacity` ; chaque
+opération consomme un jeton. Un débit nul ou négatif désactive la limite.
+KeyedTokenBuckets maintient un seau par clé (utilisateur, destinataire...).
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        if self.unlimited:
+            return float("inf")
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consomme des jetons si disponibles ; retourne False sinon (sans attendre)"""
+        if self.unlimited:
+            return True
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def delay_for(self, tokens: float = 1.0) -> float:
+        """Secondes à attendre avant que `tokens` jetons soient disponibles"""
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Attend que des jetons soient disponibles puis les consomme"""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.delay_for(tokens))
+
+
+class KeyedTokenBuckets:
+    """Un seau par clé, avec un nombre de clés suivies borné (LRU)"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity, clock=self._clock)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+    def try_acquire(self, key: Hashable, tokens: float = 1.0) -> bool:
+        return self.get(key).try_acquire(tokens)
+
+    def delay_for(self, key: Hashable, tokens: float = 1.0) -> float:
+        return self.get(key).delay_for(tokens)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def client_ip(request) -> str:
+    """
+    Adresse du client d'une requête Starlette. Derrière le proxy de Render
+    (TRUST_FORWARDED_FOR), l'adresse réelle est celle que le proxy ajoute à
+    droite de X-Forwarded-For : les entrées de gauche viennent du client et
+    peuvent être forgées. TRUSTED_PROXY_HOPS est le nombre de proxys de
+    confiance devant l'application ; l'entrée retenue est la
+    TRUSTED_PROXY_HOPS-ième en partant de la droite.
+    """
+    from app.core.config import settings
+
+    if settings.TRUST_FORWARDED_FOR and settings.TRUSTED_PROXY_HOPS > 0:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            entries = [entry.strip() for entry in forwarded.split(",") if entry.strip()]
+            if len(entries) >= settings.TRUSTED_PROXY_HOPS:
+                return entries[-settings.TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
@@ -0,0 +1,61 @@
+"""
+Enveloppe des réponses de l'API.
+
+Les réponses JSON réussies (2xx) sont enveloppées dans le format ApiResponse
+({"success", "code", "message", "data"}) au moment de leur sérialisation par
+la classe de réponse par défaut de l'application : le contenu est encodé une
+seule fois, sans relire ni re-parser le corps dans un middleware. Les
+réponses retournées telles quelles par une route (StreamingResponse,
+FileResponse, Response...) ne passent pas par cette classe et restent
+intactes.
+
+L'encodage utilise orjson, qui traite nativement datetime, date, UUID,
+Enum, dataclasses et les dictionnaires de la colonne JSON measurements ;
+les autres types (Decimal, modèles pydantic, ensembles) passent par
+json_default.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def json_default(obj: Any) -> Any:
+    """Types non gérés nativement par orjson"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # Dernier recours : même conversion que FastAPI (objets ORM, types exotiques)
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=json_default, option=ORJSON_OPTIONS)
+
+
+def is_enveloped(content: Any) -> bool:
+    """Contenu déjà au format ApiResponse (handler d'exception ou route spécifique)"""
+    return isinstance(content, dict) and "success" in content and "code" in content
+
+
+def envelope(content: Any, status_code: int) -> Any:
+    if not 200 <= status_code < 300 or is_enveloped(content):
+        return content
+    # Équivalent de ApiResponse.ok(...).dict(), sans revalider les données
+    return {"success": True, "code": status_code, "message": "Success", "data": content}
+
+
+class EnvelopeJSONResponse(JSONResponse):
+    """JSONResponse qui applique l'enveloppe ApiResponse lors de l'encodage (orjson)"""
+
+    def render(self, content: Any) -> bytes:
+        # Starlette fixe status_code avant d'appeler render()
+        return dumps(envelope(content, self.status_code))
@@ -1,8 +1,16 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, Tuple, TypeVar
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.rate_limit import KeyedTokenBuckets
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -25,6 +33,68 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(truncated_password)
 
 
+T = TypeVar("T")
+
+
+class PasswordHasherPool:
+    """
+    Exécute bcrypt dans un pool de threads dédié, hors de la boucle asyncio.
+
+    Le nombre d'opérations en cours ou en attente est borné : au-delà, la
+    requête est refusée (503) plutôt que d'allonger indéfiniment la file,
+    afin qu'une rafale de connexions ne retarde pas les autres routes.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many authentication requests, retry later",
+                    headers={"Retry-After": "1"}
+                )
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected
+        }
+
+
+password_hasher_pool = PasswordHasherPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+# Échecs de connexion par adresse IP : au-delà de la rafale tolérée, 429
+login_failures = KeyedTokenBuckets(settings.LOGIN_FAILURE_RATE, capacity=settings.LOGIN_FAILURE_BURST)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password exécuté dans le pool bcrypt"""
+    return await password_hasher_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash exécuté dans le pool bcrypt"""
+    return await password_hasher_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Crée un token d'accès JWT
@@ -76,6 +146,66 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """
+    Claims des tokens récemment vérifiés, indexés par empreinte du token.
+
+    Un même token d'accès est présenté à chaque requête d'un tableau de bord :
+    sa signature n'est vérifiée (python-jose) qu'à la première présentation.
+    L'empreinte inclut la clé et l'algorithme de signature, le token lui-même
+    n'est pas conservé. Une entrée n'est jamais servie au-delà de son "exp".
+    """
+
+    def __init__(self, max_size: int, clock=time.time):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        material = f"{settings.ALGORITHM}\x1f{settings.SECRET_KEY}\x1f{token}"
+        return hashlib.sha256(material.encode("utf-8")).digest()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Copie : l'appelant peut modifier le payload
+            return dict(entry[1])
+
+    def put(self, key: bytes, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        # Sans expiration lisible, le token est revérifié à chaque fois
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._entries[key] = (float(exp), dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+verified_tokens = VerifiedTokenCache(settings.JWT_CACHE_SIZE)
+
+
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Décode et valide un token JWT
@@ -86,11 +216,16 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Payload du token ou None si invalide
     """
+    key = verified_tokens.digest(token)
+    payload = verified_tokens.get(key)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    verified_tokens.put(key, payload)
+    return payload
 
 
 def verify_token(token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
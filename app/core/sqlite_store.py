@@ -0,0 +1,28 @@
+"""
+Fichier SQLite partagé par les processus d'une même machine.
+
+Substitut local d'un magasin partagé, utilisé par le cache des données de
+référence et par les compteurs du contrôle d'admission : une connexion par
+thread (les connexions sqlite3 ne se partagent pas entre threads), en mode
+WAL pour que les lectures d'un processus ne bloquent pas les écritures des
+autres, et en autocommit (transactions explicites au besoin).
+"""
+import sqlite3
+import threading
+
+
+class ThreadLocalSQLite:
+    """Connexions WAL par thread vers un même fichier SQLite"""
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
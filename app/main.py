@@ -1,16 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.database import engine
-from app.models import Base
+from app.core.lifespan import background_services
+
+
+# Le schéma de la base est géré par Alembic (alembic upgrade head), pas à l'import
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cette application lance aussi le scheduler dans une tâche de fond
+    async with background_services(scheduler=True):
+        yield
 
-# Créer les tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
 )
 
@@ -27,14 +35,6 @@ app.add_middleware(
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
-@app.on_event("startup")
-async def startup_event():
-    import asyncio
-    from app.services.scheduler_service import scheduler_service
-    # Lancer le scheduler dans une tâche de fond
-    asyncio.create_task(scheduler_service.start())
-
-
 @app.get("/")
 async def root():
     return {
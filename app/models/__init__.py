@@ -6,6 +6,8 @@ from .capteur import Capteur
 from .cap_parcelle import CapParcelle
 from .sensor_data import SensorMeasurements
 from .recommendation import Recommendation
+from .job import Job
+from .notification_outbox import NotificationOutbox
 from .base import Base, BaseModel
 
 __all__ = [
@@ -20,4 +22,6 @@ __all__ = [
     "CapParcelle",
     "SensorMeasurements",
     "Recommendation",
+    "Job",
+    "NotificationOutbox",
 ]
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, String, Text, Integer, DateTime, JSON, Enum as SQLEnum, Index
+from datetime import datetime
+import enum
+from .base import BaseModel
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"  # Nombre maximal de tentatives atteint (dead letter)
+
+
+class Job(BaseModel):
+    """
+    Tâche de fond persistante (file consommée par app.worker).
+    """
+    __tablename__ = "jobs"
+
+    name = Column(String(100), nullable=False)  # Nom du handler enregistré
+    payload = Column(JSON, nullable=False)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Prochaine exécution possible
+    locked_by = Column(String(64))  # Jeton du worker ayant réservé la tâche
+    locked_until = Column(DateTime)  # Fin du délai de visibilité
+    last_error = Column(Text)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, name='{self.name}', status='{self.status}')>"
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, String, Text, Integer, DateTime, Enum as SQLEnum, Index
+from datetime import datetime
+import enum
+from .base import BaseModel
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"  # Nombre maximal de tentatives atteint (dead letter)
+
+
+class NotificationOutbox(BaseModel):
+    """
+    Notification à envoyer, écrite dans la même transaction que la donnée
+    qui la déclenche (recommandation) puis distribuée par le dispatcher.
+    """
+    __tablename__ = "notification_outbox"
+
+    channel = Column(String(20), nullable=False)  # email | sms | whatsapp | telegram
+    recipient = Column(String(255))  # Email, téléphone ou chat Telegram (None = chat par défaut)
+    subject = Column(String(255))
+    body = Column(Text, nullable=False)
+    idempotency_key = Column(String(191), nullable=False, unique=True)
+    content_hash = Column(String(64), index=True)  # Empreinte canal + destinataire + contenu (déduplication)
+    user_id = Column(String(36), index=True)
+    recommendation_id = Column(String(36), index=True)
+    status = Column(SQLEnum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=6, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String(64))
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_dispatch", "status", "channel", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, channel='{self.channel}', status='{self.status}')>"
@@ -1,5 +1,6 @@
+import math
 from datetime import timedelta, datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.auth import (
@@ -15,8 +16,11 @@ from app.services.users_service import UserService
 from app.core.security import (
     create_access_token,
     create_refresh_token,
+    login_failures,
     verify_token
 )
+from app.core.admission import admission
+from app.core.rate_limit import client_ip
 from app.core.dependencies import get_current_user, get_current_active_user
 from app.core.config import settings
 from app.models.user import User, UserRole
@@ -24,7 +28,12 @@ from app.models.user import User, UserRole
 router = APIRouter()
 
 
-@router.post("/register/user", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register/user",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission("auth"))]
+)
 async def register_user(
     user_data: UserCreate,
     db: Session = Depends(get_db)
@@ -34,7 +43,12 @@ async def register_user(
     return await auth_service.register_user(db, user_data, role=UserRole.USER)
 
 
-@router.post("/register/admin", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register/admin",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission("auth"))]
+)
 async def register_admin(
     user_data: UserCreate,
     db: Session = Depends(get_db)
@@ -44,9 +58,10 @@ async def register_admin(
     return await auth_service.register_user(db, user_data, role=UserRole.ADMIN)
 
 
-@router.post("/login", response_model=TokenResponse)
-def login(
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(admission("auth"))])
+async def login(
     login_data: LoginRequest,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
@@ -60,11 +75,22 @@ def login(
         TokenResponse: Tokens d'accès et de rafraîchissement
 
     Raises:
-        HTTPException: Si les identifiants sont incorrects
+        HTTPException: Si les identifiants sont incorrects ou si l'adresse IP
+            a dépassé le nombre d'échecs tolérés
     """
-    user = UserService.authenticate_user(db, login_data.email, login_data.password)
+    ip = client_ip(request)
+    retry_after = login_failures.delay_for(ip)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    user = await UserService.authenticate_user_async(db, login_data.email, login_data.password)
 
     if not user:
+        login_failures.try_acquire(ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
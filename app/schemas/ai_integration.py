@@ -38,6 +38,7 @@ class MLPredictResponse(BaseModel):
     nb_echantillons: int
     resultats_par_echantillon: List[SampleResult]
     top3_global: List[TopCropGlobal]
+    source: str = Field("remote", description="Origine de la prédiction: 'remote' (service ML) ou 'fallback' (modèle local)")
 
 class ExpertSystemRequest(BaseModel):
     """Schéma requis par ExpertSystemService pour l'import"""
@@ -1,11 +1,8 @@
-from .auth_service import auth_service
-from .capteur_service import capteur_service
-from .chirpstack_service import chirpstack_service
-from .users_service import UserService
+"""
+Services métier.
 
-__all__ = [
-    "auth_service",
-    "capteur_service",
-    "chirpstack_service",
-    "UserService",
-]
+Le paquet ne réexporte plus les instances globales (auth_service,
+capteur_service, chirpstack_service...) : les importer ici chargeait les
+clients d'authentification, de notification et ChirpStack dès l'import de
+n'importe quel service. Importez-les depuis leur module.
+"""
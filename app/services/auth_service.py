@@ -11,9 +11,9 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.security import password_hasher_pool
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate
-from app.services.notification_service import NotificationService
 
 
 class AuthService:
@@ -129,8 +129,8 @@ class AuthService:
                 detail="Cet email est déjà utilisé"
             )
         
-        # Créer le nouvel utilisateur
-        hashed_password = self.get_password_hash(user_data.password)
+        # Créer le nouvel utilisateur (bcrypt hors de la boucle asyncio)
+        hashed_password = await password_hasher_pool.run(self.get_password_hash, user_data.password)
         
         db_user = User(
             nom=user_data.nom,
@@ -147,6 +147,7 @@ class AuthService:
         
         # Notification optionnelle
         if notify:
+            from app.services.notification_service import NotificationService
             notif = NotificationService()
             try:
                 await notif.send_email(db_user.email, "Bienvenue sur AgroPredict", "Votre compte a été créé avec succès.")
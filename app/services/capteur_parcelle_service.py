@@ -4,6 +4,7 @@ from app.models.parcelle import Parcelle
 from app.models.cap_parcelle import CapParcelle
 from datetime import datetime
 from fastapi import HTTPException, status
+from app.core.conditional import Version, table_version
 
 def assign_capteur_to_parcelle(db: Session, code_parcelle: str, code_capteur: str):
     # Rechercher la parcelle
@@ -85,3 +86,8 @@ def get_all_assignments(db: Session, skip: int = 0, limit: int = 100):
     return db.query(CapParcelle).filter(
         CapParcelle.date_desassignation == None
     ).order_by(CapParcelle.date_assignation.desc()).offset(skip).limit(limit).all()
+
+
+def get_assignments_version(db: Session) -> Version:
+    """Version des assignations capteur-parcelle"""
+    return table_version(db, CapParcelle)
@@ -4,6 +4,7 @@ from sqlalchemy import and_, or_, func
 from fastapi import HTTPException, status
 from datetime import datetime
 
+from app.core.conditional import Version, table_version
 from app.models.capteur import Capteur, StatutCapteur
 from app.models.parcelle import Parcelle
 from app.schemas.capteur import CapteurCreate, CapteurUpdate
@@ -250,6 +251,20 @@ class CapteurService:
             Capteur.battery_level < threshold
         ).all()
     
+    def get_capteurs_version(
+        self,
+        db: Session,
+        capteur_id: Optional[str] = None,
+        code: Optional[str] = None
+    ) -> Version:
+        """Version des capteurs (un seul si capteur_id ou code est fourni)"""
+        criteria = []
+        if capteur_id:
+            criteria.append(Capteur.id == capteur_id)
+        if code:
+            criteria.append(Capteur.code == code)
+        return table_version(db, Capteur, *criteria)
+
     def get_statistics(
         self,
         db: Session,
@@ -8,6 +8,7 @@ from datetime import datetime
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.circuit_breaker import CircuitOpenError, get_circuit_breaker
 from app.core.config import settings
 from app.models.capteur import Capteur, StatutCapteur
 from app.models.sensor_data import SensorMeasurements
@@ -24,6 +25,34 @@ class ChirpStackService:
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
+        self.circuit_breaker = get_circuit_breaker("chirpstack", max_timeout=30.0)
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Appel HTTP vers l'API ChirpStack protégé par le disjoncteur
+
+        Les erreurs 5xx et réseau sont comptées comme des échecs ; si le circuit
+        est ouvert, l'appel échoue immédiatement avec une 503.
+        """
+        try:
+            async with httpx.AsyncClient() as client:
+                with self.circuit_breaker.protect():
+                    response = await client.request(
+                        method,
+                        f"{self.api_url}{path}",
+                        headers=self.headers,
+                        timeout=self.circuit_breaker.timeout(),
+                        **kwargs
+                    )
+                    if response.status_code >= 500:
+                        response.raise_for_status()
+        except CircuitOpenError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e)
+            )
+        response.raise_for_status()
+        return response
 
     # ========================================================================
     # RÉCEPTION DES DONNÉES DE CHIRPSTACK (UPLINK)
@@ -184,15 +213,8 @@ class ChirpStackService:
                 }
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/devices/{dev_eui}/queue",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._request("POST", f"/devices/{dev_eui}/queue", json=payload)
+            return response.json()
 
         except httpx.HTTPError as e:
             raise HTTPException(
@@ -215,14 +237,8 @@ class ChirpStackService:
             Informations du device
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/devices/{dev_eui}",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._request("GET", f"/devices/{dev_eui}")
+            return response.json()
         except httpx.HTTPError as e:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -240,14 +256,8 @@ class ChirpStackService:
             Informations d'activation (DevAddr, AppSKey, NwkSKey, etc.)
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/devices/{dev_eui}/activation",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._request("GET", f"/devices/{dev_eui}/activation")
+            return response.json()
         except httpx.HTTPError as e:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -265,15 +275,12 @@ class ChirpStackService:
             Liste des devices
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/applications/{self.application_id}/devices",
-                    headers=self.headers,
-                    params={"limit": limit},
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json().get("result", [])
+            response = await self._request(
+                "GET",
+                f"/applications/{self.application_id}/devices",
+                params={"limit": limit}
+            )
+            return response.json().get("result", [])
         except httpx.HTTPError as e:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -371,5 +378,18 @@ class ChirpStackService:
             return int(((rssi + 120) / 70) * 100)
 
 
-# Instance globale du service
-chirpstack_service = ChirpStackService()
+# Instance globale du service, construite au premier usage (pas à l'import)
+_chirpstack_service: Optional[ChirpStackService] = None
+
+
+def get_chirpstack_service() -> ChirpStackService:
+    global _chirpstack_service
+    if _chirpstack_service is None:
+        _chirpstack_service = ChirpStackService()
+    return _chirpstack_service
+
+
+def __getattr__(name):
+    if name == "chirpstack_service":
+        return get_chirpstack_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,33 +1,172 @@
-import smtplib
-from email.mime.text import MIMEText
+"""
+Envoi d'emails via SMTP, sans bloquer la boucle asyncio.
+
+Les connexions (STARTTLS + authentification) sont ouvertes une fois puis
+réutilisées via un pool partagé par toutes les instances d'EmailService :
+une recommandation (cinq emails) n'effectue plus cinq poignées de main TLS.
+Les envois concurrents se répartissent sur les connexions du pool.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
 from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiosmtplib
+
 from app.core.config import settings
-import logging
 
 logger = logging.getLogger(__name__)
 
+
+class SMTPConnectionPool:
+    """Pool borné de connexions SMTP authentifiées et réutilisables"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = 3,
+        start_tls: bool = True,
+        timeout: float = 30.0,
+        idle_timeout: float = 60.0,
+        max_messages_per_connection: int = 100
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        # Port 465 : TLS implicite ; sinon STARTTLS comme auparavant
+        self.use_tls = port == 465
+        self.start_tls = start_tls and not self.use_tls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle: List[Tuple[aiosmtplib.SMTP, float, int]] = []
+        self._slots = asyncio.Semaphore(size)
+        self.connections_opened = 0
+
+    async def _open(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        if self.username:
+            await client.login(self.username, self.password or "")
+        self.connections_opened += 1
+        return client
+
+    @staticmethod
+    async def _discard(client: aiosmtplib.SMTP) -> None:
+        try:
+            if client.is_connected:
+                await client.quit()
+        except Exception:
+            client.close()
+
+    async def _checkout(self) -> Tuple[aiosmtplib.SMTP, int]:
+        while self._idle:
+            client, released_at, sent = self._idle.pop()
+            # Les serveurs ferment les connexions inactives : ne pas réutiliser une connexion trop ancienne
+            if client.is_connected and time.monotonic() - released_at < self.idle_timeout:
+                return client, sent
+            await self._discard(client)
+        return await self._open(), 0
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Prête une connexion ; elle est rendue au pool si l'envoi réussit"""
+        async with self._slots:
+            client, sent = await self._checkout()
+            try:
+                yield client
+            except Exception:
+                await self._discard(client)
+                raise
+            sent += 1
+            if sent >= self.max_messages_per_connection:
+                await self._discard(client)
+            else:
+                self._idle.append((client, time.monotonic(), sent))
+
+    async def send(self, message) -> None:
+        """Envoie un message ; une connexion coupée par le serveur est rouverte une fois"""
+        try:
+            async with self.connection() as client:
+                await client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            async with self.connection() as client:
+                await client.send_message(message)
+
+    async def close(self) -> None:
+        while self._idle:
+            client, _, _ = self._idle.pop()
+            await self._discard(client)
+
+
+# Les connexions sont liées à leur boucle d'événements : un jeu de pools par boucle
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, SMTPConnectionPool]]" = weakref.WeakKeyDictionary()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Pool partagé pour la configuration SMTP courante"""
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    key = (settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER)
+    pool = pools.get(key)
+    if pool is None:
+        pool = SMTPConnectionPool(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            size=settings.SMTP_POOL_SIZE,
+            start_tls=settings.SMTP_STARTTLS,
+            timeout=settings.SMTP_TIMEOUT,
+            idle_timeout=settings.SMTP_IDLE_TIMEOUT,
+            max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        )
+        pools[key] = pool
+    return pool
+
+
 class EmailService:
     """Service pour l'envoi d'emails via SMTP"""
-    def __init__(self):
-        self.smtp_host = settings.SMTP_HOST
-        self.smtp_port = settings.SMTP_PORT
+    def __init__(self, pool: Optional[SMTPConnectionPool] = None, from_email: Optional[str] = None):
         self.smtp_user = settings.SMTP_USER
-        self.smtp_password = settings.SMTP_PASSWORD
-        self.from_email = settings.EMAILS_FROM_EMAIL or self.smtp_user
+        self.from_email = from_email or settings.EMAILS_FROM_EMAIL or self.smtp_user
+        self._pool = pool
 
-    def send_email(self, to: str, subject: str, body: str) -> dict:
+    @property
+    def pool(self) -> SMTPConnectionPool:
+        return self._pool or get_smtp_pool()
+
+    def build_message(self, to: str, subject: str, body: str) -> MIMEMultipart:
         msg = MIMEMultipart()
         msg['From'] = self.from_email
         msg['To'] = to
         msg['Subject'] = subject
         msg.attach(MIMEText(body, 'plain'))
+        return msg
+
+    async def send_email(self, to: str, subject: str, body: str) -> dict:
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.sendmail(self.from_email, to, msg.as_string())
+            await self.pool.send(self.build_message(to, subject, body))
             logger.info(f"Email envoyé à {to}")
             return {"success": True, "to": to, "subject": subject}
         except Exception as e:
             logger.error(f"Erreur envoi email: {e}")
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            return {"success": False, "error": str(e)}
+
+    async def send_many(self, messages: List[Tuple[str, str, str]]) -> List[dict]:
+        """Envoie plusieurs emails (to, subject, body) en parallèle sur les connexions du pool"""
+        return await asyncio.gather(*(self.send_email(to, subject, body) for to, subject, body in messages))
@@ -2,9 +2,9 @@ import httpx
 import logging
 from fastapi import HTTPException, status
 from typing import List, Optional
+from app.core.circuit_breaker import CircuitOpenError, get_circuit_breaker
 from app.core.config import settings
 from app.schemas.ai_integration import ExpertSystemResponse
-from app.services.notification_service import NotificationService
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +14,8 @@ class ExpertSystemService:
     BASE_URL = str(settings.EXPERT_SYSTEM_URL).rstrip("/")
     QUERY_ENDPOINT = f"{BASE_URL}/api/query"
 
+    circuit_breaker = get_circuit_breaker("expert_system")
+
     @staticmethod
     async def query_expert_system(query: str, region: str = "Centre", notify: bool = False, user_email: str = None) -> Optional[ExpertSystemResponse]:
         """
@@ -24,20 +26,24 @@ class ExpertSystemService:
         "region": region
             }
         
-        # Configuration détaillée du timeout (similaire au ML service)
-        # Augmenté pour gérer les cold starts sur Render
+        # Timeout adaptatif déduit des latences observées (UPSTREAM_MAX_TIMEOUT
+        # tant que l'historique est insuffisant, pour absorber les cold starts Render)
+        adaptive_timeout = ExpertSystemService.circuit_breaker.timeout()
         timeout = httpx.Timeout(
-            120.0,          # Global timeout (2 minutes)
-            connect=10.0,   # Timeout de connexion
-            read=100.0      # Timeout de lecture
+            adaptive_timeout,
+            connect=min(10.0, adaptive_timeout)   # Timeout de connexion
         )
         
         async with httpx.AsyncClient(timeout=timeout) as client:
             try:
-                response = await client.post(
-                    ExpertSystemService.QUERY_ENDPOINT,
-                    json=payload
-                )
+                with ExpertSystemService.circuit_breaker.protect():
+                    response = await client.post(
+                        ExpertSystemService.QUERY_ENDPOINT,
+                        json=payload
+                    )
+                    if response.status_code >= 500:
+                        # Compté comme un échec par le disjoncteur
+                        response.raise_for_status()
                 
                 if response.status_code != 200:
                     logger.error(f"Erreur SE: {response.status_code} - {response.text}")
@@ -50,10 +56,17 @@ class ExpertSystemService:
                 result = ExpertSystemResponse(**data)
                 # Notification optionnelle
                 if notify and user_email:
+                    from app.services.notification_service import NotificationService
                     notif = NotificationService()
                     await notif.send_email(user_email, "Réponse Système Expert", f"{result.final_response}")
                 return result
                 
+            except CircuitOpenError as e:
+                logger.warning(str(e))
+                return None
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Erreur SE: {e.response.status_code} - {e.response.text}")
+                return None
             except httpx.ConnectError as e:
                 logger.error(f"Erreur de connexion (DNS/Réseau) au SE ({ExpertSystemService.QUERY_ENDPOINT}): {str(e)}")
                 return None
@@ -0,0 +1,168 @@
+"""
+Prédicteur de secours embarqué pour les recommandations de culture.
+
+Utilisé par MLService lorsque le service ML distant (hébergé sur Render) ne
+répond pas dans le budget de latence ou est indisponible. Il s'agit d'un
+k plus proches voisins (kNN) pondéré par la distance, entraîné à partir des
+données exportées et chargé depuis un fichier JSON au démarrage.
+"""
+import json
+import logging
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.schemas.ai_integration import MLPredictResponse, SoilData
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ["N", "P", "K", "temperature", "humidity", "ph", "rainfall"]
+
+
+class LocalCropPredictor:
+    """kNN en Python pur sur les variables du sol normalisées (z-score)"""
+
+    def __init__(
+        self,
+        samples: List[List[float]],
+        labels: List[str],
+        means: List[float],
+        stds: List[float],
+        k: int = 5
+    ):
+        if not samples or len(samples) != len(labels):
+            raise ValueError("Le modèle de secours doit contenir autant d'échantillons que de labels")
+        self.means = means
+        self.stds = stds
+        self.k = max(1, min(k, len(samples)))
+        self.labels = labels
+        self.samples = [self._normalize(row) for row in samples]
+
+    # ------------------------------------------------------------------
+    # Entraînement / persistance
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def fit(cls, samples: List[List[float]], labels: List[str], k: int = 5) -> "LocalCropPredictor":
+        """Construit le modèle à partir de données brutes (une ligne par échantillon, ordre FEATURES)"""
+        n = len(samples)
+        means = [sum(row[i] for row in samples) / n for i in range(len(FEATURES))]
+        stds = []
+        for i, mean in enumerate(means):
+            variance = sum((row[i] - mean) ** 2 for row in samples) / n
+            stds.append(math.sqrt(variance) or 1.0)
+        return cls(samples, labels, means, stds, k)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalCropPredictor":
+        """Charge un modèle exporté par save()"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("features", FEATURES) != FEATURES:
+            raise ValueError(f"Variables du modèle incompatibles: {data.get('features')}")
+        return cls(data["samples"], data["labels"], data["means"], data["stds"], data.get("k", 5))
+
+    def save(self, path: str) -> None:
+        """Exporte le modèle (échantillons dénormalisés) au format JSON"""
+        raw = [
+            [value * std + mean for value, mean, std in zip(row, self.means, self.stds)]
+            for row in self.samples
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "features": FEATURES,
+                "k": self.k,
+                "means": self.means,
+                "stds": self.stds,
+                "samples": raw,
+                "labels": self.labels
+            }, f)
+
+    # ------------------------------------------------------------------
+    # Prédiction
+    # ------------------------------------------------------------------
+
+    def _normalize(self, row: Sequence[float]) -> List[float]:
+        return [(value - mean) / std for value, mean, std in zip(row, self.means, self.stds)]
+
+    @staticmethod
+    def _to_row(soil_data: SoilData) -> List[float]:
+        return [float(getattr(soil_data, feature)) for feature in FEATURES]
+
+    def predict_one(self, soil_data: SoilData) -> List[Tuple[str, float]]:
+        """Retourne le top 3 (culture, confiance en %) pour un échantillon"""
+        target = self._normalize(self._to_row(soil_data))
+        distances = sorted(
+            (math.dist(target, row), label) for row, label in zip(self.samples, self.labels)
+        )[:self.k]
+
+        votes: Dict[str, float] = {}
+        for distance, label in distances:
+            votes[label] = votes.get(label, 0.0) + 1.0 / (distance + 1e-6)
+        total = sum(votes.values())
+
+        ranked = sorted(votes.items(), key=lambda item: item[1], reverse=True)[:3]
+        return [(label, round(weight / total * 100, 2)) for label, weight in ranked]
+
+    def predict(self, soil_data_list: List[SoilData]) -> MLPredictResponse:
+        """Prédiction par lot au même format que le service ML distant"""
+        resultats = []
+        scores: Dict[str, float] = {}
+
+        for index, soil_data in enumerate(soil_data_list, start=1):
+            top3 = self.predict_one(soil_data)
+            resultats.append({
+                "echantillon": index,
+                "top3": [
+                    {"rang": rang, "culture": culture, "confiance": confiance}
+                    for rang, (culture, confiance) in enumerate(top3, start=1)
+                ]
+            })
+            for culture, confiance in top3:
+                scores[culture] = scores.get(culture, 0.0) + confiance
+
+        count = len(soil_data_list) or 1
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:3]
+        return MLPredictResponse(
+            nb_echantillons=len(soil_data_list),
+            resultats_par_echantillon=resultats,
+            top3_global=[
+                {"rang": rang, "culture": culture, "confiance_agregee": round(score / count, 2)}
+                for rang, (culture, score) in enumerate(ranked, start=1)
+            ],
+            source="fallback"
+        )
+
+
+_predictor: Optional[LocalCropPredictor] = None
+_load_attempted = False
+
+
+def load_fallback_model(path: Optional[str] = None) -> Optional[LocalCropPredictor]:
+    """Charge le modèle de secours configuré (ML_FALLBACK_MODEL_PATH). Appelé au démarrage."""
+    global _predictor, _load_attempted
+    _load_attempted = True
+    path = path or settings.ML_FALLBACK_MODEL_PATH
+    if not path:
+        return None
+    try:
+        _predictor = LocalCropPredictor.load(path)
+        logger.info(f"Modèle ML de secours chargé depuis {path} ({len(_predictor.labels)} échantillons)")
+    except Exception as e:
+        _predictor = None
+        logger.error(f"Impossible de charger le modèle ML de secours ({path}): {e}")
+    return _predictor
+
+
+def get_fallback_predictor() -> Optional[LocalCropPredictor]:
+    """Retourne le prédicteur de secours s'il est configuré (chargement paresseux hors application web)"""
+    if not _load_attempted:
+        load_fallback_model()
+    return _predictor
+
+
+def set_fallback_predictor(predictor: Optional[LocalCropPredictor]) -> None:
+    """Remplace le prédicteur de secours (tests, rechargement à chaud)"""
+    global _predictor, _load_attempted
+    _predictor = predictor
+    _load_attempted = True
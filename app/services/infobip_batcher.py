@@ -0,0 +1,155 @@
+"""
+Envoi groupé des SMS Infobip.
+
+/sms/2/text/advanced accepte plusieurs messages par requête. Le batcher
+regroupe les SMS soumis pendant une courte fenêtre (INFOBIP_SMS_BATCH_WINDOW)
+ou jusqu'à INFOBIP_SMS_BATCH_MAX_MESSAGES, envoie une seule requête et
+redistribue à chaque appelant le résultat de son message (messageId propre
+à chaque destination).
+
+Les requêtes vers Infobip (SMS groupés et WhatsApp) partagent un seau à
+jetons (INFOBIP_REQUESTS_PER_SECOND) ; une réponse 429 est retentée après
+le délai Retry-After indiqué.
+"""
+import asyncio
+import logging
+import uuid
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Débit de requêtes HTTP vers Infobip, partagé par tous les envois
+infobip_request_bucket = TokenBucket(settings.INFOBIP_REQUESTS_PER_SECOND)
+
+
+class InfobipSMSBatcher:
+    """Regroupe les SMS soumis dans une fenêtre de temps ou de taille"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_messages: Optional[int] = None,
+        window: Optional[float] = None,
+        max_retries: int = 3,
+        bucket: Optional[TokenBucket] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        base = (base_url or settings.INFOBIP_BASE_URL).rstrip("/")
+        if not base.startswith("http"):
+            base = f"https://{base}"
+        self.url = f"{base}/sms/2/text/advanced"
+        self.headers = {
+            "Authorization": f"App {api_key or settings.INFOBIP_API_KEY}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        self.max_messages = max_messages or settings.INFOBIP_SMS_BATCH_MAX_MESSAGES
+        self.window = settings.INFOBIP_SMS_BATCH_WINDOW if window is None else window
+        self.max_retries = max_retries
+        self.bucket = bucket or infobip_request_bucket
+        self.transport = transport
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.requests_sent = 0
+        self.messages_sent = 0
+
+    async def submit(self, to: str, text: str, sender: Optional[str] = None) -> dict:
+        """Ajoute un SMS au prochain lot et attend son résultat"""
+        loop = asyncio.get_running_loop()
+        message_id = uuid.uuid4().hex
+        message = {
+            "destinations": [{"to": to, "messageId": message_id}],
+            "from": sender or settings.INFOBIP_SENDER_NUMBER,
+            "text": text
+        }
+        future = loop.create_future()
+        self._pending.append((message, future))
+
+        if len(self._pending) >= self.max_messages:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+        return await future
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_messages], self._pending[self.max_messages:]
+            task = asyncio.get_running_loop().create_task(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """Envoie immédiatement les SMS en attente et attend la fin des lots en cours"""
+        self._schedule_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _post(self, messages: List[Dict[str, Any]]) -> httpx.Response:
+        async with httpx.AsyncClient(transport=self.transport, timeout=30.0) as client:
+            for attempt in range(self.max_retries + 1):
+                await self.bucket.acquire()
+                response = await client.post(self.url, headers=self.headers, json={"messages": messages})
+                self.requests_sent += 1
+                if response.status_code != 429 or attempt == self.max_retries:
+                    return response
+                retry_after = float(response.headers.get("Retry-After", 2 ** attempt))
+                logger.warning(f"Infobip 429 : nouvel essai du lot dans {retry_after}s")
+                await asyncio.sleep(retry_after)
+        return response
+
+    async def _send_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        messages = [message for message, _ in batch]
+        try:
+            response = await self._post(messages)
+            response.raise_for_status()
+            results = {m.get("messageId"): m for m in response.json().get("messages", [])}
+        except Exception as e:
+            logger.error(f"Erreur Infobip SMS (lot de {len(batch)}): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_result({"success": False, "error": str(e)})
+            return
+
+        self.messages_sent += len(batch)
+        for message, future in batch:
+            destination = message["destinations"][0]
+            data = results.get(destination["messageId"])
+            if data is None:
+                result = {"success": False, "error": "Message absent de la réponse Infobip", "to": destination["to"]}
+            else:
+                status = data.get("status", {})
+                result = {
+                    "success": status.get("groupName") != "REJECTED",
+                    "message_id": data.get("messageId"),
+                    "status": status.get("name", "unknown"),
+                    "to": destination["to"],
+                    "from": message["from"]
+                }
+                if not result["success"]:
+                    result["error"] = status.get("description") or status.get("name")
+            if not future.done():
+                future.set_result(result)
+
+
+# Les futures et minuteries sont liées à leur boucle : un batcher par boucle
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, InfobipSMSBatcher]" = weakref.WeakKeyDictionary()
+
+
+def get_sms_batcher() -> InfobipSMSBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = InfobipSMSBatcher()
+        _batchers[loop] = batcher
+    return batcher
@@ -1,5 +1,6 @@
 import httpx
 from app.core.config import settings
+from app.services.infobip_batcher import get_sms_batcher, infobip_request_bucket
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,7 +21,9 @@ class InfobipService:
         }
 
     async def send_sms(self, to: str, message: str, sender: str = None) -> dict:
-        """Envoi de SMS via Infobip API"""
+        """Envoi de SMS via Infobip API (regroupé avec les SMS concurrents si INFOBIP_SMS_BATCHING)"""
+        if settings.INFOBIP_SMS_BATCHING:
+            return await get_sms_batcher().submit(to, message, sender or self.sender_number)
         try:
             from_number = sender or self.sender_number
             
@@ -74,6 +77,7 @@ class InfobipService:
                 "content": {"text": message}
             }
             
+            await infobip_request_bucket.acquire()
             async with httpx.AsyncClient() as client:
                 response = await client.post(url, headers=self.headers, json=payload, timeout=30.0)
                 response.raise_for_status()
@@ -94,5 +98,18 @@ class InfobipService:
             logger.error(f"Erreur WhatsApp Infobip: {e}")
             return {"success": False, "error": str(e)}
 
-# Instance globale
-infobip_service = InfobipService()
+# Instance globale, construite au premier usage (pas à l'import)
+_infobip_service = None
+
+
+def get_infobip_service() -> InfobipService:
+    global _infobip_service
+    if _infobip_service is None:
+        _infobip_service = InfobipService()
+    return _infobip_service
+
+
+def __getattr__(name):
+    if name == "infobip_service":
+        return get_infobip_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,270 @@
+"""
+File de tâches de fond persistante.
+
+Remplace les BackgroundTasks FastAPI pour les traitements lents (système
+expert, notifications) : les tâches survivent aux redémarrages et sont
+exécutées par un processus séparé (python -m app.worker).
+
+- SQLJobQueue    : file adossée à la table "jobs". La réservation utilise
+                   SELECT ... FOR UPDATE SKIP LOCKED sous PostgreSQL, ce qui
+                   permet plusieurs workers concurrents.
+- InMemoryJobQueue : équivalent en mémoire pour les tests.
+
+Une tâche réservée devient invisible pendant le délai de visibilité ; si le
+worker meurt sans l'acquitter, elle redevient disponible à l'expiration.
+"""
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_
+
+from app.core.config import settings
+from app.models.job import Job, JobStatus
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Handlers enregistrés par nom de tâche (voir job_handler)
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(name: str):
+    """Décorateur enregistrant une coroutine comme handler d'un type de tâche"""
+    def decorator(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+@dataclass
+class QueuedJob:
+    """Tâche réservée par un worker"""
+    id: str
+    name: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    lease: str
+
+
+class JobQueue(ABC):
+    """Interface commune des files de tâches"""
+
+    @abstractmethod
+    def enqueue(self, name: str, payload: Dict[str, Any], max_attempts: Optional[int] = None, delay: float = 0) -> str:
+        ...
+
+    @abstractmethod
+    def claim(self, limit: int, visibility_timeout: float) -> List[QueuedJob]:
+        ...
+
+    @abstractmethod
+    def complete(self, job: QueuedJob) -> None:
+        ...
+
+    @abstractmethod
+    def fail(self, job: QueuedJob, error: str, retry_delay: float) -> bool:
+        """Enregistre un échec ; retourne True si la tâche sera retentée"""
+
+
+class SQLJobQueue(JobQueue):
+    """File persistante adossée à la table jobs"""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from app.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def enqueue(self, name: str, payload: Dict[str, Any], max_attempts: Optional[int] = None, delay: float = 0) -> str:
+        db = self.session_factory()
+        try:
+            job = Job(
+                name=name,
+                payload=payload,
+                max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+                run_at=datetime.utcnow() + timedelta(seconds=delay)
+            )
+            db.add(job)
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def claim(self, limit: int, visibility_timeout: float) -> List[QueuedJob]:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            rows = db.query(Job).filter(
+                or_(
+                    and_(Job.status == JobStatus.PENDING, Job.run_at <= now),
+                    # Tâche réservée par un worker disparu : délai de visibilité expiré
+                    and_(Job.status == JobStatus.RUNNING, Job.locked_until < now)
+                )
+            ).order_by(Job.run_at).limit(limit).with_for_update(skip_locked=True).all()
+
+            claimed = []
+            for job in rows:
+                if job.attempts >= job.max_attempts:
+                    job.status = JobStatus.FAILED
+                    job.last_error = job.last_error or "Délai de visibilité expiré"
+                    job.finished_at = now
+                    continue
+                job.status = JobStatus.RUNNING
+                job.attempts += 1
+                job.locked_by = uuid.uuid4().hex
+                job.locked_until = now + timedelta(seconds=visibility_timeout)
+                claimed.append(QueuedJob(
+                    id=job.id,
+                    name=job.name,
+                    payload=job.payload,
+                    attempts=job.attempts,
+                    max_attempts=job.max_attempts,
+                    lease=job.locked_by
+                ))
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def _owned(self, db, job: QueuedJob) -> Optional[Job]:
+        # Le jeton protège contre l'acquittement d'une tâche re-réservée par un autre worker
+        return db.query(Job).filter(Job.id == job.id, Job.locked_by == job.lease).first()
+
+    def complete(self, job: QueuedJob) -> None:
+        db = self.session_factory()
+        try:
+            row = self._owned(db, job)
+            if row:
+                row.status = JobStatus.DONE
+                row.locked_by = None
+                row.locked_until = None
+                row.finished_at = datetime.utcnow()
+                db.commit()
+        finally:
+            db.close()
+
+    def fail(self, job: QueuedJob, error: str, retry_delay: float) -> bool:
+        db = self.session_factory()
+        try:
+            row = self._owned(db, job)
+            if not row:
+                return False
+            retry = row.attempts < row.max_attempts
+            row.last_error = error
+            row.locked_by = None
+            row.locked_until = None
+            if retry:
+                row.status = JobStatus.PENDING
+                row.run_at = datetime.utcnow() + timedelta(seconds=retry_delay)
+            else:
+                row.status = JobStatus.FAILED
+                row.finished_at = datetime.utcnow()
+            db.commit()
+            return retry
+        finally:
+            db.close()
+
+
+@dataclass
+class _MemoryJob:
+    id: str
+    name: str
+    payload: Dict[str, Any]
+    max_attempts: int
+    run_at: datetime
+    status: JobStatus = JobStatus.PENDING
+    attempts: int = 0
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    history: List[str] = field(default_factory=list)
+
+
+class InMemoryJobQueue(JobQueue):
+    """File en mémoire (tests) avec la même sémantique que SQLJobQueue"""
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.utcnow):
+        self.jobs: Dict[str, _MemoryJob] = {}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def enqueue(self, name: str, payload: Dict[str, Any], max_attempts: Optional[int] = None, delay: float = 0) -> str:
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self.jobs[job_id] = _MemoryJob(
+                id=job_id,
+                name=name,
+                payload=payload,
+                max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+                run_at=self._clock() + timedelta(seconds=delay)
+            )
+        return job_id
+
+    def claim(self, limit: int, visibility_timeout: float) -> List[QueuedJob]:
+        now = self._clock()
+        claimed = []
+        with self._lock:
+            candidates = sorted(
+                (
+                    job for job in self.jobs.values()
+                    if (job.status == JobStatus.PENDING and job.run_at <= now)
+                    or (job.status == JobStatus.RUNNING and job.locked_until < now)
+                ),
+                key=lambda job: job.run_at
+            )
+            for job in candidates:
+                if len(claimed) >= limit:
+                    break
+                if job.attempts >= job.max_attempts:
+                    job.status = JobStatus.FAILED
+                    continue
+                job.status = JobStatus.RUNNING
+                job.attempts += 1
+                job.locked_by = uuid.uuid4().hex
+                job.locked_until = now + timedelta(seconds=visibility_timeout)
+                claimed.append(QueuedJob(job.id, job.name, job.payload, job.attempts, job.max_attempts, job.locked_by))
+        return claimed
+
+    def complete(self, job: QueuedJob) -> None:
+        with self._lock:
+            row = self.jobs.get(job.id)
+            if row and row.locked_by == job.lease:
+                row.status = JobStatus.DONE
+                row.locked_by = None
+
+    def fail(self, job: QueuedJob, error: str, retry_delay: float) -> bool:
+        with self._lock:
+            row = self.jobs.get(job.id)
+            if not row or row.locked_by != job.lease:
+                return False
+            row.last_error = error
+            row.history.append(error)
+            row.locked_by = None
+            retry = row.attempts < row.max_attempts
+            if retry:
+                row.status = JobStatus.PENDING
+                row.run_at = self._clock() + timedelta(seconds=retry_delay)
+            else:
+                row.status = JobStatus.FAILED
+            return retry
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """File utilisée par l'application (SQLJobQueue sur la base principale)"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = SQLJobQueue()
+    return _job_queue
+
+
+def set_job_queue(queue: Optional[JobQueue]) -> None:
+    """Remplace la file de l'application (tests)"""
+    global _job_queue
+    _job_queue = queue
@@ -3,8 +3,19 @@ from sqlalchemy import func, or_
 from typing import List, Optional
 from fastapi import HTTPException, status
 import uuid
+from app.core import cache
+from app.core.config import settings
+from app.core.conditional import Version, table_version
 from app.models.location import Localite, Continent, ClimateZone
-from app.schemas.location import LocaliteCreate, LocaliteUpdate
+from app.schemas.location import LocaliteCreate, LocaliteUpdate, LocaliteResponse
+
+# Espace de noms du cache des lectures de localités (invalidé à chaque écriture)
+LOCALITES_CACHE = "localites"
+
+
+def _serialize_localites(localites: List[Localite]) -> List[dict]:
+    # Le cache survit à la session : on y range des dictionnaires, pas des objets ORM
+    return [LocaliteResponse.model_validate(localite).model_dump() for localite in localites]
 
 
 class LocaliteService:
@@ -31,6 +42,7 @@ class LocaliteService:
             db.add(localite)
             db.commit()
             db.refresh(localite)
+            cache.invalidate(LOCALITES_CACHE)
             return localite
 
         except HTTPException:
@@ -59,6 +71,12 @@ class LocaliteService:
         return localite
 
     @staticmethod
+    def get_localites_version(db: Session) -> Version:
+        """Version de la table des localités (référentiel partagé, peu modifié)"""
+        return table_version(db, Localite)
+
+    @staticmethod
+    @cache.cached(LOCALITES_CACHE, ttl=settings.LOCALITE_CACHE_TTL, serialize=_serialize_localites)
     def get_all_localites(
         db: Session,
         skip: int = 0,
@@ -68,8 +86,8 @@ class LocaliteService:
         pays: Optional[str] = None,
         ville: Optional[str] = None,
         search: Optional[str] = None
-    ) -> List[Localite]:
-        """Récupérer toutes les localités avec filtres"""
+    ) -> List[dict]:
+        """Récupérer toutes les localités avec filtres (mis en cache)"""
         query = db.query(Localite).filter(Localite.deleted_at.is_(None))
 
         # Filtres
@@ -113,6 +131,7 @@ class LocaliteService:
         try:
             db.commit()
             db.refresh(localite)
+            cache.invalidate(LOCALITES_CACHE)
             return localite
         except Exception as e:
             db.rollback()
@@ -136,6 +155,7 @@ class LocaliteService:
         try:
             localite.soft_delete()
             db.commit()
+            cache.invalidate(LOCALITES_CACHE)
             return {"message": "Localité supprimée avec succès"}
         except Exception as e:
             db.rollback()
@@ -146,8 +166,9 @@ class LocaliteService:
 
 
     @staticmethod
+    @cache.cached(LOCALITES_CACHE, ttl=settings.LOCALITE_CACHE_TTL)
     def get_localite_statistics(db: Session) -> dict:
-        """Obtenir les statistiques des localités"""
+        """Obtenir les statistiques des localités (mis en cache)"""
         stats = {
             "total": db.query(func.count(Localite.id)).filter(
                 Localite.deleted_at.is_(None)
@@ -189,8 +210,9 @@ class LocaliteService:
         ).order_by(Localite.ville).all()
 
     @staticmethod
+    @cache.cached(LOCALITES_CACHE, ttl=settings.LOCALITE_CACHE_TTL)
     def get_countries_list(db: Session) -> List[dict]:
-        """Obtenir la liste des pays disponibles"""
+        """Obtenir la liste des pays disponibles (mis en cache)"""
         countries = db.query(
             Localite.pays,
             Localite.continent,
@@ -1,59 +1,152 @@
+import asyncio
 import httpx
 import logging
-from typing import List
+import uuid
+from typing import Dict, List, Optional
 from fastapi import HTTPException, status
+from app.core.circuit_breaker import CircuitOpenError, CircuitState, get_circuit_breaker
 from app.core.config import settings
-from app.schemas.ai_integration import MLPredictRequest, MLPredictResponse, SoilData
-from app.services.notification_service import NotificationService
+from app.schemas.ai_integration import (
+    MLPredictResponse,
+    SampleResult,
+    SoilData,
+    TopCropGlobal
+)
+from app.services.fallback_predictor import get_fallback_predictor
+from app.services.notification_outbox import enqueue_notification
+from app.services.notification_templates import notification_templates
 
 logger = logging.getLogger(__name__)
 
 class MLService:
     """Service pour interagir avec l'API de Machine Learning externe"""
-    
+
     BASE_URL = str(settings.ML_SERVICE_URL).rstrip("/")
     PREDICT_ENDPOINT = f"{BASE_URL}/predict/batch"
 
+    # Nombre maximum d'échantillons acceptés par /predict/batch (cf. MLPredictRequest)
+    MAX_BATCH_SIZE = 10
+
+    circuit_breaker = get_circuit_breaker("ml_service")
+
     @staticmethod
-    async def predict_crop(soil_data_list: List[SoilData], notify: bool = False, user_email: str = None, user_telephone: str = None) -> MLPredictResponse:
-        """
-        Appelle le service ML pour prédire la culture la plus adaptée à partir d'un lot d'échantillons
-        """
-        # On prépare le payload avec tous les échantillons
+    def _chunk_samples(soil_data_list: List[SoilData], size: int) -> List[List[SoilData]]:
+        """Découpe la liste d'échantillons en lots conformes à la limite du service ML"""
+        return [soil_data_list[i:i + size] for i in range(0, len(soil_data_list), size)]
+
+    @staticmethod
+    async def _predict_batch(client: httpx.AsyncClient, soil_data_list: List[SoilData]) -> MLPredictResponse:
+        """Envoie un seul lot (<= MAX_BATCH_SIZE) au service ML"""
         payload = {
             "samples": [sd.dict() for sd in soil_data_list]
         }
-        
-        # Configuration détaillée du timeout
-        # Augmenté pour gérer les services ML lents (ex: cold start sur Render)
-        timeout = httpx.Timeout(120.0)
 
-        
+        # Comme pour ChirpStack et le système expert, seules les erreurs 5xx
+        # et réseau sont comptées comme des échecs par le disjoncteur
+        with MLService.circuit_breaker.protect():
+            response = await client.post(
+                MLService.PREDICT_ENDPOINT,
+                json=payload
+            )
+
+            if response.status_code >= 500:
+                raise MLService._bad_gateway(response)
+
+        if response.status_code != 200:
+            raise MLService._bad_gateway(response)
+
+        return MLPredictResponse(**response.json())
+
+    @staticmethod
+    def _bad_gateway(response: httpx.Response) -> HTTPException:
+        logger.error(f"Erreur service ML: {response.status_code} - {response.text}")
+        return HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Le service de prédiction ML est temporairement indisponible"
+        )
+
+    @staticmethod
+    def _aggregate_results(chunk_results: List[MLPredictResponse], chunk_sizes: List[int]) -> MLPredictResponse:
+        """
+        Fusionne les réponses de plusieurs lots en une seule réponse.
+
+        La confiance agrégée de chaque culture est la moyenne des confiances
+        par lot, pondérée par le nombre d'échantillons de chaque lot.
+        """
+        if len(chunk_results) == 1:
+            return chunk_results[0]
+
+        total = sum(chunk_sizes)
+        scores: Dict[str, float] = {}
+        resultats: List[SampleResult] = []
+        offset = 0
+
+        for result, size in zip(chunk_results, chunk_sizes):
+            for crop in result.top3_global:
+                scores[crop.culture] = scores.get(crop.culture, 0.0) + crop.confiance_agregee * size
+            for sample in result.resultats_par_echantillon:
+                resultats.append(sample.model_copy(update={"echantillon": sample.echantillon + offset}))
+            offset += size
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:3]
+        top3_global = [
+            TopCropGlobal(rang=rang, culture=culture, confiance_agregee=round(score / total, 2))
+            for rang, (culture, score) in enumerate(ranked, start=1)
+        ]
+
+        return MLPredictResponse(
+            nb_echantillons=total,
+            resultats_par_echantillon=resultats,
+            top3_global=top3_global
+        )
+
+    @staticmethod
+    async def _predict_remote(soil_data_list: List[SoilData]) -> MLPredictResponse:
+        """
+        Interroge le service ML distant.
+
+        Les lots dépassant MAX_BATCH_SIZE sont découpés puis envoyés en parallèle
+        (au plus ML_MAX_CONCURRENT_BATCHES requêtes simultanées). Le timeout est
+        déduit des latences observées par le disjoncteur "ml_service".
+
+        Si le circuit n'est pas fermé, le premier lot part seul (appel de test
+        du HALF_OPEN) ; les autres ne sont envoyés qu'après son succès, une
+        fois le circuit refermé.
+        """
+        chunks = MLService._chunk_samples(soil_data_list, MLService.MAX_BATCH_SIZE)
+        semaphore = asyncio.Semaphore(max(settings.ML_MAX_CONCURRENT_BATCHES, 1))
+
+        # Timeout adaptatif : UPSTREAM_MAX_TIMEOUT (cold start Render) tant que
+        # l'historique de latence est insuffisant
+        timeout = httpx.Timeout(MLService.circuit_breaker.timeout())
+
+        async def run_chunk(client: httpx.AsyncClient, chunk: List[SoilData]) -> MLPredictResponse:
+            async with semaphore:
+                return await MLService._predict_batch(client, chunk)
+
         async with httpx.AsyncClient(timeout=timeout) as client:
             try:
-                response = await client.post(
-                    MLService.PREDICT_ENDPOINT,
-                    json=payload
+                chunk_results = []
+                pending = chunks
+                if MLService.circuit_breaker.state != CircuitState.CLOSED:
+                    chunk_results.append(await run_chunk(client, chunks[0]))
+                    pending = chunks[1:]
+                chunk_results.extend(await asyncio.gather(
+                    *(run_chunk(client, chunk) for chunk in pending)
+                ))
+                return MLService._aggregate_results(
+                    chunk_results,
+                    [len(chunk) for chunk in chunks]
+                )
+
+            except HTTPException:
+                raise
+            except CircuitOpenError as e:
+                logger.warning(str(e))
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Le service de prédiction ML est temporairement indisponible"
                 )
-                
-                if response.status_code != 200:
-                    logger.error(f"Erreur service ML: {response.status_code} - {response.text}")
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail="Le service de prédiction ML est temporairement indisponible"
-                    )
-                
-                data = response.json()
-                result = MLPredictResponse(**data)
-                if notify:
-                    notif = NotificationService()
-                    crop = result.top3_global[0].culture if result.top3_global else "Inconnu"
-                    if user_email:
-                        await notif.send_email(user_email, "Résultat de prédiction ML", f"Votre prédiction: {crop}")
-                    if user_telephone:
-                        await notif.send_sms(user_telephone, f"[AgroPredict] Résultat ML: Votre prédiction est {crop}")
-                return result
-                
             except httpx.RequestError as e:
                 logger.error(f"Erreur de requête au service ML: {str(e)}")
                 raise HTTPException(
@@ -66,3 +159,51 @@ class MLService:
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Erreur interne lors de la récupération de la prédiction ML"
                 )
+
+    @staticmethod
+    async def predict_crop(soil_data_list: List[SoilData], notify: bool = False, user_email: str = None, user_telephone: str = None) -> MLPredictResponse:
+        """
+        Appelle le service ML pour prédire la culture la plus adaptée à partir d'un lot d'échantillons.
+
+        Si un modèle de secours est chargé (ML_FALLBACK_MODEL_PATH), le service distant
+        dispose de ML_FALLBACK_LATENCY_BUDGET secondes pour répondre ; au-delà, en cas
+        d'erreur ou si le circuit est ouvert, la prédiction est calculée localement
+        (source="fallback").
+        """
+        predictor = get_fallback_predictor()
+
+        if predictor is None:
+            result = await MLService._predict_remote(soil_data_list)
+        else:
+            try:
+                result = await asyncio.wait_for(
+                    MLService._predict_remote(soil_data_list),
+                    timeout=settings.ML_FALLBACK_LATENCY_BUDGET
+                )
+            except (asyncio.TimeoutError, HTTPException) as e:
+                reason = "budget de latence dépassé" if isinstance(e, asyncio.TimeoutError) else e.detail
+                logger.warning(f"Service ML indisponible ({reason}), utilisation du modèle local de secours")
+                result = predictor.predict(soil_data_list)
+
+        if notify:
+            MLService._enqueue_notifications(result, user_email, user_telephone)
+        return result
+
+    @staticmethod
+    def _enqueue_notifications(result: MLPredictResponse, user_email: Optional[str], user_telephone: Optional[str]) -> None:
+        """Inscrit le résultat dans l'outbox de notifications (envoi par le dispatcher)"""
+        from app.database import SessionLocal
+
+        crop = result.top3_global[0].culture if result.top3_global else "Inconnu"
+        key = f"ml_prediction:{uuid.uuid4()}"
+        db = SessionLocal()
+        try:
+            if user_email:
+                message = notification_templates.render("ml_prediction", "email", crop=crop)
+                enqueue_notification(db, "email", user_email, message.body, f"{key}:email", subject=message.subject)
+            if user_telephone:
+                message = notification_templates.render("ml_prediction", "sms", crop=crop)
+                enqueue_notification(db, "sms", user_telephone, message.body, f"{key}:sms")
+            db.commit()
+        finally:
+            db.close()
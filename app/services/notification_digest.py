@@ -0,0 +1,93 @@
+"""
+Regroupement (digest) et déduplication des notifications.
+
+Une notification inscrite dans l'outbox est retenue pendant la fenêtre
+NOTIFICATION_DIGEST_WINDOW. Lorsque la première arrive à échéance, le
+dispatcher réserve aussi toutes les notifications en attente pour le même
+destinataire et le même canal. Le DigestEngine les fusionne alors en un
+seul message. Les contenus identiques (même empreinte) ne sont rendus
+qu'une fois.
+
+Les SMS étant facturés par segment, un digest SMS est découpé en plusieurs
+messages de SMS_MAX_SEGMENTS segments au plus : il réduit le nombre
+d'envois sans dépasser le plafond appliqué à chaque SMS.
+"""
+import hashlib
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.notification_templates import sms_segments
+
+
+def content_hash(channel: str, recipient: Optional[str], subject: Optional[str], body: str) -> str:
+    """Empreinte du contenu d'une notification pour un destinataire"""
+    raw = "\x1f".join([channel, recipient or "", subject or "", body])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DigestEngine:
+    """Fusionne les notifications réservées d'un même destinataire sur un même canal"""
+
+    def __init__(self, max_items: int = 20, sms_max_segments: Optional[int] = None):
+        self.max_items = max_items
+        self.sms_max_segments = settings.SMS_MAX_SEGMENTS if sms_max_segments is None else sms_max_segments
+
+    def group(self, items: List) -> List[Tuple[object, List]]:
+        """
+        Retourne [(message à envoyer, notifications couvertes)]. Les doublons
+        sont couverts par le message sans y figurer deux fois.
+        """
+        groups: Dict[Tuple[str, Optional[str]], List] = {}
+        for item in items:
+            groups.setdefault((item.channel, item.recipient), []).append(item)
+
+        digests = []
+        for members in groups.values():
+            unique: Dict[str, object] = {}
+            for item in members:
+                unique.setdefault(self.dedup_key(item), item)
+            for chunk in self.pack(list(unique.values())):
+                covered = [item for item in members if unique[self.dedup_key(item)] in chunk]
+                digests.append((self.render(chunk), covered))
+        return digests
+
+    def pack(self, distinct: List) -> List[List]:
+        """
+        Découpe les notifications distinctes en messages : max_items au plus
+        par message (lisibilité) et, pour les SMS, sms_max_segments segments.
+        """
+        packs: List[List] = []
+        current: List = []
+        for item in distinct:
+            if current and (len(current) >= self.max_items or not self._fits(current + [item])):
+                packs.append(current)
+                current = []
+            current.append(item)
+        if current:
+            packs.append(current)
+        return packs
+
+    def _fits(self, items: List) -> bool:
+        if items[0].channel != "sms":
+            return True
+        return sms_segments("\n".join(item.body for item in items)).segments <= self.sms_max_segments
+
+    @staticmethod
+    def dedup_key(item) -> str:
+        """Empreinte du contenu ; sans empreinte (lignes anciennes), la notification est unique"""
+        return item.content_hash or f"id:{item.id}"
+
+    @staticmethod
+    def render(items: List):
+        """Message unique représentant les notifications données"""
+        first = items[0]
+        if len(items) == 1:
+            return first
+        if first.channel == "email":
+            subject = f"AgroPredict : {len(items)} notifications"
+            body = "\n\n".join(f"=== {item.subject or 'AgroPredict'} ===\n{item.body}" for item in items)
+        else:
+            subject = first.subject
+            body = "\n".join(item.body for item in items)
+        return replace(first, subject=subject, body=body, content_hash=content_hash(first.channel, first.recipient, subject, body))
@@ -0,0 +1,315 @@
+"""
+Outbox transactionnelle des notifications.
+
+Les notifications sont écrites dans la table notification_outbox dans la
+même transaction que la recommandation qui les déclenche : si la
+recommandation est enregistrée, ses notifications le sont aussi, et
+inversement. L'OutboxDispatcher les distribue ensuite par lots et par
+canal (email, SMS, WhatsApp, Telegram), indépendamment de la latence de
+calcul des recommandations.
+
+Livraison "au moins une fois" : une entrée réservée dont l'envoi n'est pas
+acquitté redevient disponible à l'expiration du délai de visibilité. Les
+échecs sont retentés avec backoff exponentiel puis passent en DEAD. La clé
+d'idempotence empêche d'inscrire deux fois la même notification, l'empreinte
+de contenu d'en inscrire deux identiques tant que la première est en attente.
+Les notifications d'un même destinataire sont regroupées en digest (voir
+notification_digest).
+"""
+import asyncio
+import logging
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.notification_outbox import NotificationOutbox, OutboxStatus
+from app.services.notification_digest import DigestEngine, content_hash
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ("email", "sms", "whatsapp", "telegram")
+
+
+def normalize_channel(mode_raw: Any) -> str:
+    """'NotificationMode.EMAIL', 'email', ... -> 'email'"""
+    mode = str(mode_raw).lower()
+    if "." in mode:
+        mode = mode.split(".")[-1]
+    return mode
+
+
+def enqueue_notification(
+    db: Session,
+    channel: str,
+    recipient: Optional[str],
+    body: str,
+    idempotency_key: str,
+    subject: Optional[str] = None,
+    user_id: Optional[str] = None,
+    recommendation_id: Optional[str] = None
+) -> Optional[NotificationOutbox]:
+    """
+    Inscrit une notification dans la session courante, sans commit : l'appelant
+    la valide avec le reste de sa transaction. Retourne None si la clé
+    d'idempotence est déjà connue ou si un contenu identique attend déjà
+    d'être envoyé au même destinataire.
+    """
+    digest = content_hash(channel, recipient, subject, body)
+    pending = any(
+        isinstance(obj, NotificationOutbox)
+        and (obj.idempotency_key == idempotency_key or obj.content_hash == digest)
+        for obj in db.new
+    )
+    if pending or db.query(NotificationOutbox.id).filter(
+        or_(
+            NotificationOutbox.idempotency_key == idempotency_key,
+            and_(
+                NotificationOutbox.content_hash == digest,
+                NotificationOutbox.status.in_([OutboxStatus.PENDING, OutboxStatus.SENDING])
+            )
+        )
+    ).first():
+        return None
+    entry = NotificationOutbox(
+        channel=channel,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        idempotency_key=idempotency_key,
+        content_hash=digest,
+        user_id=user_id,
+        recommendation_id=recommendation_id,
+        max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        # Retenue pendant la fenêtre de digest pour être regroupée avec les suivantes
+        next_attempt_at=datetime.utcnow() + timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW)
+    )
+    db.add(entry)
+    return entry
+
+
+@dataclass
+class ClaimedNotification:
+    """Notification réservée par un dispatcher"""
+    id: str
+    channel: str
+    recipient: Optional[str]
+    subject: Optional[str]
+    body: str
+    idempotency_key: str
+    attempts: int
+    max_attempts: int
+    lease: str
+    content_hash: Optional[str] = None
+
+
+NotificationSender = Callable[[ClaimedNotification], Awaitable[dict]]
+
+
+class OutboxDispatcher:
+    """Distribue l'outbox par lots et par canal, avec reprises et dead letter"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        sender: Optional[NotificationSender] = None,
+        batch_size: Optional[int] = None,
+        visibility_timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        if session_factory is None:
+            from app.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.sender = sender or self.send
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.visibility_timeout = visibility_timeout or settings.OUTBOX_VISIBILITY_TIMEOUT
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+        self.digest = DigestEngine(settings.NOTIFICATION_DIGEST_MAX_ITEMS, settings.SMS_MAX_SEGMENTS)
+        self._notification_service = None
+        self._running = False
+        self.messages = 0
+        self.digested = 0
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+
+    async def send(self, item: ClaimedNotification) -> dict:
+        """Envoi effectif via NotificationService (une instance réutilisée)"""
+        if self._notification_service is None:
+            from app.services.notification_service import NotificationService
+            self._notification_service = NotificationService()
+        service = self._notification_service
+        if item.channel == "email":
+            return await service.send_email(item.recipient, item.subject or "AgroPredict", item.body)
+        if item.channel == "sms":
+            return await service.send_sms(item.recipient, item.body)
+        if item.channel == "whatsapp":
+            return await service.send_whatsapp(item.recipient, item.body)
+        if item.channel == "telegram":
+            return await service.send_telegram(item.body, item.recipient)
+        raise ValueError(f"Canal de notification inconnu: {item.channel}")
+
+    def retry_delay(self, attempts: int) -> float:
+        """Backoff exponentiel avec jitter"""
+        delay = min(settings.OUTBOX_RETRY_MAX_DELAY, settings.OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def claim(self, channel: str, limit: int) -> List[ClaimedNotification]:
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            rows = db.query(NotificationOutbox).filter(
+                NotificationOutbox.channel == channel,
+                or_(
+                    and_(NotificationOutbox.status == OutboxStatus.PENDING, NotificationOutbox.next_attempt_at <= now),
+                    # Dispatcher disparu avant d'acquitter : l'entrée redevient disponible
+                    and_(NotificationOutbox.status == OutboxStatus.SENDING, NotificationOutbox.locked_until < now)
+                )
+            ).order_by(NotificationOutbox.next_attempt_at).limit(limit).with_for_update(skip_locked=True).all()
+
+            # Digest : les notifications en attente des mêmes destinataires partent avec ce lot
+            if rows and settings.NOTIFICATION_DIGEST_WINDOW > 0:
+                recipients = {row.recipient for row in rows}
+                same_recipient = [NotificationOutbox.recipient.in_([r for r in recipients if r is not None])]
+                if None in recipients:
+                    same_recipient.append(NotificationOutbox.recipient.is_(None))
+                known = {row.id for row in rows}
+                companions = db.query(NotificationOutbox).filter(
+                    NotificationOutbox.channel == channel,
+                    NotificationOutbox.status == OutboxStatus.PENDING,
+                    # Les reprises en backoff gardent leur délai
+                    NotificationOutbox.attempts == 0,
+                    or_(*same_recipient)
+                ).order_by(NotificationOutbox.created_at).limit(
+                    limit * settings.NOTIFICATION_DIGEST_MAX_ITEMS
+                ).with_for_update(skip_locked=True).all()
+                rows += [row for row in companions if row.id not in known]
+
+            claimed = []
+            for row in rows:
+                if row.attempts >= row.max_attempts:
+                    row.status = OutboxStatus.DEAD
+                    row.last_error = row.last_error or "Délai de visibilité expiré"
+                    self.dead += 1
+                    continue
+                row.status = OutboxStatus.SENDING
+                row.attempts += 1
+                row.locked_by = uuid.uuid4().hex
+                row.locked_until = now + timedelta(seconds=self.visibility_timeout)
+                claimed.append(ClaimedNotification(
+                    id=row.id,
+                    channel=row.channel,
+                    recipient=row.recipient,
+                    subject=row.subject,
+                    body=row.body,
+                    idempotency_key=row.idempotency_key,
+                    attempts=row.attempts,
+                    max_attempts=row.max_attempts,
+                    lease=row.locked_by,
+                    content_hash=row.content_hash
+                ))
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def acknowledge(self, results: List[tuple]) -> None:
+        """Enregistre en une transaction l'issue d'un lot : [(notification, erreur ou None)]"""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            for item, error in results:
+                row = db.query(NotificationOutbox).filter(
+                    NotificationOutbox.id == item.id,
+                    NotificationOutbox.locked_by == item.lease
+                ).first()
+                if row is None:
+                    # Réservée entre-temps par un autre dispatcher (délai de visibilité expiré)
+                    continue
+                row.locked_by = None
+                row.locked_until = None
+                if error is None:
+                    row.status = OutboxStatus.SENT
+                    row.sent_at = now
+                    self.sent += 1
+                    continue
+                row.last_error = error
+                if row.attempts < row.max_attempts:
+                    row.status = OutboxStatus.PENDING
+                    row.next_attempt_at = now + timedelta(seconds=self.retry_delay(row.attempts))
+                    self.retried += 1
+                else:
+                    row.status = OutboxStatus.DEAD
+                    self.dead += 1
+                    logger.error(f"Notification {row.channel} {row.idempotency_key} abandonnée: {error}")
+            db.commit()
+        finally:
+            db.close()
+
+    async def _deliver(self, item: ClaimedNotification) -> Optional[str]:
+        try:
+            result = await self.sender(item)
+        except Exception as e:
+            return f"{e.__class__.__name__}: {e}"
+        if isinstance(result, dict) and result.get("success") is False:
+            return str(result.get("error") or "Échec de l'envoi")
+        return None
+
+    async def dispatch_channel(self, channel: str) -> int:
+        """Réserve et envoie un lot d'un canal ; retourne la taille du lot"""
+        batch = self.claim(channel, self.batch_size)
+        if not batch:
+            return 0
+        if settings.NOTIFICATION_DIGEST_WINDOW > 0:
+            digests = self.digest.group(batch)
+        else:
+            digests = [(item, [item]) for item in batch]
+        errors = await asyncio.gather(*(self._deliver(message) for message, _ in digests))
+        # Chaque notification couverte par un digest prend l'issue de son envoi
+        self.acknowledge([(item, error) for (_, covered), error in zip(digests, errors) for item in covered])
+        self.messages += len(digests)
+        self.digested += len(batch) - len(digests)
+        return len(batch)
+
+    async def dispatch_once(self) -> int:
+        counts = await asyncio.gather(*(self.dispatch_channel(channel) for channel in CHANNELS))
+        return sum(counts)
+
+    async def drain(self) -> None:
+        """Distribue jusqu'à ce qu'il ne reste rien d'immédiatement envoyable (tests, exécution ponctuelle)"""
+        while await self.dispatch_once():
+            pass
+
+    async def start(self):
+        self._running = True
+        logger.info("Dispatcher de notifications démarré.")
+        while self._running:
+            try:
+                dispatched = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Erreur du dispatcher de notifications: {str(e)}")
+                dispatched = 0
+            if not dispatched:
+                await asyncio.sleep(self.poll_interval)
+
+    def stop(self):
+        self._running = False
+        logger.info("Dispatcher de notifications arrêté.")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "digested": self.digested,
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead": self.dead
+        }
+
+
+outbox_dispatcher = OutboxDispatcher()
@@ -0,0 +1,105 @@
+"""
+Limitation du débit des notifications sortantes.
+
+Chaque envoi passe par deux seaux à jetons : celui du canal (limites des
+fournisseurs : SMTP, Infobip, Telegram Bot API 30 msg/s) et celui du
+destinataire sur ce canal. Un message en excès n'est pas rejeté : il attend
+son tour. Les compteurs (messages admis, ralentis, en attente) sont exposés
+via /api/v1/health/notifications.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.rate_limit import KeyedTokenBuckets, TokenBucket
+
+
+@dataclass
+class ChannelStats:
+    admitted: int = 0
+    throttled: int = 0  # Messages ayant dû attendre
+    queued: int = 0  # Messages en attente actuellement
+    max_queued: int = 0
+    wait_seconds: float = 0.0
+
+
+class NotificationRateLimiter:
+    """Seaux à jetons par canal et par destinataire"""
+
+    def __init__(
+        self,
+        channel_rates: Dict[str, float],
+        recipient_rate: float,
+        recipient_burst: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.channels = {channel: TokenBucket(rate, clock=clock) for channel, rate in channel_rates.items()}
+        self.recipients = {
+            channel: KeyedTokenBuckets(recipient_rate, capacity=recipient_burst, clock=clock)
+            for channel in channel_rates
+        }
+        self.stats = {channel: ChannelStats() for channel in channel_rates}
+        self._clock = clock
+
+    def _try_acquire(self, channel: str, recipient: str) -> float:
+        """Consomme un jeton de chaque seau si possible ; sinon retourne l'attente nécessaire"""
+        channel_bucket = self.channels[channel]
+        recipient_bucket = self.recipients[channel].get(recipient)
+        wait = max(channel_bucket.delay_for(), recipient_bucket.delay_for())
+        if wait > 0:
+            return wait
+        # Les deux seaux sont consommés ensemble : un jeton pris seul serait perdu
+        if not channel_bucket.try_acquire():
+            return channel_bucket.delay_for()
+        if not recipient_bucket.try_acquire():
+            return recipient_bucket.delay_for()
+        return 0.0
+
+    async def acquire(self, channel: str, recipient: Optional[str] = None) -> None:
+        """Attend que le canal et le destinataire puissent recevoir un message"""
+        if channel not in self.channels:
+            return
+        stats = self.stats[channel]
+        recipient = recipient or "default"
+        wait = self._try_acquire(channel, recipient)
+        if wait > 0:
+            stats.throttled += 1
+            stats.queued += 1
+            stats.max_queued = max(stats.max_queued, stats.queued)
+            started = self._clock()
+            try:
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = self._try_acquire(channel, recipient)
+            finally:
+                stats.queued -= 1
+                stats.wait_seconds += self._clock() - started
+        stats.admitted += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            channel: {
+                "rate_per_second": self.channels[channel].rate,
+                "admitted": stats.admitted,
+                "throttled": stats.throttled,
+                "queued": stats.queued,
+                "max_queued": stats.max_queued,
+                "wait_seconds": round(stats.wait_seconds, 3)
+            }
+            for channel, stats in self.stats.items()
+        }
+
+
+# Partagé par tous les NotificationService (endpoint de test, dispatcher, pipeline)
+notification_rate_limiter = NotificationRateLimiter(
+    channel_rates={
+        "email": settings.NOTIFICATION_RATE_EMAIL,
+        "sms": settings.NOTIFICATION_RATE_SMS,
+        "whatsapp": settings.NOTIFICATION_RATE_WHATSAPP,
+        "telegram": settings.NOTIFICATION_RATE_TELEGRAM
+    },
+    recipient_rate=settings.NOTIFICATION_RECIPIENT_RATE,
+    recipient_burst=settings.NOTIFICATION_RECIPIENT_BURST
+)
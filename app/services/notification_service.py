@@ -1,24 +1,46 @@
-from app.services.email_service import EmailService
-from app.services.whatsapp_service import WhatsAppService
-from app.services.telegram_service import TelegramService
-from app.services.sms_service import SMSServiceFactory
+from functools import cached_property
+
+from app.services.notification_rate_limiter import NotificationRateLimiter, notification_rate_limiter
 
 class NotificationService:
     """Service unifié pour envoyer des notifications via plusieurs canaux."""
-    def __init__(self):
-        self.email_service = EmailService()
-        self.whatsapp_service = WhatsAppService()
-        self.telegram_service = TelegramService()
-        self.sms_service = SMSServiceFactory.get_service()
+    def __init__(self, rate_limiter: NotificationRateLimiter = None):
+        # Les messages au-delà du débit autorisé attendent leur tour (jamais abandonnés)
+        self.rate_limiter = rate_limiter or notification_rate_limiter
+
+    # Clients des canaux construits (et leurs modules importés) au premier envoi
+    @cached_property
+    def email_service(self):
+        from app.services.email_service import EmailService
+        return EmailService()
+
+    @cached_property
+    def whatsapp_service(self):
+        from app.services.whatsapp_service import WhatsAppService
+        return WhatsAppService()
+
+    @cached_property
+    def telegram_service(self):
+        from app.services.telegram_service import TelegramService
+        return TelegramService()
+
+    @cached_property
+    def sms_service(self):
+        from app.services.sms_service import SMSServiceFactory
+        return SMSServiceFactory.get_service()
 
     async def send_email(self, to: str, subject: str, body: str) -> dict:
-        return self.email_service.send_email(to, subject, body)
+        await self.rate_limiter.acquire("email", to)
+        return await self.email_service.send_email(to, subject, body)
 
     async def send_sms(self, to: str, message: str) -> dict:
+        await self.rate_limiter.acquire("sms", to)
         return await self.sms_service.send_sms(to, message)
 
     async def send_whatsapp(self, to: str, message: str) -> dict:
+        await self.rate_limiter.acquire("whatsapp", to)
         return await self.whatsapp_service.send_whatsapp(to, message)
 
     async def send_telegram(self, message: str, chat_id: str = None) -> dict:
-        return await self.telegram_service.send_telegram(message, chat_id)
\ No newline at end of file
+        await self.rate_limiter.acquire("telegram", chat_id)
+        return await self.telegram_service.send_telegram(message, chat_id)
@@ -0,0 +1,231 @@
+"""
+Moteur de gabarits des notifications.
+
+Les gabarits (sujet + corps) sont déclarés par nom, canal et langue, puis
+précompilés au chargement du module : le découpage des champs est fait une
+seule fois et un champ inconnu ou mal formé échoue au démarrage plutôt
+qu'à l'envoi.
+
+Le rendu est mis en cache (LRU) sur le contenu : le contexte ne contient
+jamais le destinataire, si bien qu'un envoi de masse (même culture pour des
+centaines de parcelles) ne rend chaque message distinct qu'une fois.
+
+Les SMS sont mesurés en segments (GSM-7 : 160 caractères, 153 par segment
+concaténé ; UCS-2 : 70 / 67). Les caractères hors GSM-7 usuels en français
+(ê, ç, î...) sont translittérés pour ne pas basculer tout le message en
+UCS-2, et le texte est tronqué au nombre de segments autorisé.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Alphabet GSM 03.38 : table de base (1 septet) et extension (2 septets : ESC + caractère)
+GSM7_BASIC = set(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+GSM7_EXTENDED = set("^{}\\[~]|€\f")
+
+GSM7_TRANSLITERATION = str.maketrans({
+    "â": "a", "ê": "e", "ë": "e", "î": "i", "ï": "i", "ô": "o", "û": "u", "ÿ": "y",
+    "ç": "c", "À": "A", "Â": "A", "È": "E", "Ê": "E", "Ë": "E", "Î": "I", "Ï": "I",
+    "Ô": "O", "Ù": "U", "Û": "U", "œ": "oe", "Œ": "OE", "’": "'", "‘": "'",
+    "«": '"', "»": '"', "“": '"', "”": '"', "…": "...", "–": "-", "—": "-", " ": " "
+})
+
+# Longueur maximale des messages hors SMS (limites des API WhatsApp et Telegram)
+CHANNEL_MAX_LENGTH = {"whatsapp": 4096, "telegram": 4096}
+
+
+@dataclass(frozen=True)
+class SMSInfo:
+    encoding: str  # "GSM-7" ou "UCS-2"
+    units: int  # Septets (GSM-7) ou unités UTF-16 (UCS-2)
+    segments: int
+
+
+def sms_encoding(text: str) -> str:
+    return "GSM-7" if all(c in GSM7_BASIC or c in GSM7_EXTENDED for c in text) else "UCS-2"
+
+
+def _units(char: str, encoding: str) -> int:
+    if encoding == "GSM-7":
+        return 2 if char in GSM7_EXTENDED else 1
+    # Les caractères hors plan multilingue de base (emoji) occupent deux unités UTF-16
+    return 2 if ord(char) > 0xFFFF else 1
+
+
+def sms_segments(text: str) -> SMSInfo:
+    """Encodage et nombre de segments facturés pour un SMS"""
+    encoding = sms_encoding(text)
+    units = sum(_units(c, encoding) for c in text)
+    single, multi = (160, 153) if encoding == "GSM-7" else (70, 67)
+    segments = 1 if units <= single else -(-units // multi)
+    return SMSInfo(encoding, units, segments)
+
+
+def fit_sms(text: str, max_segments: int, transliterate: bool = True) -> str:
+    """Translittère vers GSM-7 si demandé et tronque au nombre de segments autorisé"""
+    if transliterate:
+        text = text.translate(GSM7_TRANSLITERATION)
+    info = sms_segments(text)
+    if info.segments <= max_segments:
+        return text
+    single, multi = (160, 153) if info.encoding == "GSM-7" else (70, 67)
+    budget = (single if max_segments == 1 else multi * max_segments) - 3
+    kept, used = [], 0
+    for char in text:
+        used += _units(char, info.encoding)
+        if used > budget:
+            break
+        kept.append(char)
+    return "".join(kept).rstrip() + "..."
+
+
+class CompiledTemplate:
+    """Gabarit découpé une fois pour toutes en littéraux et champs"""
+
+    _formatter = Formatter()
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        for literal, field, spec, conversion in self._formatter.parse(source):
+            if field is not None and (not field.isidentifier() or "{" in (spec or "")):
+                raise ValueError(f"Champ de gabarit non supporté: {{{field}}} dans {source!r}")
+            self.parts.append((literal, field, spec or "", conversion))
+        self.fields = frozenset(field for _, field, _, _ in self.parts if field)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        out = []
+        for literal, field, spec, conversion in self.parts:
+            out.append(literal)
+            if field is not None:
+                value = context[field]
+                if conversion:
+                    value = self._formatter.convert_field(value, conversion)
+                out.append(format(value, spec))
+        return "".join(out)
+
+
+@dataclass(frozen=True)
+class RenderedNotification:
+    subject: Optional[str]
+    body: str
+    sms: Optional[SMSInfo] = None
+
+
+# (nom, canal, langue) -> (sujet, corps)
+TEMPLATES: Dict[Tuple[str, str, str], Tuple[Optional[str], str]] = {
+    ("recommendation_summary", "email", "fr"): (
+        "AgroPredict: Recommandation globale",
+        "Culture recommandée: {crop}\nConfiance: {confidence:.2f}%"
+    ),
+    ("recommendation_summary", "email", "en"): (
+        "AgroPredict: Overall recommendation",
+        "Recommended crop: {crop}\nConfidence: {confidence:.2f}%"
+    ),
+    ("recommendation_detail", "email", "fr"): (
+        "AgroPredict ({category}): {crop}",
+        "Catégorie: {category}\n\n{response}"
+    ),
+    ("recommendation_detail", "email", "en"): (
+        "AgroPredict ({category}): {crop}",
+        "Category: {category}\n\n{response}"
+    ),
+    ("recommendation_short", "*", "fr"): (
+        None,
+        "[AgroPredict] Culture: {crop} | Confiance: {confidence:.2f}%\nDétails complets envoyés par email."
+    ),
+    ("recommendation_short", "*", "en"): (
+        None,
+        "[AgroPredict] Crop: {crop} | Confidence: {confidence:.2f}%\nFull details sent by email."
+    ),
+    ("ml_prediction", "email", "fr"): ("Résultat de prédiction ML", "Votre prédiction: {crop}"),
+    ("ml_prediction", "email", "en"): ("ML prediction result", "Your prediction: {crop}"),
+    ("ml_prediction", "*", "fr"): (None, "[AgroPredict] Résultat ML: Votre prédiction est {crop}"),
+    ("ml_prediction", "*", "en"): (None, "[AgroPredict] ML result: your prediction is {crop}"),
+}
+
+
+class NotificationTemplateEngine:
+    """Gabarits précompilés par canal et par langue, avec cache de rendu partagé"""
+
+    def __init__(
+        self,
+        templates: Dict[Tuple[str, str, str], Tuple[Optional[str], str]],
+        default_language: str = "fr",
+        cache_size: int = 1024,
+        sms_max_segments: int = 3,
+        sms_transliterate: bool = True
+    ):
+        self.default_language = default_language
+        self.cache_size = cache_size
+        self.sms_max_segments = sms_max_segments
+        self.sms_transliterate = sms_transliterate
+        self.templates = {
+            key: (CompiledTemplate(subject) if subject is not None else None, CompiledTemplate(body))
+            for key, (subject, body) in templates.items()
+        }
+        self._cache: "OrderedDict[Tuple, RenderedNotification]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, name: str, channel: str, language: Optional[str] = None):
+        """Gabarit le plus précis : canal exact puis '*', langue demandée puis langue par défaut"""
+        for lang in (language or self.default_language, self.default_language):
+            for chan in (channel, "*"):
+                template = self.templates.get((name, chan, lang))
+                if template is not None:
+                    return template
+        raise KeyError(f"Aucun gabarit '{name}' pour le canal {channel}")
+
+    def render(self, name: str, channel: str, language: Optional[str] = None, **context) -> RenderedNotification:
+        key = (name, channel, language or self.default_language, tuple(sorted(context.items())))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        subject_template, body_template = self.resolve(name, channel, language)
+        subject = subject_template.render(context) if subject_template else None
+        body = body_template.render(context)
+        sms = None
+        if channel == "sms":
+            body = fit_sms(body, self.sms_max_segments, self.sms_transliterate)
+            sms = sms_segments(body)
+        elif channel in CHANNEL_MAX_LENGTH and len(body) > CHANNEL_MAX_LENGTH[channel]:
+            body = body[:CHANNEL_MAX_LENGTH[channel] - 3] + "..."
+        rendered = RenderedNotification(subject, body, sms)
+
+        with self._lock:
+            self._cache[key] = rendered
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return rendered
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "templates": len(self.templates),
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Compilé au démarrage : un gabarit invalide fait échouer l'import
+notification_templates = NotificationTemplateEngine(
+    TEMPLATES,
+    default_language=settings.NOTIFICATION_DEFAULT_LANGUAGE,
+    cache_size=settings.NOTIFICATION_RENDER_CACHE_SIZE,
+    sms_max_segments=settings.SMS_MAX_SEGMENTS,
+    sms_transliterate=settings.SMS_GSM7_TRANSLITERATE
+)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from fastapi import HTTPException, status
+from app.core.conditional import Version, query_version
 from app.models.parcelle import Parcelle, HistoriqueCulture
 from app.schemas.parcelle import ParcelleCreate, ParcelleUpdate
 import uuid
@@ -155,6 +156,28 @@ class ParcelleService:
             Parcelle.deleted_at.is_(None)
         ).order_by(Parcelle.created_at.desc()).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_parcelles_version(
+        db: Session,
+        user_id: Optional[str] = None,
+        terrain_id: Optional[str] = None,
+        parcelle_id: Optional[str] = None,
+        code: Optional[str] = None
+    ) -> Version:
+        """Version des parcelles du périmètre donné (toutes si aucun filtre)"""
+        from app.models.terrain import Terrain
+
+        query = db.query(Parcelle)
+        if user_id:
+            query = query.join(Terrain).filter(Terrain.user_id == user_id)
+        if terrain_id:
+            query = query.filter(Parcelle.terrain_id == terrain_id)
+        if parcelle_id:
+            query = query.filter(Parcelle.id == parcelle_id)
+        if code:
+            query = query.filter(Parcelle.code == code)
+        return query_version(query, Parcelle)
+
     @staticmethod
     def update_parcelle(
         db: Session, 
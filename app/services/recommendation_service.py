@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from fastapi import HTTPException, status
+from app.core.conditional import Version, query_version
 from app.models.recommendation import Recommendation
 from app.schemas.recommendation import RecommendationCreate, RecommendationUpdate
 from datetime import datetime
@@ -8,13 +9,19 @@ import uuid
 import logging
 from app.services.ml_service import MLService
 from app.services.expert_system_service import ExpertSystemService
-from app.services.notification_service import NotificationService
+from app.services.notification_outbox import enqueue_notification, normalize_channel
+from app.services.notification_templates import notification_templates
 from app.models.sensor_data import SensorMeasurements
 from app.models.parcelle import Parcelle
+from app.core.config import settings
+from app.services.job_queue import get_job_queue, job_handler
 from sqlalchemy import func
 
 logger = logging.getLogger(__name__)
 
+# Tâche de post-traitement d'une recommandation (système expert + notifications)
+EXPERT_NOTIFY_JOB = "recommendation.expert_notify"
+
 
 class RecommendationService:
     """Service pour la gestion des recommandations agricoles"""
@@ -130,6 +137,28 @@ class RecommendationService:
             Recommendation.date_emission.desc()
         ).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_recommendations_version(
+        db: Session,
+        user_id: str,
+        parcelle_id: Optional[str] = None,
+        recommendation_id: Optional[str] = None
+    ) -> Version:
+        """Version des recommandations d'un utilisateur (éventuellement d'une parcelle)"""
+        from app.models.parcelle import Parcelle
+        from app.models.terrain import Terrain
+
+        query = db.query(Recommendation).join(
+            Parcelle, Recommendation.parcelle_id == Parcelle.id
+        ).join(
+            Terrain, Parcelle.terrain_id == Terrain.id
+        ).filter(Terrain.user_id == user_id)
+        if parcelle_id:
+            query = query.filter(Recommendation.parcelle_id == parcelle_id)
+        if recommendation_id:
+            query = query.filter(Recommendation.id == recommendation_id)
+        return query_version(query, Recommendation)
+
     @staticmethod
     def get_all_recommendations(
         db: Session,
@@ -388,15 +417,26 @@ class RecommendationService:
 
         # Lancement de la tâche de fond pour l'enrichissement par le système expert et les notifications
         current_region = region or (parcelle.terrain.localite.region if parcelle and parcelle.terrain and parcelle.terrain.localite else "Centre")
-        background_tasks.add_task(
-            RecommendationService.run_expert_system_and_notify,
-            user=user,
-            parcelle_id=parcelle_id,
-            recommended_crop=recommended_crop,
-            ml_result=ml_result,
-            current_region=current_region,
-            query=query
-        )
+        if settings.JOB_QUEUE_ENABLED:
+            # File persistante traitée par le worker (python -m app.worker)
+            get_job_queue().enqueue(EXPERT_NOTIFY_JOB, {
+                "user_id": str(user.id),
+                "parcelle_id": parcelle_id,
+                "recommended_crop": recommended_crop,
+                "ml_result": ml_result.dict(),
+                "current_region": current_region,
+                "query": query
+            })
+        else:
+            background_tasks.add_task(
+                RecommendationService.run_expert_system_and_notify,
+                user=user,
+                parcelle_id=parcelle_id,
+                recommended_crop=recommended_crop,
+                ml_result=ml_result,
+                current_region=current_region,
+                query=query
+            )
 
         from app.schemas.ai_integration import UnifiedRecommendationResponse
         return UnifiedRecommendationResponse(
@@ -419,6 +459,32 @@ class RecommendationService:
     ):
         """
         Exécution asynchrone du système expert, sauvegarde en base de données et envoi des notifications.
+        Variante BackgroundTasks : les erreurs sont journalisées, sans reprise.
+        """
+        try:
+            await RecommendationService.process_expert_system_and_notify(
+                user=user,
+                parcelle_id=parcelle_id,
+                recommended_crop=recommended_crop,
+                ml_result=ml_result,
+                current_region=current_region,
+                query=query
+            )
+        except Exception as e:
+            logger.error(f"Erreur globale dans le traitement asynchrone de la recommandation: {str(e)}")
+
+    @staticmethod
+    async def process_expert_system_and_notify(
+        user: any,
+        parcelle_id: Optional[str],
+        recommended_crop: str,
+        ml_result: any,
+        current_region: str,
+        query: Optional[str]
+    ):
+        """
+        Système expert, sauvegarde de la recommandation et inscription de ses
+        notifications dans l'outbox (même transaction). Les erreurs sont propagées pour permettre les reprises de la file de tâches.
         """
         from app.database import SessionLocal
         db = SessionLocal()
@@ -459,55 +525,71 @@ class RecommendationService:
                 }
             )
             db.add(new_rec)
-            db.commit()
-            db.refresh(new_rec)
-    
-            # 5. Notifications
-            notif_service = NotificationService()
+
+            # 5. Notifications : inscrites dans l'outbox, dans la même transaction que la recommandation
             user_pref_modes = getattr(user, 'notification_modes', ['email'])
             
             # ---- Préparation des messages ----
-            # Email : 1 message résumé + 4 messages détaillés (un par catégorie)
+            # Rendus mis en cache : une même culture n'est rendue qu'une fois pour tous les utilisateurs
             confidence = ml_result.top3_global[0].confiance_agregee if ml_result.top3_global else 0.0
-            email_messages = [(
-                f"AgroPredict: Recommandation globale",
-                f"Culture recommandée: {recommended_crop}\nConfiance: {confidence:.2f}%"
+            # Email : 1 message résumé + 4 messages détaillés (un par catégorie)
+            email_messages = [notification_templates.render(
+                "recommendation_summary", "email", crop=recommended_crop, confidence=confidence
             )]
             for category, response_text in results_justification.items():
-                email_messages.append((
-                    f"AgroPredict ({category.capitalize()}): {recommended_crop}",
-                    f"Catégorie: {category.capitalize()}\n\n{response_text}"
+                email_messages.append(notification_templates.render(
+                    "recommendation_detail", "email",
+                    crop=recommended_crop, category=category.capitalize(), response=response_text
                 ))
 
-            # SMS/WhatsApp/Telegram : 1 seul message résumé (économie de crédits)
-            short_summary = (
-                f"[AgroPredict] Culture: {recommended_crop} | Confiance: {confidence:.2f}%\n"
-                f"Détails complets envoyés par email."
-            )
-            
-            # ---- Envoi par canal ----
+            # ---- Inscription par canal ----
             for mode_raw in user_pref_modes:
-                mode = str(mode_raw).lower()
-                if "." in mode:
-                    mode = mode.split(".")[-1]
-                
-                logger.info(f"Processing notifications for mode: {mode}")
-                try:
-                    if mode == 'email':
-                        for title, body in email_messages:
-                            await notif_service.send_email(user.email, title, body)
-                            logger.info(f"Email sent for '{title}'")
-                    elif mode == 'sms' and user.telephone:
-                        # 1 seul SMS résumé pour économiser les crédits
-                        res = await notif_service.send_sms(user.telephone, short_summary)
-                        logger.info(f"SMS send result: {res}")
-                    elif mode == 'whatsapp' and user.telephone:
-                        await notif_service.send_whatsapp(user.telephone, short_summary)
-                    elif mode == 'telegram':
-                        await notif_service.send_telegram(short_summary)
-                except Exception as e:
-                    logger.error(f"Erreur notification ({mode}) via background task: {str(e)}")
-        except Exception as e:
-            logger.error(f"Erreur globale dans le traitement asynchrone de la recommandation: {str(e)}")
+                mode = normalize_channel(mode_raw)
+                key = f"recommendation:{new_rec.id}:{mode}"
+                if mode == 'email':
+                    for index, message in enumerate(email_messages):
+                        enqueue_notification(
+                            db, "email", user.email, message.body, f"{key}:{index}",
+                            subject=message.subject, user_id=str(user.id), recommendation_id=new_rec.id
+                        )
+                elif mode in ('sms', 'whatsapp', 'telegram'):
+                    # 1 seul message résumé pour économiser les crédits
+                    recipient = None if mode == 'telegram' else user.telephone
+                    if mode != 'telegram' and not recipient:
+                        continue
+                    short_summary = notification_templates.render(
+                        "recommendation_short", mode, crop=recommended_crop, confidence=confidence
+                    )
+                    enqueue_notification(
+                        db, mode, recipient, short_summary.body, key,
+                        user_id=str(user.id), recommendation_id=new_rec.id
+                    )
+
+            db.commit()
         finally:
-            db.close()
\ No newline at end of file
+            db.close()
+
+
+@job_handler(EXPERT_NOTIFY_JOB)
+async def handle_expert_notify_job(payload: dict):
+    """Handler de la file de tâches : recharge l'utilisateur puis exécute le post-traitement"""
+    from app.database import SessionLocal
+    from app.models.user import User
+    from app.schemas.ai_integration import MLPredictResponse
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == payload["user_id"]).first()
+        if not user:
+            logger.warning(f"Tâche {EXPERT_NOTIFY_JOB} ignorée: utilisateur {payload['user_id']} introuvable")
+            return
+        await RecommendationService.process_expert_system_and_notify(
+            user=user,
+            parcelle_id=payload.get("parcelle_id"),
+            recommended_crop=payload["recommended_crop"],
+            ml_result=MLPredictResponse(**payload["ml_result"]),
+            current_region=payload["current_region"],
+            query=payload.get("query")
+        )
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+Moteur d'exécution des recommandations planifiées.
+
+Les parcelles à échéance (les plus anciennes d'abord) sont exécutées par un
+nombre borné de workers, sous deux limites de débit :
+
+- globale      : protège le service ML, le système expert et Infobip ;
+- par utilisateur : évite qu'un gros compte monopolise le lot. Une parcelle
+                    dont l'utilisateur a épuisé son quota est différée (tas
+                    trié par date de disponibilité) sans bloquer de worker.
+
+Chaque exécution produit un SchedulerRunReport (issue de chaque parcelle,
+durée, débit) ; run() ne rend la main qu'une fois toutes les tâches terminées.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Union
+
+from app.core.config import settings
+from app.core.rate_limit import KeyedTokenBuckets, TokenBucket
+from app.models.user import RecommendationFrequency
+
+logger = logging.getLogger(__name__)
+
+
+class DueParcelle(NamedTuple):
+    """Parcelle dont la dernière recommandation est plus ancienne que la fréquence du propriétaire"""
+    parcelle_id: str
+    user_id: str
+    last_recommended_at: Optional[datetime]
+    frequency: Optional[RecommendationFrequency] = None
+
+
+@dataclass
+class ParcelleOutcome:
+    """Issue du traitement d'une parcelle"""
+    parcelle_id: str
+    user_id: str
+    success: bool
+    duration: float
+    error: Optional[str] = None
+
+
+@dataclass
+class SchedulerRunReport:
+    """Bilan d'une exécution du scheduler"""
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    duration: float = 0.0
+    deferred: int = 0  # Parcelles distinctes différées au moins une fois
+    outcomes: List[ParcelleOutcome] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for outcome in self.outcomes if outcome.success)
+
+    @property
+    def failed(self) -> int:
+        return self.total - self.succeeded
+
+    @property
+    def throughput(self) -> float:
+        """Parcelles traitées par seconde"""
+        return self.total / self.duration if self.duration > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": round(self.duration, 3),
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "deferred": self.deferred,
+            "throughput_per_second": round(self.throughput, 3)
+        }
+
+
+class SchedulerEngine:
+    """Exécute un flux de parcelles avec concurrence et débits bornés"""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        global_rate: Optional[float] = None,
+        user_rate: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.concurrency = max(concurrency or settings.SCHEDULER_CONCURRENCY, 1)
+        # Capacité 1 : lissage strict, pas de rafale en début de lot
+        self.global_bucket = TokenBucket(
+            settings.SCHEDULER_GLOBAL_RATE if global_rate is None else global_rate, capacity=1, clock=clock
+        )
+        self.user_buckets = KeyedTokenBuckets(
+            settings.SCHEDULER_USER_RATE if user_rate is None else user_rate, capacity=1, clock=clock
+        )
+        self._clock = clock
+
+    async def run(
+        self,
+        items: Union[Iterable[DueParcelle], AsyncIterable[DueParcelle]],
+        process: Callable[[DueParcelle], Awaitable[None]]
+    ) -> SchedulerRunReport:
+        report = SchedulerRunReport()
+        start = self._clock()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        # Parcelles différées : (date de disponibilité, ordre d'arrivée, parcelle)
+        deferred: List[tuple] = []
+        # Une parcelle différée plusieurs fois n'est comptée qu'une fois dans le bilan
+        deferred_ids: Set[str] = set()
+        sequence = itertools.count()
+
+        async def execute(item: DueParcelle):
+            began = self._clock()
+            try:
+                await process(item)
+            except Exception as e:
+                error = f"{e.__class__.__name__}: {e}"
+                logger.error(f"Échec recommandation auto pour parcelle {item.parcelle_id}: {error}")
+                report.outcomes.append(ParcelleOutcome(item.parcelle_id, item.user_id, False, self._clock() - began, error))
+            else:
+                report.outcomes.append(ParcelleOutcome(item.parcelle_id, item.user_id, True, self._clock() - began))
+            finally:
+                semaphore.release()
+
+        async def admit(item: DueParcelle):
+            if not self.user_buckets.try_acquire(item.user_id):
+                heapq.heappush(deferred, (self._clock() + self.user_buckets.delay_for(item.user_id), next(sequence), item))
+                if item.parcelle_id not in deferred_ids:
+                    deferred_ids.add(item.parcelle_id)
+                    report.deferred += 1
+                return
+            await self.global_bucket.acquire()
+            # Contre-pression : on ne lit la suite que lorsqu'un worker se libère
+            await semaphore.acquire()
+            task = asyncio.create_task(execute(item))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        async def submit(item: DueParcelle):
+            # Les parcelles différées sont plus anciennes : elles repassent en priorité
+            while deferred and deferred[0][0] <= self._clock():
+                await admit(heapq.heappop(deferred)[2])
+            await admit(item)
+
+        if hasattr(items, "__aiter__"):
+            # Flux planifié : les parcelles arrivent à leur heure d'échéance
+            async for item in items:
+                await submit(item)
+        else:
+            for item in items:
+                await submit(item)
+
+        while deferred:
+            ready_at, _, item = heapq.heappop(deferred)
+            wait = ready_at - self._clock()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await admit(item)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        report.duration = self._clock() - start
+        report.finished_at = datetime.utcnow()
+        return report
@@ -1,93 +1,286 @@
 import asyncio
+import heapq
 import logging
+import time
+import zlib
+from collections import deque
 from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from fastapi import BackgroundTasks
+from sqlalchemy import case, func, or_
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.core.config import settings
+from app.core.leader_election import AdvisoryLock, FileLock, LeaderElector
+from app.database import SessionLocal, engine
 from app.models.user import User, RecommendationFrequency
 from app.models.recommendation import Recommendation
-from app.api.v1.recommendation_router import predict_parcelle_crop
-from app.models.sensor_data import SensorMeasurements
-from sqlalchemy import func
+from app.models.parcelle import Parcelle
+from app.models.terrain import Terrain
+from app.services.scheduler_engine import DueParcelle, SchedulerEngine, SchedulerRunReport
+from app.services.warmup_service import warmup_service
 
 logger = logging.getLogger(__name__)
 
+# Délai (jours) entre deux recommandations automatiques selon la fréquence choisie
+FREQUENCY_DAYS = {
+    RecommendationFrequency.WEEKLY: 7,
+    RecommendationFrequency.MONTHLY: 30,
+    RecommendationFrequency.QUARTERLY: 90
+}
+
+
+def _hash_fraction(value: str) -> float:
+    """Valeur stable dans [0, 1) dérivée d'une chaîne (indépendante de PYTHONHASHSEED)"""
+    return zlib.crc32(value.encode("utf-8")) / 2 ** 32
+
+
+def shard_of(parcelle_id: str, shard_count: int) -> int:
+    """Shard de scheduler responsable d'une parcelle"""
+    return zlib.crc32(parcelle_id.encode("utf-8")) % shard_count
+
+
+def next_due_time(item: DueParcelle, now: datetime, window: float, jitter: float) -> datetime:
+    """
+    Échéance de la parcelle : dernière recommandation + fréquence, décalée d'un
+    jitter propre à la parcelle. Les parcelles en retard (ou jamais traitées)
+    sont réparties sur la fenêtre courante plutôt que lancées toutes à l'instant.
+    """
+    fraction = _hash_fraction(f"jitter:{item.parcelle_id}")
+    if item.last_recommended_at is not None and item.frequency in FREQUENCY_DAYS:
+        due = item.last_recommended_at + timedelta(days=FREQUENCY_DAYS[item.frequency], seconds=fraction * jitter)
+        if due >= now:
+            return due
+    return now + timedelta(seconds=fraction * window)
+
+
 class SchedulerService:
     """Service pour gérer les tâches périodiques."""
-    
+
     _instance = None
     _running = False
+    last_report: Optional[SchedulerRunReport] = None
+    # Fabrique de sessions (remplaçable dans les tests)
+    session_factory = SessionLocal
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(SchedulerService, cls).__new__(cls)
+            cls._instance.elector = None
+            cls._instance.ticks = deque(maxlen=24)
         return cls._instance
 
+    @staticmethod
+    def build_elector() -> LeaderElector:
+        """Verrou consultatif PostgreSQL en production, verrou fichier sinon (SQLite, tests)"""
+        backend = settings.SCHEDULER_LEADER_LOCK
+        if backend == "auto":
+            backend = "postgres" if engine.dialect.name == "postgresql" else "file"
+        # Un leader par shard : chaque shard peut tourner sur un processus différent
+        suffix = f".{settings.SCHEDULER_SHARD_INDEX}" if settings.SCHEDULER_SHARD_COUNT > 1 else ""
+        if backend == "postgres":
+            lock = AdvisoryLock(engine, f"agropredict.scheduler{suffix}")
+        else:
+            lock = FileLock(f"{settings.SCHEDULER_LOCK_FILE}{suffix}")
+        return LeaderElector(lock, renew_interval=settings.SCHEDULER_LEASE_RENEW_INTERVAL)
+
     async def start(self):
-        """Démarre la boucle de vérification périodique."""
+        """Démarre la boucle périodique ; seul le leader du cluster exécute les lots."""
         if self._running:
             return
-        
+
         self._running = True
-        logger.info("Scheduler Service démarré.")
-        
-        while self._running:
-            try:
-                await self.check_and_trigger_recommendations()
-            except Exception as e:
-                logger.error(f"Erreur dans le scheduler: {str(e)}")
-            
-            # Vérification toutes les heures (3600 secondes)
-            # Pour le dev/test, on pourrait mettre moins.
-            await asyncio.sleep(3600)
+        if self.elector is None:
+            self.elector = self.build_elector()
+        await asyncio.to_thread(self.elector.step)
+        election = asyncio.create_task(self.elector.start())
+        logger.info(f"Scheduler Service démarré ({self.elector.identity}).")
+
+        next_tick = time.monotonic()
+        try:
+            while self._running:
+                if self.elector.is_leader and time.monotonic() >= next_tick:
+                    started = time.monotonic()
+                    await self.tick()
+                    # Fenêtre suivante, durée du lot déduite
+                    next_tick = started + settings.SCHEDULER_INTERVAL
+                # Les suiveurs se réveillent au rythme du bail pour prendre le relais
+                await asyncio.sleep(max(0.0, min(self.elector.renew_interval, next_tick - time.monotonic())))
+        finally:
+            election.cancel()
+            self.elector.resign()
 
     def stop(self):
         self._running = False
+        if self.elector is not None:
+            self.elector.stop()
         logger.info("Scheduler Service arrêté.")
 
-    async def check_and_trigger_recommendations(self):
-        """Vérifie quels utilisateurs ont besoin d'une nouvelle recommandation."""
-        db = SessionLocal()
+    async def tick(self) -> Optional[SchedulerRunReport]:
+        """Exécute un lot et en consigne la durée"""
+        started_at = datetime.utcnow()
+        started = time.monotonic()
+        report = None
+        try:
+            report = await self.check_and_trigger_recommendations()
+        except Exception as e:
+            logger.error(f"Erreur dans le scheduler: {str(e)}")
+        self.ticks.append({
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "total": report.total if report else None,
+            "failed": report.failed if report else None,
+            "error": report is None
+        })
+        return report
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "interval_seconds": settings.SCHEDULER_INTERVAL,
+            "leadership": self.elector.snapshot() if self.elector else None,
+            "last_run": self.last_report.summary() if self.last_report else None,
+            "ticks": list(self.ticks)
+        }
+
+    @staticmethod
+    def due_parcelles_query(db: Session, now: Optional[datetime] = None):
+        """
+        Calcule en une seule requête SQL les parcelles à traiter.
+
+        La dernière recommandation de chaque parcelle est obtenue par agrégat
+        (MAX(created_at) GROUP BY parcelle_id) puis comparée au seuil propre à
+        la fréquence du propriétaire. Les parcelles jamais traitées passent en
+        premier, puis les plus anciennes.
+        """
+        now = now or datetime.utcnow()
+        thresholds: Dict[RecommendationFrequency, datetime] = {
+            frequency: now - timedelta(days=days) for frequency, days in FREQUENCY_DAYS.items()
+        }
+
+        latest = db.query(
+            Recommendation.parcelle_id.label("parcelle_id"),
+            func.max(Recommendation.created_at).label("last_at")
+        ).group_by(Recommendation.parcelle_id).subquery()
+
+        threshold = case(
+            (User.recommendation_frequency == RecommendationFrequency.MONTHLY, thresholds[RecommendationFrequency.MONTHLY]),
+            (User.recommendation_frequency == RecommendationFrequency.QUARTERLY, thresholds[RecommendationFrequency.QUARTERLY]),
+            else_=thresholds[RecommendationFrequency.WEEKLY]
+        )
+
+        return db.query(
+            Parcelle.id,
+            User.id,
+            latest.c.last_at,
+            User.recommendation_frequency
+        ).join(
+            Terrain, Parcelle.terrain_id == Terrain.id
+        ).join(
+            User, Terrain.user_id == User.id
+        ).outerjoin(
+            latest, latest.c.parcelle_id == Parcelle.id
+        ).filter(
+            User.recommendation_frequency != RecommendationFrequency.DISABLED,
+            Parcelle.deleted_at.is_(None),
+            Terrain.deleted_at.is_(None),
+            or_(latest.c.last_at.is_(None), latest.c.last_at < threshold)
+        ).order_by(
+            latest.c.last_at.asc().nullsfirst()
+        )
+
+    @staticmethod
+    def iter_due_parcelles(db: Session, now: Optional[datetime] = None, batch_size: int = 1000) -> Iterator[DueParcelle]:
+        """Parcourt les parcelles à traiter par lots, sans tout charger en mémoire"""
+        query = SchedulerService.due_parcelles_query(db, now).execution_options(
+            stream_results=True
+        ).yield_per(batch_size)
+        for parcelle_id, user_id, last_at, frequency in query:
+            yield DueParcelle(str(parcelle_id), str(user_id), last_at, frequency)
+
+    def plan_window(
+        self,
+        db: Session,
+        now: datetime,
+        window: Optional[float] = None
+    ) -> List[Tuple[datetime, str, DueParcelle]]:
+        """
+        Tas (échéance, parcelle) des parcelles de ce shard arrivant à échéance
+        avant la fin de la fenêtre [now, now + window).
+        """
+        window = settings.SCHEDULER_INTERVAL if window is None else window
+        horizon = now + timedelta(seconds=window)
+        heap: List[Tuple[datetime, str, DueParcelle]] = []
+        for item in self.iter_due_parcelles(db, now=horizon):
+            if settings.SCHEDULER_SHARD_COUNT > 1 and shard_of(item.parcelle_id, settings.SCHEDULER_SHARD_COUNT) != settings.SCHEDULER_SHARD_INDEX:
+                continue
+            due = next_due_time(item, now, window, settings.SCHEDULER_JITTER_SECONDS)
+            if due < horizon:
+                heap.append((due, item.parcelle_id, item))
+        heapq.heapify(heap)
+        return heap
+
+    async def release_due(self, heap: List[Tuple[datetime, str, DueParcelle]]) -> AsyncIterator[DueParcelle]:
+        """Libère chaque parcelle à son échéance ; s'interrompt si la leadership est perdue"""
+        while heap:
+            wait = (heap[0][0] - datetime.utcnow()).total_seconds()
+            if wait > 0:
+                # Réveils bornés pour constater rapidement une perte de leadership
+                await asyncio.sleep(min(wait, settings.SCHEDULER_LEASE_RENEW_INTERVAL))
+                continue
+            if self.elector is not None and not self.elector.is_leader:
+                logger.warning(f"Leadership perdue : {len(heap)} parcelles laissées au prochain leader.")
+                return
+            yield heapq.heappop(heap)[2]
+
+    async def check_and_trigger_recommendations(self) -> SchedulerRunReport:
+        """Déclenche, chacune à son échéance, les recommandations de la fenêtre à venir."""
+        if settings.WARMUP_ENABLED:
+            # Réveiller les services IA avant le lot pour éviter les cold starts
+            await warmup_service.warm_all()
+
+        db = self.session_factory()
         try:
-            # Récupérer les utilisateurs avec recommandation activée
-            users = db.query(User).filter(User.recommendation_frequency != RecommendationFrequency.DISABLED).all()
-            
-            for user in users:
-                await self.process_user_recommendations(db, user)
-                
+            heap = self.plan_window(db, datetime.utcnow())
         finally:
             db.close()
 
-    async def process_user_recommendations(self, db: Session, user: User):
-        """Traite les recommandations pour un utilisateur donné."""
-        frequency_map = {
-            RecommendationFrequency.WEEKLY: 7,
-            RecommendationFrequency.MONTHLY: 30,
-            RecommendationFrequency.QUARTERLY: 90
-        }
-        
-        days = frequency_map.get(user.recommendation_frequency, 7)
-        threshold_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Pour chaque terrain et parcelle de l'utilisateur
-        for terrain in user.terrains:
-            for parcelle in terrain.parcelles:
-                # Vérifier la dernière recommandation pour cette parcelle
-                latest_rec = db.query(Recommendation)\
-                    .filter(Recommendation.parcelle_id == parcelle.id)\
-                    .order_by(Recommendation.created_at.desc())\
-                    .first()
-                
-                # Si pas de recommandation ou si la dernière est trop ancienne
-                if not latest_rec or latest_rec.created_at < threshold_date:
-                    logger.info(f"Déclenchement recommandation auto pour la parcelle {parcelle.id} (User: {user.email})")
-                    try:
-                        from app.services.recommendation_service import RecommendationService
-                        await RecommendationService.run_unified_recommendation(
-                            db=db,
-                            user=user,
-                            parcelle_id=str(parcelle.id)
-                        )
-                    except Exception as e:
-                        logger.error(f"Échec recommandation auto pour parcelle {parcelle.id}: {str(e)}")
-
-scheduler_service = SchedulerService()
+        report = await SchedulerEngine().run(self.release_due(heap), self.process_parcelle_recommendation)
+
+        self.last_report = report
+        logger.info(
+            f"Scheduler: {report.succeeded}/{report.total} recommandations générées "
+            f"en {report.duration:.1f}s ({report.throughput:.2f}/s, {report.failed} échecs)"
+        )
+        return report
+
+    async def process_parcelle_recommendation(self, item: DueParcelle):
+        """Génère la recommandation d'une parcelle (session dédiée pour l'exécution concurrente) ; les erreurs remontent au moteur."""
+        from app.services.recommendation_service import RecommendationService
+
+        db = self.session_factory()
+        try:
+            user = db.query(User).filter(User.id == item.user_id).first()
+            if user is None:
+                raise LookupError(f"Utilisateur {item.user_id} introuvable")
+            logger.info(f"Déclenchement recommandation auto pour la parcelle {item.parcelle_id} (User: {user.email})")
+            background_tasks = BackgroundTasks()
+            await RecommendationService.run_unified_recommendation(
+                db=db,
+                user=user,
+                background_tasks=background_tasks,
+                parcelle_id=item.parcelle_id
+            )
+            # Hors requête HTTP : exécuter nous-mêmes le post-traitement (système expert + notifications)
+            await background_tasks()
+        finally:
+            db.close()
+
+def get_scheduler_service() -> SchedulerService:
+    """Instance unique, construite au premier usage (lifespan, health)"""
+    return SchedulerService()
+
+
+def __getattr__(name):
+    if name == "scheduler_service":
+        return get_scheduler_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from fastapi import HTTPException, status
+from app.core.conditional import Version, query_version, table_version
 from app.models.terrain import Terrain
 from app.schemas.terrain import TerrainCreate, TerrainUpdate
 import uuid
@@ -67,6 +68,23 @@ class TerrainService:
         
         return query.order_by(Terrain.created_at.desc()).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_terrains_version(
+        db: Session,
+        user_id: str,
+        terrain_id: Optional[str] = None
+    ) -> List[Version]:
+        """Version des terrains d'un utilisateur et de leurs parcelles (nombre_parcelles)"""
+        from app.models.parcelle import Parcelle
+
+        criteria = [Terrain.user_id == user_id]
+        if terrain_id:
+            criteria.append(Terrain.id == terrain_id)
+        return [
+            table_version(db, Terrain, *criteria),
+            query_version(db.query(Parcelle).join(Terrain).filter(*criteria), Parcelle)
+        ]
+
     @staticmethod
     def get_all_terrains_admin(
         db: Session,
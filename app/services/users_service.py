@@ -3,9 +3,11 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from app.models.user import User, UserRole, UserStatus
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_password, verify_password_async
+from app.core.principal_cache import principal_cache
 
 
 class UserService:
@@ -72,6 +74,7 @@ class UserService:
 
         try:
             db.commit()
+            principal_cache.invalidate(user_id)
             db.refresh(db_user)
             return db_user
         except Exception as e:
@@ -93,6 +96,7 @@ class UserService:
 
         db.delete(db_user)
         db.commit()
+        principal_cache.invalidate(user_id)
         return True
 
     @staticmethod
@@ -107,11 +111,28 @@ class UserService:
         # Mise a jour du dernier acces
         return UserService.update_last_access(db, user)
 
+    @staticmethod
+    async def authenticate_user_async(db: Session, email: str, password: str) -> Optional[User]:
+        """
+        Authentifie un utilisateur sans bloquer la boucle asyncio : bcrypt
+        passe par le pool dédié, la lecture et le commit SQLAlchemy
+        (synchrones) par le threadpool de FastAPI.
+        """
+        user = await run_in_threadpool(UserService.get_user_by_email, db, email)
+        if not user:
+            return None
+        if not await verify_password_async(password, user.password_hash):
+            return None
+
+        # Mise a jour du dernier acces
+        return await run_in_threadpool(UserService.update_last_access, db, user)
+
     @staticmethod
     def update_last_access(db: Session, user: User) -> User:
         """Met a jour la date de dernier acces"""
         user.dernier_acces = datetime.utcnow()
         db.commit()
+        principal_cache.invalidate(user.id)
         db.refresh(user)
         return user
 
@@ -127,6 +148,7 @@ class UserService:
         
         db_user.status = status_val
         db.commit()
+        principal_cache.invalidate(user_id)
         db.refresh(db_user)
         return db_user
 
@@ -146,6 +168,7 @@ class UserService:
 
         user.password_hash = get_password_hash(new_password)
         db.commit()
+        principal_cache.invalidate(user.id)
         db.refresh(user)
         return user
 
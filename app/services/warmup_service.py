@@ -0,0 +1,188 @@
+"""
+Préchauffage et maintien en éveil des services IA hébergés sur Render.
+
+Les instances Render gratuites s'endorment après une période d'inactivité ;
+la première requête suivante subit un démarrage à froid (cold start) de
+plusieurs dizaines de secondes. Ce service :
+
+- ping les services configurés au démarrage de l'application ;
+- les ping ensuite à intervalle adaptatif, calé sur le délai d'inactivité
+  observé (plus petit écart entre deux pings ayant produit un cold start) ;
+- enregistre des histogrammes de latence séparés pour les pings à froid et
+  à chaud ;
+- est appelé par le scheduler juste avant chaque lot de recommandations.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """Histogramme de latences à seaux fixes (secondes)"""
+
+    BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}s" for b in self.BUCKETS] + [f">{self.BUCKETS[-1]}s"]
+        return {
+            "count": self.count,
+            "mean_seconds": round(self.total / self.count, 3) if self.count else None,
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class WarmupTarget:
+    """Service amont à maintenir en éveil et estimation de son délai d'inactivité"""
+
+    def __init__(self, name: str, url: str, initial_idle_timeout: float):
+        self.name = name
+        self.url = url
+        self.initial_idle_timeout = initial_idle_timeout
+        self.last_ping_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        # Plus petit écart ayant produit un cold start / plus grand écart resté chaud
+        self.cold_gap_min: Optional[float] = None
+        self.warm_gap_max: Optional[float] = None
+        self.cold = LatencyHistogram()
+        self.warm = LatencyHistogram()
+
+    @property
+    def idle_timeout_estimate(self) -> float:
+        if self.cold_gap_min is not None:
+            return self.cold_gap_min
+        return max(self.initial_idle_timeout, self.warm_gap_max or 0.0)
+
+    def record(self, now: float, latency: float, cold: bool) -> None:
+        gap = now - self.last_success_at if self.last_success_at is not None else None
+        if cold:
+            self.cold.observe(latency)
+            if gap is not None:
+                self.cold_gap_min = gap if self.cold_gap_min is None else min(self.cold_gap_min, gap)
+        else:
+            self.warm.observe(latency)
+            if gap is not None:
+                self.warm_gap_max = gap if self.warm_gap_max is None else max(self.warm_gap_max, gap)
+                # Resté chaud au-delà du délai supposé : le service a changé, on réapprend
+                if self.cold_gap_min is not None and gap >= self.cold_gap_min:
+                    self.cold_gap_min = None
+        self.last_success_at = now
+        self.last_latency = latency
+        self.last_error = None
+
+
+class WarmupService:
+    """Pinger de maintien en éveil des services IA"""
+
+    def __init__(self, targets: Optional[Dict[str, str]] = None):
+        if targets is None:
+            targets = {
+                "ml_service": str(settings.ML_SERVICE_URL),
+                "expert_system": str(settings.EXPERT_SYSTEM_URL),
+            }
+        self.targets: List[WarmupTarget] = [
+            WarmupTarget(name, url.rstrip("/") + "/", settings.WARMUP_INITIAL_IDLE_TIMEOUT)
+            for name, url in targets.items()
+        ]
+        self._running = False
+
+    def interval_for(self, target: WarmupTarget) -> float:
+        """Intervalle de ping : une fraction du délai d'inactivité estimé, borné"""
+        interval = target.idle_timeout_estimate * settings.WARMUP_SAFETY_FACTOR
+        return max(settings.WARMUP_MIN_INTERVAL, min(settings.WARMUP_MAX_INTERVAL, interval))
+
+    async def ping(self, target: WarmupTarget, client: httpx.AsyncClient) -> Optional[float]:
+        """Ping un service ; toute réponse HTTP < 500 signifie que l'instance est éveillée"""
+        started = time.monotonic()
+        target.last_ping_at = started
+        try:
+            response = await client.get(target.url)
+            latency = time.monotonic() - started
+            if response.status_code >= 500:
+                target.last_error = f"HTTP {response.status_code}"
+                return None
+        except httpx.HTTPError as e:
+            target.last_error = str(e) or e.__class__.__name__
+            logger.warning(f"Préchauffage {target.name} échoué: {target.last_error}")
+            return None
+
+        cold = latency >= settings.WARMUP_COLD_THRESHOLD
+        target.record(time.monotonic(), latency, cold)
+        logger.info(f"Préchauffage {target.name}: {latency:.2f}s ({'froid' if cold else 'chaud'})")
+        return latency
+
+    async def warm_all(self) -> None:
+        """Ping tous les services en parallèle (démarrage, avant un lot du scheduler)"""
+        timeout = httpx.Timeout(settings.UPSTREAM_MAX_TIMEOUT, connect=10.0)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            await asyncio.gather(*(self.ping(target, client) for target in self.targets))
+
+    async def start(self):
+        """Boucle de maintien en éveil"""
+        if self._running:
+            return
+        self._running = True
+        logger.info("Service de préchauffage démarré.")
+
+        timeout = httpx.Timeout(settings.UPSTREAM_MAX_TIMEOUT, connect=10.0)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            await asyncio.gather(*(self.ping(target, client) for target in self.targets))
+            while self._running:
+                now = time.monotonic()
+                due_in = [
+                    (target.last_ping_at or 0.0) + self.interval_for(target) - now
+                    for target in self.targets
+                ]
+                await asyncio.sleep(max(min(due_in), 1.0))
+                now = time.monotonic()
+                due = [
+                    target for target in self.targets
+                    if now - (target.last_ping_at or 0.0) >= self.interval_for(target)
+                ]
+                await asyncio.gather(*(self.ping(target, client) for target in due))
+
+    def stop(self):
+        self._running = False
+        logger.info("Service de préchauffage arrêté.")
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            "enabled": settings.WARMUP_ENABLED,
+            "running": self._running,
+            "targets": {
+                target.name: {
+                    "url": target.url,
+                    "idle_timeout_estimate_seconds": round(target.idle_timeout_estimate, 1),
+                    "ping_interval_seconds": round(self.interval_for(target), 1),
+                    "seconds_since_last_success": round(now - target.last_success_at, 1) if target.last_success_at else None,
+                    "last_latency_seconds": round(target.last_latency, 3) if target.last_latency is not None else None,
+                    "last_error": target.last_error,
+                    "cold": target.cold.snapshot(),
+                    "warm": target.warm.snapshot(),
+                }
+                for target in self.targets
+            }
+        }
+
+
+warmup_service = WarmupService()
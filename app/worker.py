@@ -0,0 +1,125 @@
+"""
+Worker de tâches de fond.
+
+Consomme la file persistante (table jobs) et distribue l'outbox des
+notifications hors du processus web, de sorte que le système expert et les
+notifications ne concurrencent plus le traitement des requêtes HTTP.
+
+Usage:
+    python -m app.worker
+"""
+import asyncio
+import logging
+import random
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+from app.services.job_queue import JOB_HANDLERS, JobHandler, JobQueue, QueuedJob, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """Exécute les tâches réservées avec une concurrence bornée et des reprises avec backoff"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Optional[Dict[str, JobHandler]] = None,
+        concurrency: Optional[int] = None,
+        visibility_timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.queue = queue
+        self.handlers = handlers if handlers is not None else JOB_HANDLERS
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.visibility_timeout = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self._tasks: Set[asyncio.Task] = set()
+        self._running = False
+        self.processed = 0
+        self.failed = 0
+
+    def retry_delay(self, attempts: int) -> float:
+        """Backoff exponentiel avec jitter"""
+        delay = min(settings.JOB_RETRY_MAX_DELAY, settings.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _execute(self, job: QueuedJob) -> None:
+        handler = self.handlers.get(job.name)
+        try:
+            if handler is None:
+                raise LookupError(f"Aucun handler pour la tâche '{job.name}'")
+            await asyncio.wait_for(handler(job.payload), timeout=self.visibility_timeout)
+        except Exception as e:
+            self.failed += 1
+            error = f"{e.__class__.__name__}: {e}"
+            retry = self.queue.fail(job, error, self.retry_delay(job.attempts))
+            logger.error(
+                f"Tâche {job.name} ({job.id}) en échec, tentative {job.attempts}/{job.max_attempts}"
+                f"{' - nouvelle tentative prévue' if retry else ''}: {error}"
+            )
+        else:
+            self.processed += 1
+            self.queue.complete(job)
+
+    async def run_once(self) -> int:
+        """Réserve autant de tâches que de places libres et les lance ; retourne le nombre lancé"""
+        free = self.concurrency - len(self._tasks)
+        if free <= 0:
+            return 0
+        jobs = self.queue.claim(free, self.visibility_timeout)
+        for job in jobs:
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(jobs)
+
+    async def drain(self) -> None:
+        """Traite la file jusqu'à ce qu'elle soit vide (tests, exécution ponctuelle)"""
+        while await self.run_once() or self._tasks:
+            if self._tasks:
+                await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+
+    async def start(self):
+        self._running = True
+        logger.info(f"Worker démarré (concurrence: {self.concurrency}).")
+        while self._running:
+            try:
+                launched = await self.run_once()
+            except Exception as e:
+                logger.error(f"Erreur lors de la réservation des tâches: {str(e)}")
+                launched = 0
+            if not launched:
+                await asyncio.sleep(self.poll_interval)
+            elif self._tasks and len(self._tasks) >= self.concurrency:
+                await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+    def stop(self):
+        self._running = False
+        logger.info("Worker arrêté.")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # Enregistre les handlers de tâches
+    import app.services.recommendation_service  # noqa: F401
+    from app.services.notification_outbox import outbox_dispatcher
+
+    worker = JobWorker(get_job_queue())
+
+    async def run():
+        # Le worker distribue aussi l'outbox des notifications
+        await asyncio.gather(worker.start(), outbox_dispatcher.start())
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        worker.stop()
+        outbox_dispatcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -6,16 +8,26 @@ from sqlalchemy.exc import IntegrityError
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.database import engine
-from app.models import Base
 from app.schemas.response import ApiResponse
+from app.core.responses import EnvelopeJSONResponse
+from app.core.compression import CompressionMiddleware, install_precompressed_openapi
+from app.core.lifespan import background_services
+
+
+# Le schéma de la base est géré par Alembic (alembic upgrade head), pas à l'import
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.openapi_payload()
+    async with background_services():
+        yield
 
-# Créer les tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
+    lifespan=lifespan,
+    # Enveloppe ApiResponse appliquée à l'encodage des réponses JSON réussies
+    default_response_class=EnvelopeJSONResponse,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     servers=[
         {"url": "https://iot-soil-backend.onrender.com", "description": "Production server"},
@@ -31,7 +43,9 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         content=ApiResponse.error(
             message=str(exc.detail),
             code=exc.status_code
-        ).dict()
+        ).dict(),
+        # Retry-After, WWW-Authenticate...
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(RequestValidationError)
@@ -71,64 +85,6 @@ async def generic_exception_handler(request: Request, exc: Exception):
         ).dict()
     )
 
-@app.middleware("http")
-async def wrap_responses(request: Request, call_next):
-    # Ignorer les docs et openapi
-    if request.url.path.startswith(f"{settings.API_V1_PREFIX}/docs") or \
-       request.url.path.startswith(f"{settings.API_V1_PREFIX}/openapi.json") or \
-       request.url.path == "/":
-        return await call_next(request)
-
-    response = await call_next(request)
-    
-    # On ne wrap que les réponses JSON réussies (2xx) qui ne sont pas déjà wrappées
-    if response.status_code >= 200 and response.status_code < 300:
-        if "application/json" in response.headers.get("content-type", ""):
-            import json
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-            
-            try:
-                data = json.loads(body)
-                # Vérifier si c'est déjà wrappé
-                if isinstance(data, dict) and "success" in data and "code" in data:
-                    # Déjà wrappé (probablement par un handler d'exception ou une route spécifique)
-                    # reconstruct response
-                    from fastapi.responses import Response
-                    return Response(
-                        content=body,
-                        status_code=response.status_code,
-                        headers=dict(response.headers),
-                        media_type="application/json"
-                    )
-
-                wrapped_data = ApiResponse.ok(
-                    data=data,
-                    code=response.status_code
-                ).dict()
-                
-                new_headers = dict(response.headers)
-                new_headers.pop("content-length", None)
-                
-                from fastapi.responses import JSONResponse
-                return JSONResponse(
-                    status_code=response.status_code,
-                    content=wrapped_data,
-                    headers=new_headers
-                )
-            except Exception:
-                # Si erreur de parsing, renvoyer la réponse originale
-                from fastapi.responses import Response
-                return Response(
-                    content=body,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type=response.media_type
-                )
-                
-    return response
-
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -138,11 +94,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression gzip/brotli (après l'enveloppe, au-delà de COMPRESSION_MINIMUM_SIZE octets)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+
 # Router principal
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
+# Schéma OpenAPI sérialisé et compressé une seule fois
+install_precompressed_openapi(app)
+
 
-@app.get("/")
+@app.get("/", response_class=JSONResponse)
 async def root():
     return {
         "message": "AgroPredict API",
@@ -0,0 +1,74 @@
+"""
+Benchmark de la compression d'une liste de mesures de capteurs.
+
+Construit une réponse enveloppée de N mesures (blob JSON measurements par
+ligne), puis affiche pour chaque encodage la taille transmise, le ratio et
+le temps de compression par réponse. Brotli n'apparaît que si le paquet
+est installé.
+
+Usage:
+    python scripts/benchmark_compression.py --rows 1000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-compression-script")
+
+from app.core.compression import StreamCompressor, available_encodings  # noqa: E402
+from app.core.responses import EnvelopeJSONResponse  # noqa: E402
+
+
+def build_rows(rows: int):
+    started = datetime.utcnow()
+    capteur_id = str(uuid.uuid4())
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "capteur_id": capteur_id,
+            "timestamp": started - timedelta(minutes=15 * i),
+            "measurements": {
+                "ph": round(random.uniform(5.5, 7.5), 2),
+                "humidity": round(random.uniform(20, 80), 1),
+                "temperature": round(random.uniform(18, 35), 1),
+                "nitrogen": random.randint(5, 40),
+                "phosphorus": random.randint(5, 40),
+                "potassium": random.randint(5, 40),
+                "battery": round(random.uniform(3.3, 4.2), 2),
+                "rssi": random.randint(-120, -60),
+            },
+        }
+        for i in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = EnvelopeJSONResponse(build_rows(args.rows)).body
+    print(f"{args.rows} mesures, {len(body):,} octets non compressés")
+    print(f"{'encodage':<12}{'niveau':>8}{'octets':>12}{'ratio':>8}{'ms/réponse':>12}")
+    for encoding in available_encodings():
+        levels = (4, 6, 11) if encoding == "br" else (1, 6, 9)
+        for level in levels:
+            def run():
+                compressor = StreamCompressor(encoding, gzip_level=level, brotli_quality=level)
+                return compressor.compress(body) + compressor.finish()
+            size = len(run())
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                run()
+            elapsed = (time.perf_counter() - started) / args.repeat * 1000
+            print(f"{encoding:<12}{level:>8}{size:>12,}{len(body) / size:>7.1f}x{elapsed:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark de l'enveloppe ApiResponse sur un listing de mesures.
+
+Compare l'ancien middleware wrap_responses (corps relu, re-parsé puis
+ré-encodé) à EnvelopeJSONResponse (enveloppe appliquée à l'encodage) :
+temps CPU par requête et pic mémoire d'une requête.
+
+Usage:
+    python scripts/benchmark_envelope.py --rows 1000 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-envelope-script")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, Response  # noqa: E402
+
+from app.core.responses import EnvelopeJSONResponse  # noqa: E402
+from app.schemas.response import ApiResponse  # noqa: E402
+from app.schemas.sensor_data import SensorMeasurementsResponse  # noqa: E402
+
+
+def build_rows(count: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "ph": 6.5, "azote": 12.0, "phosphore": 8.0, "potassium": 10.0,
+            "humidity": 41.2, "temperature": 27.3,
+            "capteur_id": str(uuid.uuid4()),
+            "timestamp": now - timedelta(minutes=i),
+            "measurements": {"ph": 6.5, "humidity": 41.2, "battery": 3.7, "rssi": -97},
+            "parcelle_id": str(uuid.uuid4()),
+            "created_at": now, "updated_at": now
+        }
+        for i in range(count)
+    ]
+
+
+def build_app(rows: List[dict], legacy: bool) -> FastAPI:
+    app = FastAPI(default_response_class=JSONResponse if legacy else EnvelopeJSONResponse)
+
+    @app.get("/measurements", response_model=List[SensorMeasurementsResponse])
+    async def list_measurements():
+        return rows
+
+    if legacy:
+        # Copie de l'ancien middleware de main.py
+        @app.middleware("http")
+        async def wrap_responses(request: Request, call_next):
+            response = await call_next(request)
+            if 200 <= response.status_code < 300 and "application/json" in response.headers.get("content-type", ""):
+                body = b""
+                async for chunk in response.body_iterator:
+                    body += chunk
+                data = json.loads(body)
+                if isinstance(data, dict) and "success" in data and "code" in data:
+                    return Response(content=body, status_code=response.status_code, media_type="application/json")
+                headers = dict(response.headers)
+                headers.pop("content-length", None)
+                return JSONResponse(
+                    status_code=response.status_code,
+                    content=ApiResponse.ok(data=data, code=response.status_code).dict(),
+                    headers=headers
+                )
+            return response
+
+    return app
+
+
+async def measure(app: FastAPI, requests: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/measurements")  # Préchauffage
+
+        tracemalloc.start()
+        response = await client.get("/measurements")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(response.json()["data"]) > 0
+
+        cpu = time.process_time()
+        for _ in range(requests):
+            await client.get("/measurements")
+        cpu = (time.process_time() - cpu) / requests
+    return cpu, peak
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    print(f"Listing de {args.rows} mesures, {args.requests} requêtes")
+    results = {}
+    for name, legacy in (("middleware wrap_responses", True), ("EnvelopeJSONResponse", False)):
+        cpu, peak = await measure(build_app(rows, legacy), args.requests)
+        results[name] = cpu
+        print(f"  {name:<26} CPU {cpu * 1000:7.2f} ms/requête   pic mémoire {peak / 1024 / 1024:6.2f} Mo")
+    legacy_cpu, new_cpu = results.values()
+    print(f"  Gain CPU : x{legacy_cpu / new_cpu:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark de la vérification des tokens d'accès (HS256).
+
+Compare, par token vérifié :
+  - python-jose (jwt.decode, implémentation actuelle)
+  - une vérification HS256 minimale en bibliothèque standard (hmac + json)
+  - HMAC de cryptography (déjà installé pour python-jose)
+  - decode_token avec le cache des tokens vérifiés (cas d'un token déjà vu)
+
+PyJWT et authlib ne sont pas installés : la vérification en bibliothèque
+standard donne la borne basse d'un décodeur HS256 sans dépendance.
+
+Usage:
+    python scripts/benchmark_jwt.py --iterations 20000
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-jwt-script")
+
+from cryptography.hazmat.primitives import hashes  # noqa: E402
+from cryptography.hazmat.primitives.hmac import HMAC  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token, decode_token, verified_tokens  # noqa: E402
+
+
+def b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def stdlib_decode(token: str, key: bytes) -> dict:
+    signing_input, _, signature = token.rpartition(".")
+    header = json.loads(b64decode(signing_input.split(".")[0]))
+    if header.get("alg") != "HS256":
+        raise ValueError("alg")
+    expected = hmac.new(key, signing_input.encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, b64decode(signature)):
+        raise ValueError("signature")
+    claims = json.loads(b64decode(signing_input.split(".")[1]))
+    if claims["exp"] <= time.time():
+        raise ValueError("exp")
+    return claims
+
+
+def cryptography_decode(token: str, key: bytes) -> dict:
+    signing_input, _, signature = token.rpartition(".")
+    header = json.loads(b64decode(signing_input.split(".")[0]))
+    if header.get("alg") != "HS256":
+        raise ValueError("alg")
+    mac = HMAC(key, hashes.SHA256())
+    mac.update(signing_input.encode())
+    mac.verify(b64decode(signature))
+    claims = json.loads(b64decode(signing_input.split(".")[1]))
+    if claims["exp"] <= time.time():
+        raise ValueError("exp")
+    return claims
+
+
+def per_call(fn, iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "3f2c1e8a-user", "email": "user@example.com", "role": "user"})
+    key = settings.SECRET_KEY.encode()
+    expected = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    assert stdlib_decode(token, key) == expected == cryptography_decode(token, key)
+
+    def cached():
+        return decode_token(token)
+
+    def uncached():
+        verified_tokens.clear()
+        return decode_token(token)
+
+    results = [
+        ("python-jose jwt.decode", per_call(lambda: jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"]), args.iterations)),
+        ("HS256 bibliothèque standard", per_call(lambda: stdlib_decode(token, key), args.iterations)),
+        ("HS256 cryptography", per_call(lambda: cryptography_decode(token, key), args.iterations)),
+        ("decode_token (cache vide)", per_call(uncached, args.iterations)),
+        ("decode_token (cache chaud)", per_call(cached, args.iterations)),
+    ]
+    baseline = results[0][1]
+    print(f"{args.iterations} vérifications")
+    for name, micros in results:
+        print(f"  {name:<30} {micros:8.2f} µs/token   x{baseline / micros:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark du hachage bcrypt sous des connexions concurrentes.
+
+Compare bcrypt exécuté directement dans la boucle asyncio (ancien
+register_user) au pool dédié PasswordHasherPool : débit de vérifications
+et retard de la boucle d'événements mesuré par une tâche témoin qui dort
+5 ms en continu (ce que subirait le webhook ChirpStack).
+
+Usage:
+    python scripts/benchmark_password_hashing.py --attempts 20 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-password-hashing-script")
+
+from app.core.security import PasswordHasherPool, get_password_hash, verify_password  # noqa: E402
+
+PASSWORD = "TestPassword123"
+TICK = 0.005
+
+
+async def watch_loop(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def run(mode: str, attempts: int, workers: int, hashed: str):
+    pool = PasswordHasherPool(workers=workers, max_pending=attempts)
+
+    async def attempt():
+        if mode == "inline":
+            return verify_password(PASSWORD, hashed)
+        return await pool.run(verify_password, PASSWORD, hashed)
+
+    lags, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(lags, stop))
+    await asyncio.sleep(TICK * 2)
+    started = time.perf_counter()
+    await asyncio.gather(*(attempt() for _ in range(attempts)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await watcher
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[-1]
+    print(
+        f"  {mode:<7} {attempts / elapsed:7.1f} vérifications/s   "
+        f"retard boucle médian {statistics.median(lags) * 1000:7.1f} ms   "
+        f"p99 {p99 * 1000:7.1f} ms   max {lags[-1] * 1000:7.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    hashed = get_password_hash(PASSWORD)
+    print(f"{args.attempts} connexions concurrentes, pool de {args.workers} threads")
+    await run("inline", args.attempts, args.workers, hashed)
+    await run("pool", args.attempts, args.workers, hashed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
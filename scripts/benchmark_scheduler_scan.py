@@ -0,0 +1,141 @@
+"""
+Benchmark du scan du scheduler de recommandations.
+
+Compare l'ancien parcours (utilisateurs -> terrains -> parcelles -> dernière
+recommandation, une requête par niveau) avec la requête ensembliste de
+SchedulerService.due_parcelles_query, sur une base SQLite générée.
+
+Usage:
+    python scripts/benchmark_scheduler_scan.py --users 10000 --parcelles 100000
+    python scripts/benchmark_scheduler_scan.py --users 1000 --parcelles 10000 --db-url postgresql://...
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-scheduler-script")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.models.base import Base  # noqa: E402
+from app.models.parcelle import Parcelle  # noqa: E402
+from app.models.recommendation import Recommendation  # noqa: E402
+from app.models.terrain import Terrain  # noqa: E402
+from app.models.user import RecommendationFrequency, User  # noqa: E402
+from app.services.scheduler_service import FREQUENCY_DAYS, SchedulerService  # noqa: E402
+
+FREQUENCIES = list(RecommendationFrequency)
+
+
+def seed(engine, users, parcelles, seed_value):
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    user_rows, terrain_rows, parcelle_rows, reco_rows = [], [], [], []
+
+    for i in range(users):
+        user_rows.append({
+            "id": str(uuid.uuid4()), "created_at": now, "nom": "N", "prenom": "P",
+            "email": f"user{i}@bench.local", "password_hash": "x", "role": "USER", "status": "ACTIVE",
+            "notification_modes": [], "recommendation_frequency": rng.choice(FREQUENCIES).name,
+            "date_inscription": now
+        })
+    # Un terrain par utilisateur, parcelles réparties aléatoirement
+    for user in user_rows:
+        terrain_rows.append({
+            "id": str(uuid.uuid4()), "created_at": now, "nom": "T", "localite_id": "bench", "user_id": user["id"]
+        })
+    for i in range(parcelles):
+        terrain = terrain_rows[i % users] if i < users else rng.choice(terrain_rows)
+        parcelle_id = str(uuid.uuid4())
+        parcelle_rows.append({
+            "id": parcelle_id, "created_at": now, "nom": f"P{i}", "terrain_id": terrain["id"], "superficie": 1.0
+        })
+        for _ in range(rng.randint(0, 3)):
+            reco_rows.append({
+                "id": str(uuid.uuid4()), "created_at": now - timedelta(days=rng.randint(0, 120)),
+                "titre": "R", "contenu": "C", "priorite": "Normal", "date_emission": now,
+                "parcelle_id": parcelle_id, "user_id": terrain["user_id"]
+            })
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), user_rows)
+        conn.execute(Terrain.__table__.insert(), terrain_rows)
+        conn.execute(Parcelle.__table__.insert(), parcelle_rows)
+        conn.execute(Recommendation.__table__.insert(), reco_rows)
+    return len(reco_rows)
+
+
+def legacy_scan(db, now):
+    """Reproduction de l'ancien parcours N+M+P du scheduler"""
+    due = 0
+    for user in db.query(User).filter(User.recommendation_frequency != RecommendationFrequency.DISABLED).all():
+        threshold = now - timedelta(days=FREQUENCY_DAYS[user.recommendation_frequency])
+        for terrain in db.query(Terrain).filter(Terrain.user_id == user.id, Terrain.deleted_at.is_(None)).all():
+            for parcelle in db.query(Parcelle).filter(Parcelle.terrain_id == terrain.id, Parcelle.deleted_at.is_(None)).all():
+                last = db.query(Recommendation).filter(
+                    Recommendation.parcelle_id == parcelle.id
+                ).order_by(Recommendation.created_at.desc()).first()
+                if last is None or last.created_at < threshold:
+                    due += 1
+    return due
+
+
+def set_based_scan(db, now):
+    return sum(1 for _ in SchedulerService.iter_due_parcelles(db, now=now))
+
+
+def timed(label, func, db, now):
+    start = time.perf_counter()
+    due = func(db, now)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {due:>8} parcelles à échéance en {elapsed:8.2f} s")
+    return due, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--parcelles", type=int, default=100000)
+    parser.add_argument("--db-url", help="Base cible (par défaut SQLite temporaire)")
+    parser.add_argument("--skip-legacy", action="store_true", help="Ne pas mesurer l'ancien parcours (lent)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.db_url
+    if url is None:
+        tmpdir = tempfile.mkdtemp()
+        url = f"sqlite:///{os.path.join(tmpdir, 'scheduler_bench.db')}"
+
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    recommendations = seed(engine, args.users, args.parcelles, args.seed)
+    print(f"Base: {args.users} utilisateurs, {args.parcelles} parcelles, {recommendations} recommandations "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    session = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    try:
+        due, new_time = timed("ensembliste", set_based_scan, session, now)
+        if not args.skip_legacy:
+            legacy_due, legacy_time = timed("ancien", legacy_scan, session, now)
+            assert legacy_due == due, "Les deux parcours doivent trouver les mêmes parcelles"
+            print(f"Accélération: x{legacy_time / new_time:.1f}")
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    main()
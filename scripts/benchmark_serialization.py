@@ -0,0 +1,91 @@
+"""
+Benchmark de la sérialisation JSON des réponses sur les schémas de l'API.
+
+Pour chaque schéma (mesures de capteurs, parcelles, terrains, localités),
+compare le débit (objets/s) de :
+  - jsonable_encoder + json (chemin sans response_model, ancien encodage)
+  - pydantic mode="json" + json (chemin FastAPI avec response_model)
+  - pydantic mode="json" + orjson (EnvelopeJSONResponse)
+
+Usage:
+    python scripts/benchmark_serialization.py --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-serialization-script")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core.responses import EnvelopeJSONResponse, envelope  # noqa: E402
+from app.schemas.location import LocaliteResponse  # noqa: E402
+from app.schemas.parcelle import ParcelleResponse  # noqa: E402
+from app.schemas.sensor_data import SensorMeasurementsResponse  # noqa: E402
+from app.schemas.terrain import TerrainResponse  # noqa: E402
+
+
+def sample_value(annotation):
+    """Valeur plausible pour un type de champ pydantic"""
+    from typing import get_args, get_origin, Union
+    import enum
+
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if get_origin(annotation) in (list, List):
+        return []
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return next(iter(annotation))
+    return {
+        str: str(uuid.uuid4()),
+        int: 3,
+        float: 12.5,
+        bool: True,
+        datetime: datetime.utcnow(),
+        dict: {"ph": 6.5, "humidity": 41.2, "battery": 3.7, "rssi": -97, "npk": [12, 8, 10]},
+    }.get(annotation, None)
+
+
+def build_models(schema, rows: int):
+    values = {name: sample_value(field.annotation) for name, field in schema.model_fields.items()}
+    return [schema.model_validate(values) for _ in range(rows)]
+
+
+def throughput(fn, rows: int, repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return rows * repeat / (time.perf_counter() - started)
+
+
+def stdlib(content) -> bytes:
+    return json.dumps(envelope(content, 200), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.rows} objets par réponse, {args.repeat} répétitions (objets/s)")
+    print(f"{'schéma':<28}{'jsonable+json':>16}{'pydantic+json':>16}{'pydantic+orjson':>18}{'gain':>8}")
+    for schema in (SensorMeasurementsResponse, ParcelleResponse, TerrainResponse, LocaliteResponse):
+        models = build_models(schema, args.rows)
+        adapter = TypeAdapter(List[schema])
+        legacy = throughput(lambda: stdlib(jsonable_encoder(models)), args.rows, args.repeat)
+        fastapi_json = throughput(lambda: stdlib(adapter.dump_python(models, mode="json")), args.rows, args.repeat)
+        fast = throughput(lambda: EnvelopeJSONResponse(adapter.dump_python(models, mode="json")).body, args.rows, args.repeat)
+        print(f"{schema.__name__:<28}{legacy:>16,.0f}{fastapi_json:>16,.0f}{fast:>18,.0f}{fast / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
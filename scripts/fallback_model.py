@@ -0,0 +1,114 @@
+"""
+Construction et évaluation du modèle ML de secours (kNN local).
+
+Usage:
+    # Construire le modèle à partir des données exportées (colonnes
+    # N,P,K,temperature,humidity,ph,rainfall,label) en réservant 20% pour l'évaluation
+    python scripts/fallback_model.py build --csv crops.csv --out fallback_model.json --holdout holdout.csv
+
+    # Comparer la précision du modèle local et du service ML distant sur le jeu réservé
+    python scripts/fallback_model.py evaluate --model fallback_model.json --csv holdout.csv --remote
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "fallback-model-script")
+
+from app.schemas.ai_integration import SoilData  # noqa: E402
+from app.services.fallback_predictor import FEATURES, LocalCropPredictor  # noqa: E402
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def write_rows(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FEATURES + ["label"])
+        writer.writeheader()
+        writer.writerows({key: row[key] for key in FEATURES + ["label"]} for row in rows)
+
+
+def build(args):
+    rows = read_rows(args.csv)
+    random.Random(args.seed).shuffle(rows)
+    split = int(len(rows) * (1 - args.holdout_ratio)) if args.holdout else len(rows)
+    train, holdout = rows[:split], rows[split:]
+
+    model = LocalCropPredictor.fit(
+        [[float(row[feature]) for feature in FEATURES] for row in train],
+        [row["label"] for row in train],
+        k=args.k
+    )
+    model.save(args.out)
+    print(f"Modèle enregistré: {args.out} ({len(train)} échantillons, k={model.k})")
+
+    if args.holdout:
+        write_rows(args.holdout, holdout)
+        print(f"Jeu d'évaluation enregistré: {args.holdout} ({len(holdout)} échantillons)")
+
+
+async def predict_remote(samples):
+    from app.services.ml_service import MLService
+
+    predictions = []
+    for start in range(0, len(samples), MLService.MAX_BATCH_SIZE):
+        result = await MLService._predict_remote(samples[start:start + MLService.MAX_BATCH_SIZE])
+        predictions.extend(r.top3[0].culture for r in result.resultats_par_echantillon)
+    return predictions
+
+
+def evaluate(args):
+    model = LocalCropPredictor.load(args.model)
+    rows = read_rows(args.csv)
+    samples = [SoilData(**{feature: float(row[feature]) for feature in FEATURES}) for row in rows]
+    labels = [row["label"] for row in rows]
+
+    started = time.perf_counter()
+    local = [model.predict_one(sample)[0][0] for sample in samples]
+    local_ms = (time.perf_counter() - started) * 1000 / len(samples)
+    local_acc = sum(p == y for p, y in zip(local, labels)) / len(labels)
+    print(f"Modèle local : précision {local_acc:.2%} ({local_ms:.2f} ms/échantillon)")
+
+    if args.remote:
+        started = time.perf_counter()
+        remote = asyncio.run(predict_remote(samples))
+        remote_ms = (time.perf_counter() - started) * 1000 / len(samples)
+        remote_acc = sum(p == y for p, y in zip(remote, labels)) / len(labels)
+        agreement = sum(a == b for a, b in zip(local, remote)) / len(labels)
+        print(f"Service ML   : précision {remote_acc:.2%} ({remote_ms:.2f} ms/échantillon)")
+        print(f"Accord local/distant : {agreement:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Construire le modèle à partir d'un CSV")
+    p_build.add_argument("--csv", required=True)
+    p_build.add_argument("--out", required=True)
+    p_build.add_argument("--holdout", help="Fichier CSV où écrire le jeu réservé à l'évaluation")
+    p_build.add_argument("--holdout-ratio", type=float, default=0.2)
+    p_build.add_argument("--k", type=int, default=5)
+    p_build.add_argument("--seed", type=int, default=42)
+    p_build.set_defaults(func=build)
+
+    p_eval = sub.add_parser("evaluate", help="Évaluer le modèle sur un jeu réservé")
+    p_eval.add_argument("--model", required=True)
+    p_eval.add_argument("--csv", required=True)
+    p_eval.add_argument("--remote", action="store_true", help="Comparer avec le service ML distant")
+    p_eval.set_defaults(func=evaluate)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from app.models.base import Base
 from app.models.user import User, UserRole, UserStatus
 from app.core.security import get_password_hash
 from main import app
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Base de données de test en mémoire
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -20,6 +20,25 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+class FakeClock:
+    """Horloge manuelle (remplace time.monotonic, time.time ou datetime.utcnow)"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds) if isinstance(self.now, datetime) else seconds
+
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    """Horloge manuelle injectée dans les seaux, caches et disjoncteurs"""
+    return FakeClock()
+
+
 @pytest.fixture(scope="function")
 def db() -> Generator:
     """Créer une base de données de test pour chaque test"""
@@ -30,6 +49,12 @@ def db() -> Generator:
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        # Les données de référence en cache appartiennent à la base supprimée
+        from app.core.cache import get_backend
+        get_backend().clear()
+        # Chaque test repart avec des seaux de débit pleins
+        from app.core.admission import admission_controller
+        admission_controller.reset()
 
 
 @pytest.fixture(scope="function")
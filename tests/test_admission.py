@@ -0,0 +1,180 @@
+import asyncio
+import secrets
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.admission import (
+    AdmissionController,
+    ConcurrencyLimiter,
+    EndpointClass,
+    MemoryCounterStore,
+    SQLiteCounterStore,
+    admission_controller,
+    request_identity,
+)
+from app.core.config import settings
+from app.core.security import create_access_token
+
+
+def make_request(headers: dict = None, ip: str = "10.0.0.1") -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": raw, "client": (ip, 1234)})
+
+
+class TestCounterStores:
+    """Tests des magasins de compteurs"""
+
+    def test_memory_store_burst_then_delay(self, fake_clock):
+        """Le seau admet la rafale puis indique le délai avant le prochain jeton"""
+        store = MemoryCounterStore(clock=fake_clock)
+        assert store.take("k", rate=1.0, burst=2) == 0
+        assert store.take("k", rate=1.0, burst=2) == 0
+        assert store.take("k", rate=1.0, burst=2) == pytest.approx(1.0)
+        fake_clock.advance(1)
+        assert store.take("k", rate=1.0, burst=2) == 0
+
+    def test_memory_store_keys_independent(self):
+        """Chaque identité a son propre seau"""
+        store = MemoryCounterStore()
+        assert store.take("a", rate=1.0, burst=1) == 0
+        assert store.take("a", rate=1.0, burst=1) > 0
+        assert store.take("b", rate=1.0, burst=1) == 0
+
+    def test_sqlite_store_shared(self, tmp_path, fake_clock):
+        """Deux processus (deux instances) partagent les mêmes seaux"""
+        path = str(tmp_path / "admission.sqlite3")
+        first = SQLiteCounterStore(path, clock=fake_clock)
+        second = SQLiteCounterStore(path, clock=fake_clock)
+        assert first.take("k", rate=0.5, burst=1) == 0
+        assert second.take("k", rate=0.5, burst=1) == pytest.approx(2.0)
+        fake_clock.advance(2)
+        assert second.take("k", rate=0.5, burst=1) == 0
+        assert len(first) == 1
+
+
+class TestConcurrencyLimiter:
+    """Tests du plafond de concurrence"""
+
+    @pytest.mark.asyncio
+    async def test_queue_then_handoff(self):
+        """Une requête en file reçoit la place libérée"""
+        limiter = ConcurrencyLimiter(limit=1, max_queue=1, queue_timeout=1.0)
+        assert await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        # File pleine : refus immédiat
+        assert not await limiter.acquire()
+        limiter.release()
+        assert await waiter
+        assert limiter.active == 1
+        limiter.release()
+        assert limiter.active == 0
+        assert limiter.snapshot()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """Au-delà du délai d'attente, la requête est refusée"""
+        limiter = ConcurrencyLimiter(limit=1, max_queue=1, queue_timeout=0.01)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.timed_out == 1
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.active == 0
+
+    @pytest.mark.asyncio
+    async def test_reject_without_queue(self):
+        """Sans file, le plafond refuse immédiatement"""
+        limiter = ConcurrencyLimiter(limit=1)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+
+
+class TestRequestIdentity:
+    """Tests de l'identité utilisée pour le débit"""
+
+    def test_api_key_first(self, monkeypatch):
+        """Une clé d'API reconnue l'emporte sur le token et l'IP"""
+        monkeypatch.setattr(settings, "ADMISSION_API_KEYS", ["secret"])
+        token = create_access_token(data={"sub": "u1"})
+        identity = request_identity(make_request({"X-API-Key": "secret", "Authorization": f"Bearer {token}"}))
+        assert identity.startswith("key:")
+        assert "secret" not in identity
+
+    def test_unknown_api_key_ignored(self, monkeypatch):
+        """Une clé inconnue n'est pas une identité : repli sur le token puis l'IP"""
+        monkeypatch.setattr(settings, "ADMISSION_API_KEYS", ["secret"])
+        token = create_access_token(data={"sub": "u1"})
+        assert request_identity(make_request({"X-API-Key": "autre", "Authorization": f"Bearer {token}"})) == "user:u1"
+        assert request_identity(make_request({"X-API-Key": "autre"})) == "ip:10.0.0.1"
+
+    def test_bearer_user(self):
+        """Un token valide identifie l'utilisateur"""
+        token = create_access_token(data={"sub": "u1"})
+        assert request_identity(make_request({"Authorization": f"Bearer {token}"})) == "user:u1"
+
+    def test_fallback_ip(self):
+        """Sans clé ni token valide, l'adresse IP"""
+        assert request_identity(make_request({"Authorization": "Bearer invalide"})) == "ip:10.0.0.1"
+
+
+class TestAdmissionController:
+    """Tests du contrôleur d'admission"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_raises_429(self):
+        """Seau vide : 429 avec Retry-After, refus comptés"""
+        controller = AdmissionController({"auth": EndpointClass("auth", rate=0.5, burst=1)}, MemoryCounterStore())
+        await controller.enter("auth", make_request())
+        controller.leave("auth")
+        with pytest.raises(HTTPException) as exc:
+            await controller.enter("auth", make_request())
+        assert exc.value.status_code == 429
+        assert exc.value.headers["Retry-After"] == "2"
+        classes = controller.snapshot()["classes"]
+        assert classes["auth"]["admitted"] == 1
+        assert classes["auth"]["rejected_rate"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rotating_api_keys_still_limited(self):
+        """Changer de clé à chaque requête ne contourne pas le débit par IP"""
+        controller = AdmissionController({"auth": EndpointClass("auth", rate=0.01, burst=2)}, MemoryCounterStore())
+        statuses = []
+        for _ in range(5):
+            try:
+                await controller.enter("auth", make_request({"X-API-Key": secrets.token_hex(16)}))
+                controller.leave("auth")
+                statuses.append(200)
+            except HTTPException as exc:
+                statuses.append(exc.status_code)
+        assert statuses == [200, 200, 429, 429, 429]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_raises_503(self):
+        """Plafond atteint sans file : 503"""
+        controller = AdmissionController(
+            {"predict": EndpointClass("predict", rate=0, burst=0, max_concurrency=1)},
+            MemoryCounterStore()
+        )
+        await controller.enter("predict", make_request())
+        with pytest.raises(HTTPException) as exc:
+            await controller.enter("predict", make_request())
+        assert exc.value.status_code == 503
+        controller.leave("predict")
+        assert controller.snapshot()["classes"]["predict"]["rejected_concurrency"] == 1
+
+    def test_login_endpoint_throttled(self, client, test_user, admin_headers, monkeypatch):
+        """La route de connexion refuse au-delà du débit par IP"""
+        monkeypatch.setitem(admission_controller.classes, "auth", EndpointClass("auth", rate=0.01, burst=2))
+        body = {"email": test_user.email, "password": "TestPassword123"}
+        assert client.post("/api/v1/auth/login", json=body).status_code == 200
+        assert client.post("/api/v1/auth/login", json=body).status_code == 200
+        response = client.post("/api/v1/auth/login", json=body)
+        assert response.status_code == 429
+        assert "retry-after" in response.headers
+
+        stats = client.get("/api/v1/health/admission", headers=admin_headers).json()["data"]["classes"]["auth"]
+        assert stats["rejected_rate"] >= 1
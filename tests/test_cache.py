@@ -0,0 +1,178 @@
+import pytest
+
+from app.core import cache
+from app.core.cache import MISS, MemoryCacheBackend, SQLiteCacheBackend, cached
+from app.models.location import Continent
+from app.schemas.location import LocaliteCreate, LocaliteUpdate
+from app.services.location_service import LocaliteService
+
+
+@pytest.fixture
+def memory_backend(fake_clock):
+    """Backend mémoire isolé, restauré après le test"""
+    previous = cache.get_backend()
+    backend = MemoryCacheBackend(max_size=3, clock=fake_clock)
+    cache.set_backend(backend)
+    yield backend
+    cache.set_backend(previous)
+
+
+def localite_data(nom: str, pays: str = "Cameroun") -> LocaliteCreate:
+    return LocaliteCreate(nom=nom, ville=nom, pays=pays, continent=Continent.AFRIQUE)
+
+
+class TestMemoryCacheBackend:
+    """Tests du backend en mémoire"""
+
+    def test_ttl_expiry(self, fake_clock):
+        """Une entrée expire après son TTL"""
+        backend = MemoryCacheBackend(clock=fake_clock)
+        backend.set("ns", "k", 1, ttl=10)
+        assert backend.get("ns", "k") == 1
+        fake_clock.advance(11)
+        assert backend.get("ns", "k") is MISS
+
+    def test_lru_bound(self):
+        """L'entrée la moins récemment lue est évincée au-delà de max_size"""
+        backend = MemoryCacheBackend(max_size=2)
+        backend.set("ns", "a", 1, ttl=60)
+        backend.set("ns", "b", 2, ttl=60)
+        backend.get("ns", "a")
+        backend.set("ns", "c", 3, ttl=60)
+        assert backend.get("ns", "b") is MISS
+        assert backend.get("ns", "a") == 1
+        assert backend.snapshot()["evictions"] == 1
+
+    def test_invalidate_namespace(self):
+        """L'invalidation ne touche que son espace de noms"""
+        backend = MemoryCacheBackend()
+        backend.set("a", "k", 1, ttl=60)
+        backend.set("b", "k", 2, ttl=60)
+        backend.invalidate("a")
+        assert backend.get("a", "k") is MISS
+        assert backend.get("b", "k") == 2
+
+
+class TestSQLiteCacheBackend:
+    """Tests du substitut local de cache partagé"""
+
+    def test_shared_between_instances(self, tmp_path):
+        """Deux instances (deux workers) voient les mêmes entrées et invalidations"""
+        path = str(tmp_path / "cache.sqlite3")
+        first, second = SQLiteCacheBackend(path), SQLiteCacheBackend(path)
+        first.set("ns", "k", {"total": 3}, ttl=60)
+        assert second.get("ns", "k") == {"total": 3}
+        second.invalidate("ns")
+        assert first.get("ns", "k") is MISS
+
+    def test_expiry_and_bound(self, tmp_path, fake_clock):
+        """Expiration en temps réel et taille bornée"""
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_size=2, clock=fake_clock)
+        backend.set("ns", "a", 1, ttl=5)
+        fake_clock.advance(6)
+        assert backend.get("ns", "a") is MISS
+        for key in ("b", "c", "d"):
+            fake_clock.advance(1)
+            backend.set("ns", key, key, ttl=60)
+        assert backend.snapshot()["size"] == 2
+        assert backend.get("ns", "b") is MISS
+
+
+class TestCachedDecorator:
+    """Tests du décorateur @cached"""
+
+    def test_key_from_arguments(self, memory_backend):
+        """Des arguments différents donnent des entrées différentes"""
+        calls = []
+
+        @cached("test", ttl=60)
+        def compute(x, y=1):
+            calls.append((x, y))
+            return x + y
+
+        assert compute(1) == 2
+        assert compute(1, y=1) == 2
+        assert compute(2) == 3
+        assert calls == [(1, 1), (2, 1)]
+
+    @pytest.mark.asyncio
+    async def test_async_function(self, memory_backend):
+        """Les fonctions async sont mises en cache de la même façon"""
+        calls = []
+
+        @cached("test", ttl=60)
+        async def compute(x):
+            calls.append(x)
+            return x * 2
+
+        assert await compute(3) == 6
+        assert await compute(3) == 6
+        assert calls == [3]
+
+    def test_custom_key_and_invalidation(self, memory_backend):
+        """Fonction key personnalisée et invalidation explicite"""
+        calls = []
+
+        @cached("test", ttl=60, key=lambda args: args["x"] % 2)
+        def parity(x):
+            calls.append(x)
+            return x % 2
+
+        parity(1)
+        parity(3)
+        assert calls == [1]
+        cache.invalidate("test")
+        parity(3)
+        assert calls == [1, 3]
+
+    def test_disabled_with_zero_ttl(self, memory_backend):
+        """ttl <= 0 désactive le cache"""
+        calls = []
+
+        @cached("test", ttl=0)
+        def compute():
+            calls.append(1)
+
+        compute()
+        compute()
+        assert len(calls) == 2
+
+
+class TestLocaliteCache:
+    """Tests du cache des localités et de son invalidation"""
+
+    def test_statistics_cached_until_write(self, db, memory_backend):
+        """Les statistiques restent en cache jusqu'à la prochaine écriture"""
+        LocaliteService.create_localite(db, localite_data("Douala"), "u1")
+        assert LocaliteService.get_localite_statistics(db)["total"] == 1
+        hits = memory_backend.hits
+        assert LocaliteService.get_localite_statistics(db)["total"] == 1
+        assert memory_backend.hits == hits + 1
+
+        LocaliteService.create_localite(db, localite_data("Dakar", "Sénégal"), "u1")
+        assert LocaliteService.get_localite_statistics(db)["total"] == 2
+        assert len(LocaliteService.get_countries_list(db)) == 2
+
+    def test_list_invalidated_on_update_and_delete(self, db, memory_backend):
+        """Mise à jour et suppression invalident la liste"""
+        localite = LocaliteService.create_localite(db, localite_data("Bafoussam"), "u1")
+        assert LocaliteService.get_all_localites(db)[0]["nom"] == "Bafoussam"
+
+        LocaliteService.update_localite(db, localite.id, LocaliteUpdate(nom="Bafang"))
+        assert LocaliteService.get_all_localites(db)[0]["nom"] == "Bafang"
+
+        LocaliteService.delete_localite(db, localite.id)
+        assert LocaliteService.get_all_localites(db) == []
+
+    def test_filters_are_part_of_key(self, db, memory_backend):
+        """Chaque combinaison de filtres a sa propre entrée"""
+        LocaliteService.create_localite(db, localite_data("Douala"), "u1")
+        LocaliteService.create_localite(db, localite_data("Dakar", "Sénégal"), "u1")
+        assert len(LocaliteService.get_all_localites(db)) == 2
+        assert len(LocaliteService.get_all_localites(db, pays="Sénégal")) == 1
+
+    def test_route_serves_cached_list(self, client, memory_backend):
+        """La route des localités renvoie la liste mise en cache, enveloppée"""
+        response = client.get("/api/v1/localites/localites/")
+        assert response.status_code == 200
+        assert response.json()["data"] == []
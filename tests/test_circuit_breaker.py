@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+def make_breaker(clock, **kwargs):
+    options = dict(
+        failure_rate_threshold=0.5, window_seconds=60, min_calls=4,
+        open_seconds=30, min_timeout=1.0, max_timeout=120.0, clock=clock
+    )
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+class TestCircuitStates:
+    """Tests des transitions closed / open / half-open"""
+
+    def test_opens_when_failure_rate_exceeded(self, fake_clock):
+        """Test que le circuit s'ouvre au-delà du taux d'échec"""
+        breaker = make_breaker(fake_clock)
+        breaker.record_success(0.1)
+        breaker.record_success(0.1)
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow_request() is False
+        assert breaker.total_rejected == 1
+
+    def test_old_failures_leave_the_window(self, fake_clock):
+        """Test que les échecs hors de la fenêtre glissante sont oubliés"""
+        breaker = make_breaker(fake_clock)
+        for _ in range(3):
+            breaker.record_failure()
+        fake_clock.advance(120)
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.failure_rate() == 1.0
+
+    def test_half_open_probe_closes_on_success(self, fake_clock):
+        """Test qu'un appel de test réussi referme le circuit"""
+        breaker = make_breaker(fake_clock, min_calls=1)
+        breaker.record_failure()
+        fake_clock.advance(31)
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+        breaker.record_success(0.2)
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_probe_reopens_on_failure(self, fake_clock):
+        """Test qu'un appel de test en échec rouvre le circuit"""
+        breaker = make_breaker(fake_clock, min_calls=1)
+        breaker.record_failure()
+        fake_clock.advance(31)
+        breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.times_opened == 2
+
+    def test_protect_fails_fast_when_open(self, fake_clock):
+        """Test que protect() refuse immédiatement quand le circuit est ouvert"""
+        breaker = make_breaker(fake_clock, min_calls=1)
+        with pytest.raises(ValueError):
+            with breaker.protect():
+                raise ValueError("upstream down")
+
+        with pytest.raises(CircuitOpenError):
+            with breaker.protect():
+                pass
+
+
+    def test_cancellation_not_counted(self, fake_clock):
+        """Test qu'une annulation n'est ni un échec ni une latence, et libère l'essai HALF_OPEN"""
+        breaker = make_breaker(fake_clock, min_calls=1)
+        breaker.record_failure()
+        fake_clock.advance(31)
+
+        with pytest.raises(asyncio.CancelledError):
+            with breaker.protect():
+                fake_clock.advance(15)
+                raise asyncio.CancelledError()
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.total_failures == 1
+        assert breaker.latency_quantile(0.95) is None
+        # L'essai a été rendu : un nouvel appel de test est autorisé
+        assert breaker.allow_request() is True
+
+
+class TestAdaptiveTimeout:
+    """Tests du timeout adaptatif"""
+
+    def test_max_timeout_without_history(self, fake_clock):
+        """Test que le timeout maximal est utilisé sans historique"""
+        breaker = make_breaker(fake_clock)
+
+        assert breaker.timeout() == 120.0
+
+    def test_timeout_follows_latency_percentile(self, fake_clock):
+        """Test que le timeout suit le percentile des latences observées"""
+        breaker = make_breaker(fake_clock, timeout_multiplier=3.0)
+        for latency in [0.5, 0.6, 0.7, 0.8, 1.0]:
+            breaker.record_success(latency)
+
+        assert breaker.timeout() == pytest.approx(3.0)
+
+    def test_timeout_is_bounded(self, fake_clock):
+        """Test que le timeout reste dans les bornes configurées"""
+        breaker = make_breaker(fake_clock, min_timeout=2.0)
+        for _ in range(5):
+            breaker.record_success(0.01)
+
+        assert breaker.timeout() == 2.0
+
+
+def test_upstreams_health_endpoint(client, admin_headers):
+    """Test que l'état des disjoncteurs est exposé"""
+    response = client.get("/api/v1/health/upstreams", headers=admin_headers)
+
+    assert response.status_code == 200
+    upstreams = response.json()["data"]["upstreams"]
+    assert {"ml_service", "expert_system", "chirpstack"} <= set(upstreams)
+    assert upstreams["ml_service"]["state"] == "closed"
+
+
+def test_health_details_require_admin(client, auth_headers):
+    """Test que l'état interne est réservé aux admins, la sonde /health reste publique"""
+    assert client.get("/api/v1/health/upstreams").status_code in (401, 403)
+    assert client.get("/api/v1/health/upstreams", headers=auth_headers).status_code == 403
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,144 @@
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import (
+    CompressionMiddleware,
+    PrecompressedPayload,
+    StreamCompressor,
+    choose_encoding,
+    parse_accept_encoding,
+)
+from app.core.responses import EnvelopeJSONResponse
+
+
+def build_app(minimum_size: int = 500) -> FastAPI:
+    app = FastAPI(default_response_class=EnvelopeJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/large")
+    def large():
+        return [{"measurements": {"humidity": 40.5, "ph": 6.5}, "index": i} for i in range(200)]
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            for i in range(50):
+                yield f"ligne {i} " * 20 + "\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/encoded")
+    def encoded():
+        return PlainTextResponse(gzip.compress(b"x" * 2000), headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+class TestAcceptEncoding:
+    """Tests de la négociation de l'encodage"""
+
+    def test_parse_quality_values(self):
+        """Les valeurs q sont lues, 1.0 par défaut"""
+        assert parse_accept_encoding("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
+
+    def test_server_preference_on_tie(self):
+        """À qualité égale, l'ordre du serveur l'emporte"""
+        assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+        assert choose_encoding("gzip;q=1, br;q=0.5", ("br", "gzip")) == "gzip"
+
+    def test_refused_or_missing(self):
+        """Aucun encodage si le client n'en accepte pas"""
+        assert choose_encoding("", ("br", "gzip")) is None
+        assert choose_encoding("identity", ("br", "gzip")) is None
+        assert choose_encoding("*;q=0", ("gzip",)) is None
+
+
+class TestCompressionMiddleware:
+    """Tests du middleware de compression"""
+
+    def test_below_threshold_not_compressed(self):
+        """Une petite réponse part telle quelle"""
+        client = TestClient(build_app())
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.json()["data"] == {"ok": True}
+
+    def test_large_response_gzip(self):
+        """Une grande réponse est compressée et reste enveloppée"""
+        client = TestClient(build_app())
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()["data"]) == 200
+
+    def test_large_response_brotli(self):
+        """Brotli est préféré quand il est installé"""
+        pytest.importorskip("brotli")
+        client = TestClient(build_app())
+        response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.json()["data"][0]["measurements"]["ph"] == 6.5
+
+    def test_no_accept_encoding(self):
+        """Sans Accept-Encoding, pas de compression"""
+        client = TestClient(build_app())
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_response(self):
+        """Les réponses en streaming sont compressées morceau par morceau"""
+        client = TestClient(build_app())
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.startswith("ligne 0 ")
+        assert response.text.count("\n") == 50
+
+    def test_already_encoded_untouched(self):
+        """Une réponse déjà encodée n'est pas recompressée"""
+        client = TestClient(build_app())
+        response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"x" * 2000
+
+
+class TestStreamCompressor:
+    """Tests du compresseur incrémental"""
+
+    def test_gzip_chunks_decode(self):
+        """Chaque morceau vidé est décodable sans attendre la fin"""
+        compressor = StreamCompressor("gzip")
+        decoder = zlib.decompressobj(31)
+        assert decoder.decompress(compressor.compress(b"premier ")) == b"premier "
+        assert decoder.decompress(compressor.compress(b"second") + compressor.finish()) == b"second"
+
+
+class TestPrecompressedOpenAPI:
+    """Tests du schéma OpenAPI précompressé"""
+
+    def test_variants_computed_once(self):
+        """Les variantes sont calculées à la construction"""
+        payload = PrecompressedPayload(b'{"a": 1}' * 100)
+        assert payload.sizes()["gzip"] < payload.sizes()["identity"]
+
+    def test_openapi_served_precompressed(self, client):
+        """La route openapi.json sert la variante gzip sans l'envelopper"""
+        response = client.get("/api/v1/openapi.json", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "paths" in response.json()
+
+    def test_openapi_identity(self, client):
+        """Sans compression acceptée, le schéma est servi en clair"""
+        response = client.get("/api/v1/openapi.json", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.json()["info"]["title"]
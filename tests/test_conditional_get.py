@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+from app.core.conditional import make_etag
+from app.models.location import Localite, Continent
+from app.models.terrain import Terrain
+
+
+TERRAINS_URL = "/api/v1/terrains/terrains/"
+
+
+@pytest.fixture
+def terrain(db, test_user) -> Terrain:
+    """Terrain de l'utilisateur de test"""
+    localite = Localite(nom="Yaoundé Centre", ville="Yaoundé", pays="Cameroun", continent=Continent.AFRIQUE)
+    db.add(localite)
+    db.commit()
+    terrain = Terrain(nom="Terrain A", localite_id=localite.id, user_id=test_user.id, superficie=2.0)
+    db.add(terrain)
+    db.commit()
+    db.refresh(terrain)
+    return terrain
+
+
+class TestMakeEtag:
+    """Tests de la construction des ETag"""
+
+    def test_weak_and_stable(self):
+        """L'ETag est faible et ne dépend que de ses composantes"""
+        etag = make_etag("/a", (datetime(2024, 1, 1), 3))
+        assert etag.startswith('W/"')
+        assert etag == make_etag("/a", (datetime(2024, 1, 1), 3))
+        assert etag != make_etag("/a", (datetime(2024, 1, 1), 4))
+
+
+class TestConditionalGet:
+    """Tests des GET conditionnels sur les terrains"""
+
+    def test_validators_present(self, client, auth_headers, terrain):
+        """La réponse porte ETag et Last-Modified"""
+        response = client.get(TERRAINS_URL, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('W/"')
+        assert "last-modified" in response.headers
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_if_none_match_returns_304(self, client, auth_headers, terrain):
+        """Un ETag identique donne une réponse 304 sans corps"""
+        etag = client.get(TERRAINS_URL, headers=auth_headers).headers["etag"]
+        response = client.get(TERRAINS_URL, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_if_modified_since_returns_304(self, client, auth_headers, terrain):
+        """Une date au moins aussi récente que Last-Modified donne 304"""
+        last_modified = client.get(TERRAINS_URL, headers=auth_headers).headers["last-modified"]
+        response = client.get(TERRAINS_URL, headers={**auth_headers, "If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+        older = format_datetime(terrain.updated_at - timedelta(days=1), usegmt=False)
+        response = client.get(TERRAINS_URL, headers={**auth_headers, "If-Modified-Since": older})
+        assert response.status_code == 200
+
+    def test_etag_changes_after_update(self, client, db, auth_headers, terrain):
+        """Une modification invalide l'ETag précédent"""
+        etag = client.get(TERRAINS_URL, headers=auth_headers).headers["etag"]
+
+        terrain.nom = "Terrain renommé"
+        terrain.updated_at = terrain.updated_at + timedelta(seconds=5)
+        db.commit()
+
+        response = client.get(TERRAINS_URL, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_etag_depends_on_query(self, client, auth_headers, terrain):
+        """La pagination fait partie de l'ETag"""
+        first = client.get(TERRAINS_URL, headers=auth_headers).headers["etag"]
+        response = client.get(f"{TERRAINS_URL}?limit=1", headers={**auth_headers, "If-None-Match": first})
+        assert response.status_code == 200
+
+    def test_missing_resource_not_validated(self, client, auth_headers, terrain):
+        """Une ressource inexistante n'est jamais validée (404, pas 304)"""
+        response = client.get(f"{TERRAINS_URL}inconnu", headers={**auth_headers, "If-None-Match": "*"})
+        assert response.status_code == 404
@@ -0,0 +1,111 @@
+import asyncio
+import socket
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from app.services.email_service import EmailService, SMTPConnectionPool
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+class CountingAuthenticator:
+    def __init__(self):
+        self.logins = 0
+
+    def __call__(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        return AuthResult(success=auth_data.password == b"secret")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """Serveur SMTP local (aiosmtpd) avec authentification sans TLS"""
+    handler = RecordingHandler()
+    authenticator = CountingAuthenticator()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=free_port(),
+        authenticator=authenticator,
+        auth_require_tls=False
+    )
+    controller.start()
+    controller.authenticator = authenticator
+    yield controller
+    controller.stop()
+
+
+def make_pool(server, **kwargs):
+    return SMTPConnectionPool(
+        host=server.hostname,
+        port=server.port,
+        username="agro",
+        password="secret",
+        start_tls=False,
+        **kwargs
+    )
+
+
+class TestEmailService:
+    """Tests de l'envoi d'emails via le pool SMTP"""
+
+    @pytest.mark.asyncio
+    async def test_connection_reused_across_messages(self, smtp_server):
+        """Test que plusieurs emails réutilisent une même connexion authentifiée"""
+        pool = make_pool(smtp_server, size=1)
+        service = EmailService(pool=pool, from_email="noreply@agropredict.test")
+
+        for i in range(5):
+            result = await service.send_email("farmer@example.com", f"Sujet {i}", "Corps")
+            assert result["success"] is True
+
+        assert len(smtp_server.handler.messages) == 5
+        assert pool.connections_opened == 1
+        assert smtp_server.authenticator.logins == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sends_bounded_by_pool(self, smtp_server):
+        """Test que les envois concurrents n'ouvrent pas plus de connexions que la taille du pool"""
+        pool = make_pool(smtp_server, size=3)
+        service = EmailService(pool=pool, from_email="noreply@agropredict.test")
+
+        results = await service.send_many([(f"user{i}@example.com", "Sujet", "Corps") for i in range(12)])
+
+        assert all(r["success"] for r in results)
+        assert len(smtp_server.handler.messages) == 12
+        assert pool.connections_opened <= 3
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_connection_recycled_after_max_messages(self, smtp_server):
+        """Test qu'une connexion est renouvelée après le nombre maximal de messages"""
+        pool = make_pool(smtp_server, size=1, max_messages_per_connection=2)
+        service = EmailService(pool=pool, from_email="noreply@agropredict.test")
+
+        for _ in range(5):
+            await service.send_email("farmer@example.com", "Sujet", "Corps")
+
+        assert pool.connections_opened == 3
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_failure_reported_not_raised(self):
+        """Test qu'un serveur injoignable produit un résultat d'échec"""
+        pool = SMTPConnectionPool(host="127.0.0.1", port=free_port(), start_tls=False, timeout=1)
+        result = await EmailService(pool=pool, from_email="noreply@agropredict.test").send_email("farmer@example.com", "Sujet", "Corps")
+
+        assert result["success"] is False
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.schemas.ai_integration import SoilData
+from app.services import fallback_predictor
+from app.services.fallback_predictor import LocalCropPredictor
+from app.services.ml_service import MLService
+
+
+RICE = [90, 42, 43, 20.8, 82.0, 6.5, 202.9]
+MAIZE = [71, 54, 16, 22.6, 63.7, 5.7, 87.8]
+
+
+def make_model():
+    samples = [RICE, [85, 58, 41, 21.7, 80.3, 7.0, 226.6], MAIZE, [61, 44, 17, 26.1, 71.5, 6.9, 102.2]]
+    return LocalCropPredictor.fit(samples, ["rice", "rice", "maize", "maize"], k=3)
+
+
+def soil(row):
+    return SoilData(**dict(zip(fallback_predictor.FEATURES, row)))
+
+
+@pytest.fixture
+def fallback_model():
+    model = make_model()
+    fallback_predictor.set_fallback_predictor(model)
+    yield model
+    fallback_predictor.set_fallback_predictor(None)
+
+
+class TestLocalCropPredictor:
+    """Tests pour le kNN embarqué"""
+
+    def test_predict_nearest_crop(self):
+        """Test que l'échantillon le plus proche l'emporte"""
+        model = make_model()
+
+        assert model.predict_one(soil(RICE))[0][0] == "rice"
+        assert model.predict_one(soil(MAIZE))[0][0] == "maize"
+
+    def test_batch_prediction_is_flagged(self):
+        """Test que la réponse par lot est marquée comme issue du modèle local"""
+        result = make_model().predict([soil(RICE), soil(RICE)])
+
+        assert result.source == "fallback"
+        assert result.nb_echantillons == 2
+        assert result.top3_global[0].culture == "rice"
+
+    def test_save_and_load(self, tmp_path):
+        """Test que le modèle exporté est rechargé à l'identique"""
+        path = tmp_path / "model.json"
+        make_model().save(str(path))
+
+        loaded = LocalCropPredictor.load(str(path))
+
+        assert loaded.predict_one(soil(MAIZE)) == make_model().predict_one(soil(MAIZE))
+
+
+class TestMLServiceFallback:
+    """Tests pour la bascule du service ML vers le modèle local"""
+
+    @pytest.mark.asyncio
+    async def test_fallback_on_upstream_error(self, monkeypatch, fallback_model):
+        """Test que le modèle local répond si le service distant échoue"""
+        async def failing_remote(samples):
+            raise HTTPException(status_code=503, detail="indisponible")
+
+        monkeypatch.setattr(MLService, "_predict_remote", staticmethod(failing_remote))
+        result = await MLService.predict_crop([soil(RICE)])
+
+        assert result.source == "fallback"
+        assert result.top3_global[0].culture == "rice"
+
+    @pytest.mark.asyncio
+    async def test_fallback_on_latency_budget(self, monkeypatch, fallback_model):
+        """Test que le modèle local répond si le service distant dépasse le budget de latence"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "ML_FALLBACK_LATENCY_BUDGET", 0.01)
+
+        async def slow_remote(samples):
+            await asyncio.sleep(1)
+
+        monkeypatch.setattr(MLService, "_predict_remote", staticmethod(slow_remote))
+        result = await MLService.predict_crop([soil(MAIZE)])
+
+        assert result.source == "fallback"
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_without_fallback(self, monkeypatch):
+        """Test que l'erreur est propagée si aucun modèle local n'est configuré"""
+        fallback_predictor.set_fallback_predictor(None)
+
+        async def failing_remote(samples):
+            raise HTTPException(status_code=502, detail="indisponible")
+
+        monkeypatch.setattr(MLService, "_predict_remote", staticmethod(failing_remote))
+        with pytest.raises(HTTPException):
+            await MLService.predict_crop([soil(RICE)])
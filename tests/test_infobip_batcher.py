@@ -0,0 +1,112 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.core.rate_limit import TokenBucket
+from app.services.infobip_batcher import InfobipSMSBatcher
+
+
+def infobip_echo(rejected=()):
+    """Transport simulant /sms/2/text/advanced : un résultat par destination"""
+    requests = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body)
+        messages = []
+        for message in body["messages"]:
+            for destination in message["destinations"]:
+                group = "REJECTED" if destination["to"] in rejected else "PENDING"
+                messages.append({
+                    "messageId": destination["messageId"],
+                    "to": destination["to"],
+                    "status": {"groupName": group, "name": f"{group}_STATUS"}
+                })
+        return httpx.Response(200, json={"bulkId": "b1", "messages": messages})
+
+    return handler, requests
+
+
+def make_batcher(handler, **kwargs):
+    return InfobipSMSBatcher(
+        base_url="https://infobip.test",
+        api_key="key",
+        bucket=TokenBucket(0),
+        transport=httpx.MockTransport(handler),
+        **kwargs
+    )
+
+
+class TestInfobipSMSBatcher:
+    """Tests du regroupement des SMS Infobip"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sms_coalesced(self):
+        """Test que les SMS soumis dans la fenêtre partent en une seule requête"""
+        handler, requests = infobip_echo()
+        batcher = make_batcher(handler, window=0.02, max_messages=100)
+
+        results = await asyncio.gather(*(batcher.submit(f"+2376000000{i:02d}", f"Message {i}") for i in range(5)))
+
+        assert len(requests) == 1
+        assert len(requests[0]["messages"]) == 5
+        assert [r["to"] for r in results] == [f"+2376000000{i:02d}" for i in range(5)]
+        assert all(r["success"] for r in results)
+        assert len({r["message_id"] for r in results}) == 5
+
+    @pytest.mark.asyncio
+    async def test_size_window_splits_batches(self):
+        """Test qu'un lot est envoyé dès que la taille maximale est atteinte"""
+        handler, requests = infobip_echo()
+        batcher = make_batcher(handler, window=10, max_messages=2)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(f"+23760000000{i}", "Texte") for i in range(4))),
+            timeout=1
+        )
+
+        assert [len(r["messages"]) for r in requests] == [2, 2]
+        assert len(results) == 4
+
+    @pytest.mark.asyncio
+    async def test_rejected_message_mapped_to_caller(self):
+        """Test que le statut de chaque message revient au bon appelant"""
+        handler, _ = infobip_echo(rejected={"+237600000001"})
+        batcher = make_batcher(handler, window=0.01)
+
+        ok, rejected = await asyncio.gather(
+            batcher.submit("+237600000000", "A"),
+            batcher.submit("+237600000001", "B")
+        )
+
+        assert ok["success"] is True
+        assert rejected["success"] is False
+        assert rejected["error"] == "REJECTED_STATUS"
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_batch_retried(self):
+        """Test qu'une réponse 429 est retentée après Retry-After"""
+        echo, requests = infobip_echo()
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.01"})
+            return echo(request)
+
+        batcher = make_batcher(handler, window=0.01)
+        result = await batcher.submit("+237600000000", "A")
+
+        assert result["success"] is True
+        assert len(calls) == 2
+        assert batcher.requests_sent == 2
+
+    @pytest.mark.asyncio
+    async def test_http_error_fails_whole_batch(self):
+        """Test qu'une erreur HTTP est rapportée à tous les appelants du lot"""
+        batcher = make_batcher(lambda request: httpx.Response(401, json={}), window=0.01)
+
+        results = await asyncio.gather(batcher.submit("+237600000000", "A"), batcher.submit("+237600000001", "B"))
+
+        assert all(r["success"] is False for r in results)
@@ -0,0 +1,155 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.job import Job, JobStatus
+from app.services.job_queue import InMemoryJobQueue, JobQueue, SQLJobQueue
+from app.worker import JobWorker
+from tests.conftest import TestingSessionLocal
+
+
+class TestInMemoryJobQueue:
+    """Tests de la sémantique de la file (équivalent mémoire)"""
+
+    def test_claimed_job_is_invisible(self):
+        """Test qu'une tâche réservée n'est pas redistribuée pendant le délai de visibilité"""
+        queue = InMemoryJobQueue()
+        queue.enqueue("demo", {"x": 1})
+
+        assert len(queue.claim(10, visibility_timeout=60)) == 1
+        assert queue.claim(10, visibility_timeout=60) == []
+
+    def test_visibility_timeout_expiry(self, fake_clock):
+        """Test qu'une tâche non acquittée redevient disponible"""
+        fake_clock.now = datetime(2026, 1, 1)
+        queue = InMemoryJobQueue(clock=fake_clock)
+        queue.enqueue("demo", {})
+        first = queue.claim(1, visibility_timeout=60)[0]
+
+        fake_clock.advance(61)
+        second = queue.claim(1, visibility_timeout=60)[0]
+
+        assert second.id == first.id
+        assert second.attempts == 2
+        # L'ancien worker ne peut plus acquitter la tâche
+        queue.complete(first)
+        assert queue.jobs[first.id].status == JobStatus.RUNNING
+
+    def test_failed_job_retried_after_delay(self, fake_clock):
+        """Test que l'échec reprogramme la tâche après le délai de backoff"""
+        fake_clock.now = datetime(2026, 1, 1)
+        queue = InMemoryJobQueue(clock=fake_clock)
+        queue.enqueue("demo", {}, max_attempts=2)
+        job = queue.claim(1, 60)[0]
+
+        assert queue.fail(job, "boom", retry_delay=30) is True
+        assert queue.claim(1, 60) == []
+        fake_clock.advance(31)
+        job = queue.claim(1, 60)[0]
+        assert queue.fail(job, "boom", retry_delay=30) is False
+        assert queue.jobs[job.id].status == JobStatus.FAILED
+
+
+class TestSQLJobQueue:
+    """Tests de la file persistante (SQLite ; SKIP LOCKED ignoré hors PostgreSQL)"""
+
+    def test_enqueue_claim_complete(self, db):
+        """Test du cycle complet d'une tâche en base"""
+        queue = SQLJobQueue(TestingSessionLocal)
+        job_id = queue.enqueue("demo", {"user_id": "u1"})
+
+        claimed = queue.claim(5, visibility_timeout=60)
+        assert [j.id for j in claimed] == [job_id]
+        assert claimed[0].payload == {"user_id": "u1"}
+        queue.complete(claimed[0])
+
+        row = db.query(Job).filter(Job.id == job_id).first()
+        assert row.status == JobStatus.DONE
+        assert row.attempts == 1
+        assert row.finished_at is not None
+
+    def test_fail_reschedules(self, db):
+        """Test qu'un échec reprogramme la tâche dans le futur"""
+        queue = SQLJobQueue(TestingSessionLocal)
+        job_id = queue.enqueue("demo", {})
+        job = queue.claim(1, 60)[0]
+
+        assert queue.fail(job, "ValueError: boom", retry_delay=120) is True
+
+        row = db.query(Job).filter(Job.id == job_id).first()
+        assert row.status == JobStatus.PENDING
+        assert row.last_error == "ValueError: boom"
+        assert row.run_at > datetime.utcnow() + timedelta(seconds=60)
+        assert queue.claim(1, 60) == []
+
+
+class TestJobWorker:
+    """Tests du worker"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Test que le worker n'exécute pas plus de tâches que sa concurrence"""
+        import asyncio
+        queue = InMemoryJobQueue()
+        for i in range(6):
+            queue.enqueue("slow", {"i": i})
+        running = 0
+        peak = 0
+
+        async def slow(payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        worker = JobWorker(queue, handlers={"slow": slow}, concurrency=2, visibility_timeout=60)
+        await worker.drain()
+
+        assert peak == 2
+        assert worker.processed == 6
+        assert all(job.status == JobStatus.DONE for job in queue.jobs.values())
+
+    @pytest.mark.asyncio
+    async def test_failure_is_retried_then_dead_lettered(self, monkeypatch):
+        """Test qu'un handler en échec est retenté puis marqué en échec définitif"""
+        queue = InMemoryJobQueue()
+        queue.enqueue("broken", {}, max_attempts=3)
+
+        async def broken(payload):
+            raise RuntimeError("expert system down")
+
+        worker = JobWorker(queue, handlers={"broken": broken}, concurrency=1, visibility_timeout=60)
+        monkeypatch.setattr(worker, "retry_delay", lambda attempts: 0)
+        await worker.drain()
+
+        job = next(iter(queue.jobs.values()))
+        assert job.status == JobStatus.FAILED
+        assert job.attempts == 3
+        assert job.history == ["RuntimeError: expert system down"] * 3
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_fails(self):
+        """Test qu'une tâche sans handler est marquée en échec"""
+        queue = InMemoryJobQueue()
+        queue.enqueue("unknown", {}, max_attempts=1)
+
+        await JobWorker(queue, handlers={}, concurrency=1, visibility_timeout=60).drain()
+
+        assert next(iter(queue.jobs.values())).status == JobStatus.FAILED
+
+
+def test_expert_notify_handler_registered():
+    """Test que le post-traitement des recommandations est enregistré comme tâche"""
+    from app.services.job_queue import JOB_HANDLERS
+    from app.services.recommendation_service import EXPERT_NOTIFY_JOB
+
+    assert EXPERT_NOTIFY_JOB in JOB_HANDLERS
+
+
+def test_job_queue_interface_is_abstract():
+    """Test qu'une file n'implémentant pas toute l'interface ne peut pas être instanciée"""
+    class Incomplete(JobQueue):
+        def enqueue(self, name, payload, max_attempts=None, delay=0):
+            return "id"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.core.circuit_breaker import CircuitBreaker, CircuitState
+from app.schemas.ai_integration import MLPredictResponse, SoilData
+from app.services.ml_service import MLService
+
+
+def make_samples(count: int):
+    return [
+        SoilData(N=90, P=42, K=43, temperature=20.8, humidity=82.0, ph=6.5, rainfall=1500.0)
+        for _ in range(count)
+    ]
+
+
+def make_response(size: int, crops):
+    return MLPredictResponse(
+        nb_echantillons=size,
+        resultats_par_echantillon=[
+            {"echantillon": i + 1, "top3": [{"rang": 1, "culture": crops[0][0], "confiance": crops[0][1]}]}
+            for i in range(size)
+        ],
+        top3_global=[
+            {"rang": rang, "culture": culture, "confiance_agregee": conf}
+            for rang, (culture, conf) in enumerate(crops, start=1)
+        ]
+    )
+
+
+class TestBatchChunking:
+    """Tests pour le découpage des lots envoyés au service ML"""
+
+    def test_chunk_samples_respects_limit(self):
+        """Test que chaque lot respecte la limite du service ML"""
+        chunks = MLService._chunk_samples(make_samples(23), MLService.MAX_BATCH_SIZE)
+
+        assert [len(c) for c in chunks] == [10, 10, 3]
+
+    @pytest.mark.asyncio
+    async def test_small_batch_single_request(self, monkeypatch):
+        """Test qu'un petit lot est envoyé en une seule requête, sans réagrégation"""
+        calls = []
+        expected = make_response(4, [("rice", 80.0), ("maize", 15.0)])
+
+        async def fake_predict(client, samples):
+            calls.append(len(samples))
+            return expected
+
+        monkeypatch.setattr(MLService, "_predict_batch", staticmethod(fake_predict))
+        result = await MLService.predict_crop(make_samples(4))
+
+        assert calls == [4]
+        assert result == expected
+
+    @pytest.mark.asyncio
+    async def test_large_batch_dispatched_concurrently(self, monkeypatch):
+        """Test que les lots sont envoyés en parallèle, dans la limite de concurrence"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "ML_MAX_CONCURRENT_BATCHES", 2)
+        in_flight = 0
+        peak = 0
+
+        async def fake_predict(client, samples):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_response(len(samples), [("rice", 90.0)])
+
+        monkeypatch.setattr(MLService, "_predict_batch", staticmethod(fake_predict))
+        result = await MLService.predict_crop(make_samples(35))
+
+        assert peak == 2
+        assert result.nb_echantillons == 35
+        assert [s.echantillon for s in result.resultats_par_echantillon] == list(range(1, 36))
+
+
+class TestCircuitBreakerAccounting:
+    """Tests du comptage des réponses du service ML par le disjoncteur"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code, failures", [(422, 0), (503, 1)])
+    async def test_only_server_errors_count(self, monkeypatch, status_code, failures):
+        """Test qu'une 4xx est une 502 pour l'appelant sans être un échec du service"""
+        breaker = CircuitBreaker("ml_test", min_calls=1)
+        monkeypatch.setattr(MLService, "circuit_breaker", breaker)
+        transport = httpx.MockTransport(lambda request: httpx.Response(status_code, json={}))
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(HTTPException) as exc:
+                await MLService._predict_batch(client, make_samples(2))
+
+        assert exc.value.status_code == 502
+        assert breaker.total_failures == failures
+
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_then_fan_out(self, monkeypatch, fake_clock):
+        """Test qu'en HALF_OPEN le premier lot sert d'appel de test avant les autres"""
+        breaker = CircuitBreaker("ml_test", min_calls=1, open_seconds=30, clock=fake_clock)
+        breaker.record_failure()
+        fake_clock.advance(31)
+        monkeypatch.setattr(MLService, "circuit_breaker", breaker)
+
+        async def handler(request):
+            # Réponse différée : les lots sont réellement en vol en même temps
+            await asyncio.sleep(0.01)
+            size = len(json.loads(request.content)["samples"])
+            return httpx.Response(200, json=make_response(size, [("rice", 90.0)]).model_dump())
+
+        real_client = httpx.AsyncClient
+        monkeypatch.setattr(
+            httpx, "AsyncClient",
+            lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+        )
+        # Appel direct du service distant : pas de repli sur le modèle local
+        result = await MLService._predict_remote(make_samples(25))
+
+        assert result.nb_echantillons == 25
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestResultAggregation:
+    """Tests pour l'agrégation locale du top3_global"""
+
+    def test_weighted_confidence(self):
+        """Test que la confiance est pondérée par la taille des lots"""
+        results = [
+            make_response(10, [("rice", 90.0), ("maize", 10.0)]),
+            make_response(5, [("maize", 60.0), ("rice", 30.0), ("jute", 10.0)]),
+        ]
+
+        aggregated = MLService._aggregate_results(results, [10, 5])
+
+        assert aggregated.nb_echantillons == 15
+        assert [c.culture for c in aggregated.top3_global] == ["rice", "maize", "jute"]
+        assert aggregated.top3_global[0].confiance_agregee == pytest.approx(70.0)
+        assert aggregated.top3_global[1].confiance_agregee == pytest.approx(26.67)
+        assert [c.rang for c in aggregated.top3_global] == [1, 2, 3]
@@ -0,0 +1,257 @@
+import pytest
+from datetime import datetime
+from app.models.notification_outbox import NotificationOutbox, OutboxStatus
+from app.models.recommendation import Recommendation
+from app.schemas.ai_integration import MLPredictResponse, TopCropGlobal
+from app.services.notification_outbox import OutboxDispatcher, enqueue_notification
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def no_digest_window(monkeypatch):
+    """Envoi immédiat par défaut ; les tests de digest réactivent la fenêtre"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "NOTIFICATION_DIGEST_WINDOW", 0)
+
+
+def add(db, key, channel="email", recipient="farmer@example.com", **kwargs):
+    entry = enqueue_notification(db, channel, recipient, kwargs.pop("body", f"Corps {key}"), key, subject="Sujet", **kwargs)
+    db.commit()
+    return entry
+
+
+class TestEnqueue:
+    """Tests de l'inscription dans l'outbox"""
+
+    def test_idempotency_key_deduplicates(self, db):
+        """Test qu'une même clé n'est inscrite qu'une fois, dans la transaction ou après commit"""
+        assert enqueue_notification(db, "email", "a@example.com", "Corps", "rec:1:email") is not None
+        assert enqueue_notification(db, "email", "a@example.com", "Autre", "rec:1:email") is None
+        db.commit()
+        assert enqueue_notification(db, "email", "a@example.com", "Autre", "rec:1:email") is None
+        assert db.query(NotificationOutbox).count() == 1
+
+    def test_identical_pending_content_deduplicated(self, db):
+        """Test qu'un contenu identique déjà en attente pour le destinataire n'est pas réinscrit"""
+        add(db, "tick-1", body="Culture: Maïs")
+        assert add(db, "tick-2", body="Culture: Maïs") is None
+        assert add(db, "tick-3", recipient="other@example.com", body="Culture: Maïs") is not None
+
+        # Une fois envoyé, le même contenu peut de nouveau être inscrit
+        db.query(NotificationOutbox).update({"status": OutboxStatus.SENT})
+        db.commit()
+        assert add(db, "tick-4", body="Culture: Maïs") is not None
+
+    def test_not_written_without_commit(self, db):
+        """Test que l'outbox suit la transaction de l'appelant"""
+        enqueue_notification(db, "sms", "+237600000000", "Corps", "rec:2:sms")
+        db.rollback()
+
+        assert db.query(NotificationOutbox).count() == 0
+
+    @pytest.mark.asyncio
+    async def test_recommendation_and_outbox_written_together(self, db, test_user, monkeypatch):
+        """Test que la recommandation et ses notifications sont enregistrées dans la même transaction"""
+        import app.database
+        from app.services.expert_system_service import ExpertSystemService
+        from app.services.recommendation_service import RecommendationService
+
+        async def no_expert(query, region):
+            return None
+
+        monkeypatch.setattr(app.database, "SessionLocal", TestingSessionLocal)
+        monkeypatch.setattr(ExpertSystemService, "query_expert_system", staticmethod(no_expert))
+        test_user.notification_modes = ["email", "sms", "telegram"]
+        db.commit()
+
+        ml_result = MLPredictResponse(
+            nb_echantillons=1,
+            resultats_par_echantillon=[],
+            top3_global=[TopCropGlobal(rang=1, culture="Maïs", confiance_agregee=87.5)]
+        )
+        await RecommendationService.process_expert_system_and_notify(
+            user=test_user, parcelle_id="parcelle-1", recommended_crop="Maïs",
+            ml_result=ml_result, current_region="Centre", query=None
+        )
+
+        recommendation = db.query(Recommendation).one()
+        entries = db.query(NotificationOutbox).filter(NotificationOutbox.recommendation_id == recommendation.id).all()
+        channels = sorted(entry.channel for entry in entries)
+        assert channels == ["email"] * 5 + ["sms", "telegram"]
+        assert all(entry.status == OutboxStatus.PENDING for entry in entries)
+
+
+class TestOutboxDispatcher:
+    """Tests du dispatcher (lots par canal, reprises, dead letter)"""
+
+    @pytest.mark.asyncio
+    async def test_batches_per_channel(self, db):
+        """Test que chaque canal est distribué et acquitté"""
+        add(db, "k1", "email")
+        add(db, "k2", "email")
+        add(db, "k3", "sms", "+237600000000")
+        sent = []
+
+        async def sender(item):
+            sent.append((item.channel, item.idempotency_key))
+            return {"success": True}
+
+        dispatcher = OutboxDispatcher(TestingSessionLocal, sender=sender, batch_size=10)
+        await dispatcher.drain()
+
+        assert sorted(sent) == [("email", "k1"), ("email", "k2"), ("sms", "k3")]
+        assert {row.status for row in db.query(NotificationOutbox).all()} == {OutboxStatus.SENT}
+        assert dispatcher.sent == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_retried_with_backoff(self, db):
+        """Test qu'un échec reprogramme la notification plus tard"""
+        add(db, "k1")
+
+        async def sender(item):
+            return {"success": False, "error": "SMTP indisponible"}
+
+        dispatcher = OutboxDispatcher(TestingSessionLocal, sender=sender)
+        await dispatcher.drain()
+
+        row = db.query(NotificationOutbox).one()
+        assert row.status == OutboxStatus.PENDING
+        assert row.attempts == 1
+        assert row.last_error == "SMTP indisponible"
+        assert row.next_attempt_at > datetime.utcnow()
+        assert dispatcher.retried == 1
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_after_max_attempts(self, db, monkeypatch):
+        """Test qu'une notification en échec répété est abandonnée (dead letter)"""
+        add(db, "k1")
+        db.query(NotificationOutbox).update({"max_attempts": 2})
+        db.commit()
+
+        async def sender(item):
+            raise RuntimeError("Infobip 503")
+
+        dispatcher = OutboxDispatcher(TestingSessionLocal, sender=sender)
+        monkeypatch.setattr(dispatcher, "retry_delay", lambda attempts: 0)
+        await dispatcher.drain()
+
+        db.expire_all()
+        row = db.query(NotificationOutbox).one()
+        assert row.status == OutboxStatus.DEAD
+        assert row.attempts == 2
+        assert row.last_error == "RuntimeError: Infobip 503"
+
+    @pytest.mark.asyncio
+    async def test_stale_lease_not_acknowledged(self, db):
+        """Test qu'un dispatcher dont la réservation a expiré ne peut plus acquitter"""
+        add(db, "k1")
+        dispatcher = OutboxDispatcher(TestingSessionLocal, sender=None)
+        item = dispatcher.claim("email", 10)[0]
+
+        # Réservée à nouveau par un autre dispatcher après expiration
+        db.query(NotificationOutbox).update({"locked_by": "other"})
+        db.commit()
+        dispatcher.acknowledge([(item, None)])
+
+        db.expire_all()
+        assert db.query(NotificationOutbox).one().status == OutboxStatus.SENDING
+
+
+class TestDigest:
+    """Tests du regroupement des notifications par destinataire et canal"""
+
+    @pytest.mark.asyncio
+    async def test_pending_notifications_merged(self, db, monkeypatch):
+        """Test que les notifications d'un destinataire dans la fenêtre partent en un seul message"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "NOTIFICATION_DIGEST_WINDOW", 300)
+
+        for i in range(5):
+            add(db, f"rec:{i}", body=f"Parcelle {i}")
+        add(db, "other", recipient="other@example.com")
+        add(db, "sms", channel="sms", recipient="+237600000000")
+        # Seule la première notification est arrivée à échéance
+        first = db.query(NotificationOutbox).filter(NotificationOutbox.idempotency_key == "rec:0").one()
+        first.next_attempt_at = datetime.utcnow()
+        db.commit()
+        sent = []
+
+        async def sender(item):
+            sent.append(item)
+            return {"success": True}
+
+        dispatcher = OutboxDispatcher(TestingSessionLocal, sender=sender)
+        await dispatcher.drain()
+
+        assert len(sent) == 1
+        assert sent[0].subject == "AgroPredict : 5 notifications"
+        assert all(f"Parcelle {i}" in sent[0].body for i in range(5))
+        db.expire_all()
+        statuses = {row.idempotency_key: row.status for row in db.query(NotificationOutbox).all()}
+        assert all(statuses[f"rec:{i}"] == OutboxStatus.SENT for i in range(5))
+        assert statuses["other"] == OutboxStatus.PENDING
+        assert statuses["sms"] == OutboxStatus.PENDING
+        assert dispatcher.snapshot()["digested"] == 4
+
+    def test_duplicates_rendered_once(self):
+        """Test que le digest ne répète pas un contenu identique"""
+        from app.services.notification_digest import DigestEngine, content_hash
+        from app.services.notification_outbox import ClaimedNotification
+
+        def item(id, body):
+            return ClaimedNotification(id, "sms", "+237600000000", None, body, id, 1, 3, "lease",
+                                       content_hash("sms", "+237600000000", None, body))
+
+        items = [item("a", "Maïs"), item("b", "Maïs"), item("c", "Riz")]
+        [(message, covered)] = DigestEngine().group(items)
+
+        assert message.body == "Maïs\nRiz"
+        assert [i.id for i in covered] == ["a", "b", "c"]
+
+
+    def test_missing_hash_not_deduplicated(self):
+        """Test que des notifications sans empreinte ne sont pas fusionnées"""
+        from app.services.notification_digest import DigestEngine
+        from app.services.notification_outbox import ClaimedNotification
+
+        items = [
+            ClaimedNotification(id, "sms", "+237600000000", None, body, id, 1, 3, "lease")
+            for id, body in [("a", "Maïs"), ("b", "Riz"), ("c", "Mil")]
+        ]
+        [(message, covered)] = DigestEngine().group(items)
+
+        assert message.body == "Maïs\nRiz\nMil"
+        assert [i.id for i in covered] == ["a", "b", "c"]
+
+
+    def test_sms_digest_capped_in_segments(self):
+        """Test qu'un digest SMS est découpé pour respecter le plafond de segments"""
+        from app.services.notification_digest import DigestEngine, content_hash
+        from app.services.notification_outbox import ClaimedNotification
+        from app.services.notification_templates import fit_sms, sms_segments
+
+        def item(id, body):
+            return ClaimedNotification(id, "sms", "+237600000000", None, body, id, 1, 3, "lease",
+                                       content_hash("sms", "+237600000000", None, body))
+
+        # SMS courts : fusionnés, chaque message fusionné reste sous 3 segments
+        short = [item(f"s{i}", f"Parcelle {i} : semer du mais cette semaine") for i in range(20)]
+        digests = DigestEngine(20, sms_max_segments=3).group(short)
+        assert 1 < len(digests) < 20
+        assert all(sms_segments(message.body).segments <= 3 for message, _ in digests)
+        assert sorted(i.id for _, covered in digests for i in covered) == sorted(i.id for i in short)
+
+        # SMS déjà à 3 segments : aucun regroupement possible, pas de message de 61 segments
+        long = [item(f"l{i}", fit_sms(f"Parcelle {i} " + "conseil detaille " * 40, 3)) for i in range(20)]
+        digests = DigestEngine(20, sms_max_segments=3).group(long)
+        assert len(digests) == 20
+        assert max(sms_segments(message.body).segments for message, _ in digests) == 3
+
+
+def test_outbox_health_endpoint(client, db, admin_headers):
+    """Test de l'exposition de l'état de l'outbox"""
+    add(db, "k1")
+    response = client.get("/api/v1/health/outbox", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["channels"] == {"email": {"pending": 1}}
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.notification_rate_limiter import NotificationRateLimiter
+from app.services.notification_service import NotificationService
+
+
+class TestNotificationRateLimiter:
+    """Tests de la limitation de débit des notifications"""
+
+    @pytest.mark.asyncio
+    async def test_channel_rate_queues_excess(self):
+        """Test que les messages au-delà du débit du canal attendent au lieu d'être perdus"""
+        limiter = NotificationRateLimiter({"telegram": 20}, recipient_rate=0, recipient_burst=1)
+        started = time.monotonic()
+        # Capacité 20 : les 20 premiers passent, les 5 suivants attendent ~0.25 s
+        await asyncio.gather(*(limiter.acquire("telegram", f"chat-{i}") for i in range(25)))
+        elapsed = time.monotonic() - started
+
+        stats = limiter.snapshot()["telegram"]
+        assert stats["admitted"] == 25
+        assert stats["throttled"] == 5
+        assert stats["max_queued"] == 5
+        assert stats["queued"] == 0
+        assert elapsed >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_recipient_rate_is_per_recipient(self):
+        """Test qu'un destinataire bavard ne ralentit pas les autres"""
+        limiter = NotificationRateLimiter({"sms": 0}, recipient_rate=10, recipient_burst=1)
+        await limiter.acquire("sms", "+221700000001")
+        await limiter.acquire("sms", "+221700000002")
+        assert limiter.snapshot()["sms"]["throttled"] == 0
+
+        await limiter.acquire("sms", "+221700000001")
+        assert limiter.snapshot()["sms"]["throttled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_channel_is_not_limited(self):
+        """Test qu'un canal non configuré n'est pas bloqué"""
+        limiter = NotificationRateLimiter({"email": 1}, recipient_rate=1, recipient_burst=1)
+        await limiter.acquire("fax", "x")
+        assert "fax" not in limiter.snapshot()
+
+    @pytest.mark.asyncio
+    async def test_notification_service_goes_through_limiter(self):
+        """Test que NotificationService consomme le limiteur avant l'envoi"""
+        limiter = NotificationRateLimiter({"email": 0}, recipient_rate=0, recipient_burst=1)
+        service = NotificationService(rate_limiter=limiter)
+
+        async def fake_send(to, subject, body):
+            return {"success": True, "to": to}
+
+        service.email_service.send_email = fake_send
+        result = await service.send_email("a@example.com", "Sujet", "Corps")
+
+        assert result["success"] is True
+        assert limiter.snapshot()["email"]["admitted"] == 1
@@ -0,0 +1,84 @@
+import pytest
+
+from app.services.notification_templates import (
+    TEMPLATES,
+    CompiledTemplate,
+    NotificationTemplateEngine,
+    fit_sms,
+    sms_segments,
+)
+
+
+class TestSMSSegments:
+    """Tests du calcul de segments SMS"""
+
+    def test_gsm7_limits(self):
+        """Test des limites GSM-7 : 160 caractères, puis 153 par segment"""
+        assert sms_segments("A" * 160).segments == 1
+        assert sms_segments("A" * 161).segments == 2
+        assert sms_segments("A" * 306).segments == 2
+        assert sms_segments("A" * 307).segments == 3
+        assert sms_segments("é" * 10).encoding == "GSM-7"
+
+    def test_extended_characters_count_double(self):
+        """Test que les caractères de la table d'extension coûtent deux septets"""
+        info = sms_segments("€" * 80)
+        assert info.encoding == "GSM-7"
+        assert info.units == 160
+        assert info.segments == 1
+
+    def test_ucs2_limits(self):
+        """Test qu'un caractère hors GSM-7 fait passer tout le message en UCS-2"""
+        assert sms_segments("ê" * 70).encoding == "UCS-2"
+        assert sms_segments("ê" * 70).segments == 1
+        assert sms_segments("ê" * 71).segments == 2
+
+    def test_fit_sms_transliterates_and_truncates(self):
+        """Test de la translittération GSM-7 et de la troncature au nombre de segments"""
+        assert fit_sms("Fenêtre de plantation", 1) == "Fenetre de plantation"
+        fitted = fit_sms("A" * 1600, 3)
+        assert fitted.endswith("...")
+        assert sms_segments(fitted).segments == 3
+
+
+class TestNotificationTemplateEngine:
+    """Tests du moteur de gabarits"""
+
+    def test_invalid_template_fails_at_compile_time(self):
+        """Test qu'un champ mal formé est refusé dès la compilation"""
+        with pytest.raises(ValueError):
+            CompiledTemplate("Bonjour {user.name}")
+
+    def test_render_recommendation_summary(self):
+        """Test du rendu d'un gabarit avec format"""
+        engine = NotificationTemplateEngine(TEMPLATES)
+        message = engine.render("recommendation_summary", "email", crop="Maïs", confidence=87.456)
+        assert message.subject == "AgroPredict: Recommandation globale"
+        assert message.body == "Culture recommandée: Maïs\nConfiance: 87.46%"
+
+    def test_language_and_channel_fallback(self):
+        """Test du repli sur le gabarit générique et sur la langue par défaut"""
+        engine = NotificationTemplateEngine(TEMPLATES)
+        sms = engine.render("recommendation_short", "sms", language="en", crop="Rice", confidence=90)
+        assert sms.body.startswith("[AgroPredict] Crop: Rice")
+        assert sms.sms.segments == 1
+
+        telegram = engine.render("ml_prediction", "telegram", language="wo", crop="Mil")
+        assert telegram.body == "[AgroPredict] Résultat ML: Votre prédiction est Mil"
+
+    def test_render_cache_shared_across_recipients(self):
+        """Test qu'un même contenu n'est rendu qu'une fois"""
+        engine = NotificationTemplateEngine(TEMPLATES)
+        for _ in range(100):
+            engine.render("recommendation_short", "sms", crop="Mil", confidence=75.0)
+        engine.render("recommendation_short", "sms", crop="Sorgho", confidence=75.0)
+
+        assert engine.misses == 2
+        assert engine.hits == 99
+
+    def test_cache_is_bounded(self):
+        """Test que le cache de rendu reste borné"""
+        engine = NotificationTemplateEngine(TEMPLATES, cache_size=2)
+        for crop in ("Mil", "Maïs", "Riz"):
+            engine.render("ml_prediction", "email", crop=crop)
+        assert engine.snapshot()["cached"] == 2
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.rate_limit import KeyedTokenBuckets
+from app.core.security import PasswordHasherPool, get_password_hash, verify_password_async
+
+
+class TestPasswordHasherPool:
+    """Tests du pool bcrypt"""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running(self):
+        """Test que la boucle asyncio continue de tourner pendant le hachage"""
+        hashed = get_password_hash("TestPassword123")
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(verify_password_async("TestPassword123", hashed) for _ in range(4)))
+        task.cancel()
+
+        assert all(results)
+        assert ticks > 0
+
+    @pytest.mark.asyncio
+    async def test_admission_limit(self):
+        """Test qu'au-delà de la limite d'admission la requête est refusée (503)"""
+        pool = PasswordHasherPool(workers=1, max_pending=1)
+        slow = asyncio.create_task(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(time.sleep, 0)
+        await slow
+
+        assert exc_info.value.status_code == 503
+        assert pool.rejected == 1
+        assert pool.pending == 0
+
+
+class TestLoginThrottling:
+    """Tests de la limitation des échecs de connexion par IP"""
+
+    def test_failed_logins_are_throttled(self, client, test_user, monkeypatch):
+        """Test qu'une IP dépassant la rafale d'échecs reçoit 429"""
+        from app.routers import auth_router
+
+        monkeypatch.setattr(auth_router, "login_failures", KeyedTokenBuckets(0.001, capacity=2))
+        wrong = {"email": test_user.email, "password": "MauvaisMotDePasse1"}
+
+        assert client.post("/api/v1/auth/login", json=wrong).status_code == 401
+        assert client.post("/api/v1/auth/login", json=wrong).status_code == 401
+        throttled = client.post("/api/v1/auth/login", json=wrong)
+        assert throttled.status_code == 429
+        assert int(throttled.headers["Retry-After"]) > 0
+
+        # Même le bon mot de passe est refusé tant que l'IP est limitée
+        right = {"email": test_user.email, "password": "TestPassword123"}
+        assert client.post("/api/v1/auth/login", json=right).status_code == 429
+
+    def test_successful_logins_are_not_throttled(self, client, test_user, monkeypatch):
+        """Test que les connexions réussies ne consomment pas le quota"""
+        from app.routers import auth_router
+
+        monkeypatch.setattr(auth_router, "login_failures", KeyedTokenBuckets(0.001, capacity=1))
+        right = {"email": test_user.email, "password": "TestPassword123"}
+        for _ in range(3):
+            assert client.post("/api/v1/auth/login", json=right).status_code == 200
+
+    def test_spoofed_forwarded_for_still_throttled(self, client, test_user, monkeypatch):
+        """Test qu'un X-Forwarded-For forgé par le client ne donne pas un nouveau quota"""
+        from app.core.config import settings
+        from app.routers import auth_router
+
+        monkeypatch.setattr(settings, "TRUST_FORWARDED_FOR", True)
+        monkeypatch.setattr(auth_router, "login_failures", KeyedTokenBuckets(0.001, capacity=2))
+        wrong = {"email": test_user.email, "password": "MauvaisMotDePasse1"}
+        statuses = [
+            # Le client forge l'entrée de gauche, le proxy ajoute l'adresse réelle à droite
+            client.post(
+                "/api/v1/auth/login", json=wrong,
+                headers={"X-Forwarded-For": f"198.51.100.{i}, 203.0.113.7"}
+            ).status_code
+            for i in range(4)
+        ]
+        assert statuses == [401, 401, 429, 429]
+
+
+class TestAuthenticateAsync:
+    """Tests de l'authentification asynchrone"""
+
+    @pytest.mark.asyncio
+    async def test_database_calls_leave_event_loop(self, db, test_user, monkeypatch):
+        """Test que la lecture et le commit SQLAlchemy ne s'exécutent pas dans la boucle asyncio"""
+        from app.services.users_service import UserService
+
+        in_loop = []
+        original_lookup = UserService.get_user_by_email
+        original_update = UserService.update_last_access
+
+        def running_in_loop():
+            try:
+                asyncio.get_running_loop()
+                return True
+            except RuntimeError:
+                return False
+
+        def lookup(db, email):
+            in_loop.append(running_in_loop())
+            return original_lookup(db, email)
+
+        def update(db, user):
+            in_loop.append(running_in_loop())
+            return original_update(db, user)
+
+        monkeypatch.setattr(UserService, "get_user_by_email", staticmethod(lookup))
+        monkeypatch.setattr(UserService, "update_last_access", staticmethod(update))
+
+        user = await UserService.authenticate_user_async(db, test_user.email, "TestPassword123")
+
+        assert user is not None and user.dernier_acces is not None
+        assert in_loop == [False, False]
@@ -0,0 +1,91 @@
+from sqlalchemy import event
+
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.core.security import create_access_token
+from app.models.user import UserRole, UserStatus
+from app.schemas.user import UserUpdate
+from app.services.users_service import UserService
+
+
+def count_queries(db):
+    queries = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: queries.append(args[2]))
+    return queries
+
+
+class TestPrincipalCache:
+    """Tests du cache des utilisateurs authentifiés"""
+
+    def test_cached_user_is_attached_without_query(self, db, test_user):
+        """Test qu'un utilisateur en cache est rattaché à la session sans SELECT"""
+        cache = PrincipalCache(ttl=30, max_size=10)
+        cache.put(test_user)
+        db.expunge_all()
+        queries = count_queries(db)
+
+        user = cache.load(db, test_user.id)
+
+        assert queries == []
+        assert user in db
+        assert user.email == test_user.email
+        assert user.role == UserRole.USER
+
+    def test_cached_user_can_be_modified(self, db, test_user):
+        """Test qu'une modification de l'utilisateur en cache est bien enregistrée"""
+        cache = PrincipalCache(ttl=30, max_size=10)
+        cache.put(test_user)
+        db.expunge_all()
+
+        user = cache.load(db, test_user.id)
+        user.telephone = "+237600000000"
+        db.commit()
+        db.expunge_all()
+
+        assert UserService.get_user_by_id(db, test_user.id).telephone == "+237600000000"
+
+    def test_ttl_and_size_bounds(self, db, test_user, test_admin, fake_clock):
+        """Test de l'expiration et de la taille maximale"""
+        cache = PrincipalCache(ttl=30, max_size=1, clock=fake_clock)
+        cache.put(test_user)
+        assert cache.get(test_user.id) is not None
+
+        fake_clock.advance(31)
+        assert cache.get(test_user.id) is None
+
+        cache.put(test_user)
+        cache.put(test_admin)
+        assert cache.get(test_user.id) is None
+        assert cache.get(test_admin.id) is not None
+
+    def test_user_service_invalidates(self, db, test_user):
+        """Test que les écritures de UserService invalident le cache"""
+        principal_cache.put(test_user)
+        UserService.update_user(db, test_user.id, UserUpdate(nom="Nouveau"))
+        assert principal_cache.get(test_user.id) is None
+
+        principal_cache.put(test_user)
+        UserService.change_user_status(db, test_user.id, UserStatus.SUSPENDED)
+        assert principal_cache.get(test_user.id) is None
+
+        principal_cache.put(test_user)
+        UserService.delete_user(db, test_user.id)
+        assert principal_cache.get(test_user.id) is None
+
+
+class TestTokenPrincipal:
+    """Tests de la dépendance construite à partir des claims"""
+
+    def test_terrains_without_user_lookup(self, client, db, test_user):
+        """Test qu'une route en lecture accepte le token sans relire l'utilisateur"""
+        token = create_access_token(data={"sub": test_user.id, "email": test_user.email, "role": "user"})
+        queries = count_queries(db)
+
+        response = client.get("/api/v1/terrains/terrains/statistics", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert not any("FROM users" in query for query in queries)
+
+    def test_invalid_token_is_rejected(self, client):
+        """Test qu'un token invalide est refusé"""
+        response = client.get("/api/v1/terrains/terrains/", headers={"Authorization": "Bearer invalide"})
+        assert response.status_code == 401
@@ -0,0 +1,73 @@
+import pytest
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.rate_limit import KeyedTokenBuckets, TokenBucket, client_ip
+
+
+class TestTokenBucket:
+    """Tests du seau à jetons"""
+
+    def test_refill_over_time(self, fake_clock):
+        """Test que les jetons se rechargent au débit configuré"""
+        bucket = TokenBucket(rate=2, capacity=2, clock=fake_clock)
+
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+        assert bucket.delay_for() == pytest.approx(0.5)
+
+        fake_clock.advance(0.5)
+        assert bucket.try_acquire()
+
+    def test_capacity_caps_burst(self, fake_clock):
+        """Test que l'inactivité ne permet pas de dépasser la capacité"""
+        bucket = TokenBucket(rate=1, capacity=3, clock=fake_clock)
+        fake_clock.advance(100)
+
+        assert bucket.tokens == 3
+
+    def test_zero_rate_is_unlimited(self):
+        """Test qu'un débit nul désactive la limite"""
+        bucket = TokenBucket(rate=0)
+
+        assert all(bucket.try_acquire() for _ in range(1000))
+        assert bucket.delay_for() == 0
+
+    def test_keyed_buckets_are_independent_and_bounded(self, fake_clock):
+        """Test qu'il existe un seau par clé et que le nombre de clés est borné"""
+        buckets = KeyedTokenBuckets(rate=1, max_keys=2, clock=fake_clock)
+
+        assert buckets.try_acquire("a")
+        assert not buckets.try_acquire("a")
+        assert buckets.try_acquire("b")
+        buckets.get("c")
+        assert len(buckets) == 2
+
+
+def make_request(forwarded: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+class TestClientIp:
+    """Tests de l'adresse client derrière un proxy"""
+
+    def test_forwarded_ignored_by_default(self, monkeypatch):
+        """Sans proxy de confiance, X-Forwarded-For est ignoré"""
+        monkeypatch.setattr(settings, "TRUST_FORWARDED_FOR", False)
+        assert client_ip(make_request("1.2.3.4")) == "10.0.0.1"
+
+    def test_spoofed_entries_ignored(self, monkeypatch):
+        """Les entrées forgées par le client (à gauche) sont ignorées"""
+        monkeypatch.setattr(settings, "TRUST_FORWARDED_FOR", True)
+        monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+        assert client_ip(make_request("6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+
+    def test_trusted_hops(self, monkeypatch):
+        """Avec deux proxys, l'adresse est l'avant-dernière entrée"""
+        monkeypatch.setattr(settings, "TRUST_FORWARDED_FOR", True)
+        monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 2)
+        assert client_ip(make_request("6.6.6.6, 203.0.113.7, 10.1.0.2")) == "203.0.113.7"
+        # Moins d'entrées que de proxys : adresse de la connexion
+        assert client_ip(make_request("203.0.113.7")) == "10.0.0.1"
@@ -0,0 +1,96 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.responses import EnvelopeJSONResponse
+
+
+def build_app() -> FastAPI:
+    app = FastAPI(default_response_class=EnvelopeJSONResponse)
+
+    @app.get("/items")
+    async def items():
+        return [{"id": i} for i in range(3)]
+
+    @app.post("/items", status_code=201)
+    async def create_item():
+        return {"id": 1}
+
+    @app.get("/wrapped")
+    async def wrapped():
+        return {"success": True, "code": 200, "message": "Déjà", "data": None}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b'{"a":', b'1}']), media_type="application/json")
+
+    return app
+
+
+class TestEnvelopeJSONResponse:
+    """Tests de l'enveloppe appliquée à la sérialisation"""
+
+    def test_success_is_enveloped(self):
+        """Test que les réponses 2xx sont enveloppées avec leur code"""
+        client = TestClient(build_app())
+        body = client.get("/items").json()
+        assert body == {"success": True, "code": 200, "message": "Success", "data": [{"id": 0}, {"id": 1}, {"id": 2}]}
+
+        created = client.post("/items")
+        assert created.status_code == 201
+        assert created.json()["code"] == 201
+
+    def test_already_enveloped_is_untouched(self):
+        """Test qu'un contenu déjà au format ApiResponse n'est pas enveloppé deux fois"""
+        body = TestClient(build_app()).get("/wrapped").json()
+        assert body["message"] == "Déjà"
+        assert "data" in body and body["data"] is None
+
+    def test_streaming_is_untouched(self):
+        """Test que les réponses en flux passent sans être lues ni enveloppées"""
+        response = TestClient(build_app()).get("/stream")
+        assert response.content == b'{"a":1}'
+
+    def test_errors_are_not_enveloped_as_success(self):
+        """Test que les erreurs ne reçoivent pas l'enveloppe de succès"""
+        response = EnvelopeJSONResponse({"detail": "Not Found"}, status_code=404)
+        assert response.body == b'{"detail":"Not Found"}'
+
+
+class TestORJSONEncoding:
+    """Tests de l'encodage orjson des réponses"""
+
+    def test_native_types(self):
+        """Test de l'encodage des dates, UUID, enums et de la colonne measurements"""
+        import enum
+        import uuid
+        from datetime import datetime
+        from decimal import Decimal
+
+        class Mode(str, enum.Enum):
+            EMAIL = "email"
+
+        identifier = uuid.UUID("12345678-1234-5678-1234-567812345678")
+        content = {
+            "id": identifier,
+            "timestamp": datetime(2024, 5, 1, 12, 30, 15),
+            "mode": Mode.EMAIL,
+            "superficie": Decimal("1.5"),
+            "measurements": {"ph": 6.5, "npk": [1, 2, 3], 3: "clé entière"},
+        }
+        body = EnvelopeJSONResponse(content).body
+
+        import json
+        data = json.loads(body)["data"]
+        assert data["id"] == str(identifier)
+        assert data["timestamp"] == "2024-05-01T12:30:15"
+        assert data["mode"] == "email"
+        assert data["superficie"] == 1.5
+        assert data["measurements"] == {"ph": 6.5, "npk": [1, 2, 3], "3": "clé entière"}
+
+    def test_pydantic_models_are_serialized(self):
+        """Test qu'un modèle pydantic renvoyé tel quel est encodé"""
+        from app.schemas.notification import NotificationResponse
+
+        body = EnvelopeJSONResponse({"result": NotificationResponse(success=True, message="ok")}).body
+        assert b'"result":{"success":true,"message":"ok","details":null}' in body
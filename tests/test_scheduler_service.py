@@ -0,0 +1,371 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from app.models.user import User, RecommendationFrequency
+from app.models.terrain import Terrain
+from app.models.parcelle import Parcelle
+from app.models.recommendation import Recommendation
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from app.core.leader_election import AdvisoryLock, FileLock, LeaderElector, LeaderLock
+from app.services.scheduler_engine import DueParcelle, SchedulerEngine
+from app.services.scheduler_service import SchedulerService, next_due_time, scheduler_service, shard_of
+from tests.conftest import TestingSessionLocal
+
+
+NOW = datetime(2026, 6, 1)
+
+
+def make_user(db, email, frequency=RecommendationFrequency.WEEKLY):
+    user = User(nom="N", prenom="P", email=email, password_hash="x", recommendation_frequency=frequency)
+    db.add(user)
+    db.flush()
+    return user
+
+
+def make_parcelle(db, user, last_recommendation_days=None, nom="P"):
+    terrain = Terrain(nom=f"T-{nom}", localite_id="loc", user_id=user.id)
+    db.add(terrain)
+    db.flush()
+    parcelle = Parcelle(nom=nom, terrain_id=terrain.id, superficie=1.0)
+    db.add(parcelle)
+    db.flush()
+    if last_recommendation_days is not None:
+        db.add(Recommendation(
+            titre="R", contenu="C", parcelle_id=parcelle.id, user_id=user.id,
+            created_at=NOW - timedelta(days=last_recommendation_days)
+        ))
+    return parcelle
+
+
+class TestDueParcellesQuery:
+    """Tests de la requête ensembliste des parcelles à échéance"""
+
+    def test_thresholds_per_frequency(self, db):
+        """Test que chaque parcelle est comparée au seuil de la fréquence de son propriétaire"""
+        weekly = make_user(db, "w@example.com")
+        monthly = make_user(db, "m@example.com", RecommendationFrequency.MONTHLY)
+        quarterly = make_user(db, "q@example.com", RecommendationFrequency.QUARTERLY)
+        disabled = make_user(db, "d@example.com", RecommendationFrequency.DISABLED)
+
+        due = {
+            make_parcelle(db, weekly, 8, "w-due").id,
+            make_parcelle(db, monthly, 31, "m-due").id,
+            make_parcelle(db, quarterly, 91, "q-due").id,
+            make_parcelle(db, weekly, None, "never").id,
+        }
+        make_parcelle(db, weekly, 2, "w-recent")
+        make_parcelle(db, monthly, 10, "m-recent")
+        make_parcelle(db, quarterly, 60, "q-recent")
+        make_parcelle(db, disabled, 400, "disabled")
+        db.commit()
+
+        found = {item.parcelle_id for item in SchedulerService.iter_due_parcelles(db, now=NOW)}
+        assert found == due
+
+    def test_latest_recommendation_wins(self, db):
+        """Test que seule la recommandation la plus récente de la parcelle compte"""
+        user = make_user(db, "u@example.com")
+        parcelle = make_parcelle(db, user, 20)
+        db.add(Recommendation(
+            titre="R", contenu="C", parcelle_id=parcelle.id, user_id=user.id,
+            created_at=NOW - timedelta(days=1)
+        ))
+        db.commit()
+
+        assert list(SchedulerService.iter_due_parcelles(db, now=NOW)) == []
+
+    def test_soft_deleted_parcelles_skipped(self, db):
+        """Test que les parcelles supprimées ne sont pas planifiées"""
+        user = make_user(db, "u@example.com")
+        parcelle = make_parcelle(db, user)
+        parcelle.soft_delete()
+        db.commit()
+
+        assert list(SchedulerService.iter_due_parcelles(db, now=NOW)) == []
+
+    def test_oldest_first(self, db):
+        """Test que les parcelles jamais traitées puis les plus anciennes passent en premier"""
+        user = make_user(db, "u@example.com")
+        make_parcelle(db, user, 10, "ten")
+        make_parcelle(db, user, 50, "fifty")
+        make_parcelle(db, user, None, "never")
+        db.commit()
+
+        items = list(SchedulerService.iter_due_parcelles(db, now=NOW))
+        assert [item.last_recommended_at for item in items][0] is None
+        assert items[1].last_recommended_at < items[2].last_recommended_at
+
+
+class TestSchedulerRun:
+    """Tests de l'exécution concurrente bornée"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, db, monkeypatch):
+        """Test que le nombre de parcelles traitées simultanément respecte la limite"""
+        from app.core.config import settings
+
+        user = make_user(db, "u@example.com")
+        for i in range(7):
+            make_parcelle(db, user, None, f"p{i}")
+        db.commit()
+
+        running = 0
+        peak = 0
+        processed = []
+
+        async def fake_process(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.1)
+            running -= 1
+            processed.append(item.parcelle_id)
+
+        monkeypatch.setattr(SchedulerService, "session_factory", TestingSessionLocal)
+        monkeypatch.setattr(settings, "SCHEDULER_CONCURRENCY", 3)
+        monkeypatch.setattr(scheduler_service, "process_parcelle_recommendation", fake_process)
+
+        monkeypatch.setattr(settings, "SCHEDULER_GLOBAL_RATE", 0)
+        monkeypatch.setattr(settings, "SCHEDULER_USER_RATE", 0)
+        # Fenêtre courte devant la durée de traitement : toutes les parcelles se chevauchent
+        monkeypatch.setattr(settings, "SCHEDULER_INTERVAL", 0.01)
+        monkeypatch.setattr(scheduler_service, "process_parcelle_recommendation", fake_process)
+
+        report = await scheduler_service.check_and_trigger_recommendations()
+        assert report.total == 7
+        assert report.succeeded == 7
+        assert len(processed) == 7
+        assert peak == 3
+        assert scheduler_service.last_report is report
+
+
+class TestWindowPlanning:
+    """Tests de la planification par échéance (jitter, shards)"""
+
+    def test_jitter_spreads_backlog_over_window(self, db):
+        """Test que les parcelles en retard sont étalées sur la fenêtre, de façon stable"""
+        user = make_user(db, "u@example.com")
+        for i in range(50):
+            make_parcelle(db, user, None, f"p{i}")
+        db.commit()
+
+        heap = SchedulerService().plan_window(db, NOW, window=900)
+        offsets = sorted((due - NOW).total_seconds() for due, _, _ in heap)
+
+        assert len(offsets) == 50
+        assert 0 <= offsets[0] and offsets[-1] < 900
+        # Réparties sur la fenêtre plutôt que groupées au début
+        assert offsets[-1] - offsets[0] > 450
+        assert [d for d, _, _ in SchedulerService().plan_window(db, NOW, window=900)] == [d for d, _, _ in heap]
+
+    def test_due_time_follows_last_recommendation(self, db):
+        """Test que l'échéance est la dernière recommandation + fréquence (+ jitter)"""
+        user = make_user(db, "u@example.com")
+        parcelle = make_parcelle(db, user, 0)
+        db.commit()
+        item = DueParcelle(parcelle.id, user.id, NOW - timedelta(days=7, minutes=10), RecommendationFrequency.WEEKLY)
+
+        due_at = next_due_time(item, NOW, window=900, jitter=3600)
+        assert NOW - timedelta(minutes=10) <= due_at
+
+        # Parcelle recommandée aujourd'hui : aucune échéance dans la fenêtre de 15 min
+        assert SchedulerService().plan_window(db, NOW, window=900) == []
+
+    def test_shards_partition_parcelles(self, db, monkeypatch):
+        """Test que chaque parcelle est planifiée par exactement un shard"""
+        from app.core.config import settings
+
+        user = make_user(db, "u@example.com")
+        ids = {make_parcelle(db, user, None, f"p{i}").id for i in range(40)}
+        db.commit()
+
+        monkeypatch.setattr(settings, "SCHEDULER_SHARD_COUNT", 3)
+        planned = []
+        for index in range(3):
+            monkeypatch.setattr(settings, "SCHEDULER_SHARD_INDEX", index)
+            shard = [item.parcelle_id for _, _, item in SchedulerService().plan_window(db, NOW, window=900)]
+            assert all(shard_of(pid, 3) == index for pid in shard)
+            planned.extend(shard)
+
+        assert sorted(planned) == sorted(ids)
+
+    @pytest.mark.asyncio
+    async def test_release_waits_for_due_time(self):
+        """Test que les parcelles sont libérées dans l'ordre de leur échéance"""
+        now = datetime.utcnow()
+        heap = [
+            (now + timedelta(milliseconds=40), "b", due("b")),
+            (now, "a", due("a")),
+        ]
+        import heapq
+        heapq.heapify(heap)
+
+        released = [item.parcelle_id async for item in SchedulerService().release_due(heap)]
+
+        assert released == ["a", "b"]
+        assert datetime.utcnow() >= now + timedelta(milliseconds=40)
+
+
+def due(parcelle_id, user_id="u1", days=None):
+    return DueParcelle(parcelle_id, user_id, None if days is None else NOW - timedelta(days=days))
+
+
+class TestSchedulerEngine:
+    """Tests du moteur d'exécution (débits, priorités, bilan)"""
+
+    @pytest.mark.asyncio
+    async def test_outcomes_recorded(self):
+        """Test que chaque succès et échec est consigné dans le bilan"""
+        async def process(item):
+            if item.parcelle_id == "bad":
+                raise RuntimeError("ML indisponible")
+
+        engine = SchedulerEngine(concurrency=2, global_rate=0, user_rate=0)
+        report = await engine.run([due("a"), due("bad"), due("c")], process)
+
+        assert (report.total, report.succeeded, report.failed) == (3, 2, 1)
+        failure = next(o for o in report.outcomes if not o.success)
+        assert failure.parcelle_id == "bad"
+        assert failure.error == "RuntimeError: ML indisponible"
+        assert report.duration > 0
+        assert report.summary()["throughput_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_user_rate_defers_without_blocking(self):
+        """Test qu'un utilisateur limité est différé sans retarder les autres"""
+        order = []
+
+        async def process(item):
+            order.append(item.parcelle_id)
+
+        engine = SchedulerEngine(concurrency=1, global_rate=0, user_rate=20)
+        report = await engine.run(
+            [due("u1-a", "u1"), due("u1-b", "u1"), due("u2-a", "u2")],
+            process
+        )
+
+        assert order == ["u1-a", "u2-a", "u1-b"]
+        assert report.deferred == 1
+        assert report.succeeded == 3
+
+    @pytest.mark.asyncio
+    async def test_redeferred_item_counted_once(self):
+        """Test qu'une parcelle différée plusieurs fois n'est comptée qu'une fois"""
+        async def process(item):
+            pass
+
+        engine = SchedulerEngine(concurrency=1, global_rate=0, user_rate=50)
+        # u1-b et u1-c attendent le même jeton : u1-c est différée une seconde fois
+        report = await engine.run([due("u1-a"), due("u1-b"), due("u1-c")], process)
+
+        assert report.succeeded == 3
+        assert report.deferred == 2
+
+    @pytest.mark.asyncio
+    async def test_global_rate_limit(self):
+        """Test que le débit global borne la durée minimale du lot"""
+        async def process(item):
+            pass
+
+        engine = SchedulerEngine(concurrency=10, global_rate=50, user_rate=0)
+        report = await engine.run([due(str(i), str(i)) for i in range(6)], process)
+
+        # 1 jeton initial puis 50/s : 5 attentes de 20 ms
+        assert report.duration >= 0.09
+        assert report.succeeded == 6
+
+
+class TestLeaderElection:
+    """Tests de l'élection de leader (verrou fichier, équivalent local du verrou consultatif)"""
+
+    def test_single_leader_and_takeover(self, tmp_path):
+        """Test qu'un seul processus est leader et qu'un suiveur prend le relais"""
+        path = str(tmp_path / "scheduler.lock")
+        leader = LeaderElector(FileLock(path), identity="a")
+        follower = LeaderElector(FileLock(path), identity="b")
+
+        assert leader.step() is True
+        assert follower.step() is False
+        assert leader.step() is True
+
+        # Arrêt (ou mort) du leader : le verrou est libéré
+        leader.resign()
+        assert follower.step() is True
+        assert follower.snapshot()["is_leader"] is True
+        assert leader.step() is False
+        follower.resign()
+
+    def test_lock_interface_is_abstract(self):
+        """Test qu'un verrou incomplet ne peut pas être instancié"""
+        class Incomplete(LeaderLock):
+            def try_acquire(self):
+                return True
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_advisory_lock_outside_app_pool(self):
+        """Test que le verrou consultatif utilise un moteur sans pool"""
+        lock = AdvisoryLock(create_engine("sqlite://"), "test")
+        assert isinstance(lock.engine.pool, NullPool)
+
+    @pytest.mark.parametrize("method", ["renew", "release"])
+    def test_advisory_lock_invalidates_on_error(self, method):
+        """Test qu'une erreur invalide la connexion au lieu de la rendre avec le verrou"""
+        class BrokenConnection:
+            invalidated = closed = False
+
+            def execute(self, *args, **kwargs):
+                raise RuntimeError("requête interrompue")
+
+            def invalidate(self):
+                self.invalidated = True
+
+            def close(self):
+                self.closed = True
+
+        lock = AdvisoryLock(create_engine("sqlite://"), "test")
+        connection = lock._connection = BrokenConnection()
+        result = getattr(lock, method)()
+
+        assert connection.invalidated and connection.closed
+        assert lock._connection is None
+        if method == "renew":
+            assert result is False
+
+    @pytest.mark.asyncio
+    async def test_follower_does_not_tick(self, tmp_path, monkeypatch):
+        """Test que seul le leader exécute des lots"""
+        path = str(tmp_path / "scheduler.lock")
+        holder = FileLock(path)
+        assert holder.try_acquire()
+
+        service = SchedulerService()
+        ticks = []
+
+        async def fake_tick():
+            ticks.append(1)
+            service.stop()
+
+        monkeypatch.setattr(service, "elector", LeaderElector(FileLock(path), renew_interval=0.01))
+        monkeypatch.setattr(service, "tick", fake_tick)
+
+        task = asyncio.create_task(service.start())
+        await asyncio.sleep(0.05)
+        assert ticks == []
+        assert service.snapshot()["leadership"]["is_leader"] is False
+
+        holder.release()
+        await asyncio.wait_for(task, timeout=1)
+        assert ticks == [1]
+        assert service.elector.is_leader is False
+
+
+def test_scheduler_health_endpoint(client, admin_headers):
+    """Test de l'exposition de l'état du scheduler"""
+    response = client.get("/api/v1/health/scheduler", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert "leadership" in data
+    assert "ticks" in data
@@ -211,3 +211,62 @@ class TestTokenVerification:
 
         payload = verify_token(token, token_type="access")
         assert payload is None
+
+
+class TestVerifiedTokenCache:
+    """Tests du cache des tokens vérifiés"""
+
+    def test_signature_checked_once(self, monkeypatch):
+        """Test qu'un token déjà vérifié est servi sans nouvelle vérification"""
+        from app.core import security
+
+        token = create_access_token({"sub": "user-cache"})
+        first = decode_token(token)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("jwt.decode ne devrait pas être appelé")
+
+        monkeypatch.setattr(security.jwt, "decode", fail)
+        second = decode_token(token)
+
+        assert second == first
+        second["sub"] = "modifié"
+        assert decode_token(token)["sub"] == "user-cache"
+
+    def test_expired_entry_is_not_served(self, fake_clock):
+        """Test qu'une entrée n'est jamais servie après l'expiration du token"""
+        from app.core.security import VerifiedTokenCache
+
+        cache = VerifiedTokenCache(max_size=10, clock=fake_clock)
+        key = cache.digest("token")
+        cache.put(key, {"sub": "u", "exp": 1060})
+
+        assert cache.get(key) == {"sub": "u", "exp": 1060}
+        fake_clock.advance(60)
+        assert cache.get(key) is None
+
+    def test_tampered_token_is_rejected(self):
+        """Test qu'un token altéré n'est pas confondu avec l'original"""
+        token = create_access_token({"sub": "user-cache"})
+        assert decode_token(token) is not None
+
+        header, payload, signature = token.split(".")
+        tampered = ".".join([header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")])
+        assert decode_token(tampered) is None
+
+    def test_secret_rotation_invalidates(self, monkeypatch):
+        """Test qu'un changement de clé de signature rend les entrées inaccessibles"""
+        token = create_access_token({"sub": "user-cache"})
+        assert decode_token(token) is not None
+
+        monkeypatch.setattr(settings, "SECRET_KEY", "autre-cle")
+        assert decode_token(token) is None
+
+    def test_cache_is_bounded(self):
+        """Test que le nombre d'entrées reste borné"""
+        from app.core.security import VerifiedTokenCache
+
+        cache = VerifiedTokenCache(max_size=2)
+        for i in range(5):
+            cache.put(cache.digest(f"token-{i}"), {"exp": 2 ** 40})
+        assert cache.snapshot()["size"] == 2
@@ -0,0 +1,90 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget d'import de l'application (ms), ajustable sur une machine lente
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "3000"))
+
+# Modules construits au démarrage (lifespan) ou au premier usage, jamais à l'import
+DEFERRED_MODULES = (
+    "aiosmtplib",
+    "app.services.auth_service",
+    "app.services.chirpstack_service",
+    "app.services.email_service",
+    "app.services.infobip_service",
+    "app.services.scheduler_service",
+    "app.services.telegram_service",
+)
+
+
+def run_import(code: str, *python_options: str) -> subprocess.CompletedProcess:
+    env = dict(
+        os.environ,
+        SECRET_KEY="import-time-test",
+        # Base injoignable : l'import ne doit ouvrir aucune connexion
+        DATABASE_URL="sqlite:////nonexistent-directory/agropredict.db",
+    )
+    return subprocess.run(
+        [sys.executable, *python_options, "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+def cumulative_import_us(stderr: str, module: str) -> int:
+    """Temps cumulé (µs) d'un module dans la sortie de -X importtime"""
+    pattern = re.compile(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$", re.MULTILINE)
+    match = pattern.search(stderr)
+    assert match, f"{module} absent de la sortie -X importtime"
+    return int(match.group(1))
+
+
+class TestImportTime:
+    """Tests du coût d'import de l'application"""
+
+    @pytest.mark.parametrize("module", ["main", "app.main"])
+    def test_import_without_database(self, module):
+        """L'import ne crée pas les tables et ne se connecte pas à la base"""
+        result = run_import(f"import {module}")
+        assert result.returncode == 0, result.stderr
+
+    def test_import_time_budget(self):
+        """L'import de main reste sous le budget (-X importtime)"""
+        result = run_import("import main", "-X", "importtime")
+        assert result.returncode == 0, result.stderr
+        elapsed_ms = cumulative_import_us(result.stderr, "main") / 1000
+        assert elapsed_ms < IMPORT_TIME_BUDGET_MS, f"import main: {elapsed_ms:.0f} ms"
+
+    def test_services_not_constructed_at_import(self):
+        """Clients de notification, ChirpStack, Infobip et scheduler ne sont pas chargés à l'import"""
+        result = run_import(
+            "import sys, main; print(','.join(m for m in %r if m in sys.modules))" % (DEFERRED_MODULES,)
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == ""
+
+
+class TestLazyServices:
+    """Tests des instances construites au premier usage"""
+
+    def test_module_attributes_still_available(self):
+        """Les anciens noms d'instances globales restent importables"""
+        from app.services.chirpstack_service import chirpstack_service, get_chirpstack_service
+        from app.services.infobip_service import get_infobip_service, infobip_service
+        from app.services.scheduler_service import get_scheduler_service, scheduler_service
+
+        assert chirpstack_service is get_chirpstack_service()
+        assert infobip_service is get_infobip_service()
+        assert scheduler_service is get_scheduler_service()
+
+    def test_notification_clients_built_on_first_use(self):
+        """Les clients des canaux sont construits au premier accès puis réutilisés"""
+        from app.services.notification_service import NotificationService
+
+        service = NotificationService()
+        assert "email_service" not in service.__dict__
+        assert service.email_service is service.email_service
@@ -0,0 +1,92 @@
+import httpx
+import pytest
+from app.core.config import settings
+from app.services.warmup_service import LatencyHistogram, WarmupService, WarmupTarget
+
+
+class TestIdleTimeoutEstimate:
+    """Tests de l'estimation du délai d'inactivité des services"""
+
+    def test_initial_estimate(self):
+        """Test que l'estimation initiale est celle configurée"""
+        target = WarmupTarget("ml", "http://ml/", initial_idle_timeout=900)
+
+        assert target.idle_timeout_estimate == 900
+
+    def test_cold_start_lowers_estimate(self):
+        """Test qu'un cold start après un écart court réduit l'estimation"""
+        target = WarmupTarget("ml", "http://ml/", initial_idle_timeout=900)
+        target.record(now=0, latency=0.2, cold=False)
+        target.record(now=600, latency=40.0, cold=True)
+
+        assert target.idle_timeout_estimate == 600
+        assert target.cold.count == 1
+        assert target.warm.count == 1
+
+    def test_warm_after_estimate_relearns(self):
+        """Test qu'un ping resté chaud au-delà de l'estimation la remet en cause"""
+        target = WarmupTarget("ml", "http://ml/", initial_idle_timeout=900)
+        target.record(now=0, latency=0.2, cold=False)
+        target.record(now=600, latency=40.0, cold=True)
+        target.record(now=1300, latency=0.3, cold=False)
+
+        assert target.idle_timeout_estimate == 900
+
+    def test_interval_is_fraction_of_estimate(self, monkeypatch):
+        """Test que l'intervalle de ping est une fraction bornée de l'estimation"""
+        monkeypatch.setattr(settings, "WARMUP_SAFETY_FACTOR", 0.5)
+        monkeypatch.setattr(settings, "WARMUP_MIN_INTERVAL", 60)
+        service = WarmupService(targets={"ml": "http://ml"})
+        target = service.targets[0]
+        target.cold_gap_min = 600
+
+        assert service.interval_for(target) == 300
+        target.cold_gap_min = 30
+        assert service.interval_for(target) == 60
+
+
+class TestHistogram:
+    """Tests de l'histogramme de latence"""
+
+    def test_observe(self):
+        """Test de la répartition dans les seaux"""
+        histogram = LatencyHistogram()
+        for value in [0.05, 0.3, 45.0, 500.0]:
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 4
+        assert snapshot["buckets"]["<=0.1s"] == 1
+        assert snapshot["buckets"]["<=0.5s"] == 1
+        assert snapshot["buckets"]["<=60.0s"] == 1
+        assert snapshot["buckets"][">120.0s"] == 1
+
+
+class TestPing:
+    """Tests des pings de préchauffage"""
+
+    @pytest.mark.asyncio
+    async def test_ping_records_latency(self):
+        """Test qu'une réponse HTTP (même 404) compte comme service éveillé"""
+        service = WarmupService(targets={"ml": "http://ml"})
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            latency = await service.ping(service.targets[0], client)
+
+        assert latency is not None
+        assert service.targets[0].warm.count == 1
+        assert service.snapshot()["targets"]["ml"]["last_error"] is None
+
+    @pytest.mark.asyncio
+    async def test_ping_failure(self):
+        """Test qu'une erreur serveur est remontée sans fausser les histogrammes"""
+        service = WarmupService(targets={"ml": "http://ml"})
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            latency = await service.ping(service.targets[0], client)
+
+        assert latency is None
+        assert service.targets[0].last_error == "HTTP 503"
+        assert service.targets[0].warm.count == 0